@@ -4,6 +4,8 @@ set -o errexit
 pip install -r requirements.txt
 
 python manage.py migrate --noinput
+python manage.py createcachetable
 python manage.py seed_referinte
 python manage.py ensure_superuser
+python manage.py freeze_snapshots
 python manage.py collectstatic --noinput
@@ -93,6 +93,68 @@ else:
     }
 
 
+# Cache
+# Implicit: memorie locală (per proces). Pentru mai mulți workeri Gunicorn este recomandat un cache
+# partajat, ca invalidările să fie vizibile în toate procesele:
+#   DJANGO_CACHE_BACKEND=db    -> tabel în baza de date (necesită `python manage.py createcachetable`)
+#   DJANGO_CACHE_BACKEND=file  -> fișiere pe disc (DJANGO_CACHE_LOCATION, implicit <proiect>/.cache)
+CACHE_BACKEND = os.environ.get("DJANGO_CACHE_BACKEND", "locmem").strip().lower()
+if CACHE_BACKEND == "locmem":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "cie-platforma",
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        }
+    }
+elif CACHE_BACKEND == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", "cie_cache"),
+        }
+    }
+else:
+    raise ImproperlyConfigured("DJANGO_CACHE_BACKEND trebuie să fie unul dintre: locmem, file, db.")
+
+# Durata (secunde) pentru datele de referință din cache (clustere, capitole, criterii, comisii, instituții).
+# Sunt invalidate automat la modificare; cu locmem și mai mulți workeri, timeout-ul limitează cât poate
+# rămâne un worker cu date vechi.
+REFERENCE_CACHE_TIMEOUT = int(
+    os.environ.get("REFERENCE_CACHE_TIMEOUT", "300" if CACHE_BACKEND == "locmem" else "21600") or 300
+)
+
+# Durata (secunde) pentru agregatele precalculate ale dashboard-ului PNA. Se invalidează la orice
+# modificare pe proiecte / acte UE / contribuții; cu locmem (per proces) păstrăm o durată scurtă.
+PNA_DASHBOARD_CACHE_TIMEOUT = int(
+    os.environ.get("PNA_DASHBOARD_CACHE_TIMEOUT", "60" if CACHE_BACKEND == "locmem" else "3600") or 60
+)
+
+# Exporturile de răspunsuri în fundal (ExportJob): implicit sunt procesate de un fir din procesul web,
+# pornit după crearea jobului. Cu false, rămân în așteptare pentru `python manage.py process_export_jobs`
+# (cron / serviciu worker separat).
+EXPORT_JOBS_IN_PROCESS = os.environ.get("EXPORT_JOBS_IN_PROCESS", "true").lower() in ("1", "true", "yes")
+# Workerul care generează un export îi reîmprospătează lease-ul (heartbeat) la fiecare atâtea secunde.
+EXPORT_JOBS_HEARTBEAT_SECONDS = int(os.environ.get("EXPORT_JOBS_HEARTBEAT_SECONDS", "60") or 60)
+# Joburile „în lucru” fără heartbeat de mai mult de atâtea minute (proces web repornit / oprit în timpul
+# exportului) sunt repuse în așteptare de workerul din proces și de pagina de status a exportului.
+# Trebuie să fie (mult) mai mare decât EXPORT_JOBS_HEARTBEAT_SECONDS.
+EXPORT_JOBS_STALE_MINUTES = int(os.environ.get("EXPORT_JOBS_STALE_MINUTES", "30") or 30)
+# Fișierele exporturilor finalizate sunt șterse din storage după atâtea zile (0 = fără limită de vârstă);
+# fișierele înlocuite de un export mai nou al aceleiași selecții sunt șterse imediat.
+EXPORT_FILES_RETENTION_DAYS = int(os.environ.get("EXPORT_FILES_RETENTION_DAYS", "7") or 7)
+
+# Numărul de procese pentru randarea în paralel a exportului „PDF per chestionar (ZIP)”.
+# 0 / 1 = secvențial, în procesul curent (potrivit pentru instanțele mici, cu un singur CPU).
+EXPORT_PARALLEL_WORKERS = int(os.environ.get("EXPORT_PARALLEL_WORKERS", "0") or 0)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -189,6 +251,19 @@ EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "true").lower() in ("1", "true",
 EMAIL_USE_SSL = os.environ.get("EMAIL_USE_SSL", "false").lower() in ("1", "true", "yes")
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", os.environ.get("EMAIL_HOST_USER", "no-reply@example.com"))
 
+# Coada de emailuri (OutboundEmail, vezi portal/outbox.py): implicit, mesajele sunt trimise de un fir din
+# procesul web, pornit după punerea lor în coadă. Cu false, rămân în așteptare pentru
+# `python manage.py process_outbox` (cron / serviciu worker separat).
+OUTBOX_IN_PROCESS = os.environ.get("OUTBOX_IN_PROCESS", "true").lower() in ("1", "true", "yes")
+# Câte mesaje preia un worker odată (trimise pe aceeași conexiune SMTP).
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", "50") or 50)
+# Un mesaj eșuat este reîncercat după EMAIL_RETRY_DELAY x 2^(n-1) secunde, de cel mult EMAIL_MAX_ATTEMPTS ori.
+EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "5") or 1)
+EMAIL_RETRY_DELAY = float(os.environ.get("EMAIL_RETRY_DELAY", "60") or 0)
+# Mesajele rămase „în lucru” mai mult de atâtea minute (proces web repornit / oprit în timpul trimiterii)
+# sunt repuse în așteptare la fiecare trecere a workerului din proces.
+OUTBOX_STALE_MINUTES = int(os.environ.get("OUTBOX_STALE_MINUTES", "30") or 30)
+
 # În spatele proxy-urilor (Render, etc.)
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
 
 from .models import (
     Answer,
@@ -10,7 +12,29 @@ from .models import (
     Questionnaire,
     Submission,
     Newsletter,
+    OutboundEmail,
 )
+from .stats import deferred_response_counter_refresh, refresh_response_counters
+
+
+class DeferredCounterRefreshMixin:
+    """Ștergerile din admin (și submisiile șterse în cascadă) renumără contoarele o singură dată, la final."""
+
+    def delete_model(self, request, obj):
+        with deferred_response_counter_refresh():
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with deferred_response_counter_refresh():
+            super().delete_queryset(request, queryset)
+
+
+admin.site.unregister(get_user_model())
+
+
+@admin.register(get_user_model())
+class PortalUserAdmin(DeferredCounterRefreshMixin, UserAdmin):
+    pass
 
 
 @admin.register(Cluster)
@@ -47,7 +71,7 @@ class QuestionInline(admin.TabularInline):
 
 
 @admin.register(Questionnaire)
-class QuestionnaireAdmin(admin.ModelAdmin):
+class QuestionnaireAdmin(DeferredCounterRefreshMixin, admin.ModelAdmin):
     list_display = ("titlu", "termen_limita", "creat_la")
     list_filter = ("termen_limita", "capitole", "criterii")
     search_fields = ("titlu",)
@@ -61,12 +85,23 @@ class AnswerInline(admin.TabularInline):
 
 
 @admin.register(Submission)
-class SubmissionAdmin(admin.ModelAdmin):
+class SubmissionAdmin(DeferredCounterRefreshMixin, admin.ModelAdmin):
     list_display = ("questionnaire", "expert", "status", "actualizat_la", "trimis_la")
     list_filter = ("status", "questionnaire")
     search_fields = ("expert__first_name", "expert__last_name", "expert__email", "questionnaire__titlu")
     inlines = [AnswerInline]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Contoarele de răspunsuri trimise sunt actualizate incremental doar de fluxul expertului; o submisie
+        # adăugată sau mutată / trecută în alt status de aici renumără chestionarele afectate.
+        if change and not ({"status", "questionnaire", "expert"} & set(form.changed_data)):
+            return
+        ids = {obj.questionnaire_id}
+        if change and form.initial.get("questionnaire"):
+            ids.add(form.initial["questionnaire"])
+        refresh_response_counters(ids)
+
 
 admin.site.register(Answer)
 admin.site.register(Question)
@@ -76,3 +111,11 @@ admin.site.register(Question)
 class NewsletterAdmin(admin.ModelAdmin):
     list_display = ("subiect", "creat_la", "trimis_la", "nr_trimise", "nr_esecuri")
     search_fields = ("subiect", "continut")
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("destinatar", "subiect", "tip", "status", "incercari", "creat_la", "trimis_la")
+    list_filter = ("status", "tip")
+    search_fields = ("destinatar", "subiect")
+    raw_id_fields = ("newsletter", "questionnaire")
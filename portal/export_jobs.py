@@ -0,0 +1,350 @@
+"""Exporturi de răspunsuri generate în fundal.
+
+`admin_export` creează un ExportJob (în așteptare), iar fișierul este produs de un worker care folosește
+doar baza de date (fără broker extern):
+  - implicit, un fir de execuție din procesul web pornit după commit (EXPORT_JOBS_IN_PROCESS=true);
+  - sau comanda `python manage.py process_export_jobs` (ex. cron / serviciu worker separat).
+
+Preluarea unui job se face printr-un UPDATE condiționat pe status, deci mai mulți workeri pot rula în
+paralel fără să proceseze același job de două ori. Preluarea primește un token (`lot`), iar workerul
+reîmprospătează `heartbeat_la` la fiecare EXPORT_JOBS_HEARTBEAT_SECONDS cât timp generează fișierul. Un job
+fără semn de viață de peste EXPORT_JOBS_STALE_MINUTES (procesul web repornit în timpul exportului) este repus
+în așteptare la următoarea trecere a workerului din proces sau la deschiderea paginii de status a jobului;
+rezultatul salvat la final este înregistrat doar dacă tokenul preluării este încă cel al jobului.
+
+Fișierele exporturilor înlocuite de unul mai nou (același format, aceeași selecție, același reper) sau mai
+vechi de EXPORT_FILES_RETENTION_DAYS sunt șterse din storage (`cleanup_export_files`); jobul rămâne în istoric.
+"""
+
+import logging
+import tempfile
+import threading
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .exports import (
+    export_content_version,
+    export_selection_key,
+    export_xlsx_file,
+    record_export_watermark,
+    stream_csv,
+    write_pdf,
+    write_pdf_zip,
+)
+from .models import ExportJob, Questionnaire
+
+logger = logging.getLogger(__name__)
+
+
+def _csv_file(questionnaires, since) -> File:
+    fileobj = tempfile.TemporaryFile()
+    for chunk in stream_csv(questionnaires, since=since):
+        fileobj.write(chunk)
+    fileobj.seek(0)
+    return File(fileobj)
+
+
+def _xlsx_file(questionnaires, since) -> File:
+    return File(export_xlsx_file(questionnaires, since=since))
+
+
+def _pdf_file(questionnaires, since) -> File:
+    fileobj = tempfile.TemporaryFile()
+    write_pdf(questionnaires, fileobj, since=since)
+    fileobj.seek(0)
+    return File(fileobj)
+
+
+def _pdf_zip_file(questionnaires, since) -> File:
+    fileobj = tempfile.TemporaryFile()
+    write_pdf_zip(questionnaires, fileobj, since=since)
+    fileobj.seek(0)
+    return File(fileobj)
+
+
+_EXPORT_WRITERS: Dict[str, Callable[[Iterable[Questionnaire], Optional[datetime]], File]] = {
+    ExportJob.FORMAT_CSV: _csv_file,
+    ExportJob.FORMAT_XLSX: _xlsx_file,
+    ExportJob.FORMAT_PDF: _pdf_file,
+    ExportJob.FORMAT_PDF_ZIP: _pdf_zip_file,
+}
+
+
+def find_cached_export(
+    fmt: str, selectie: str, versiune: str, since: Optional[datetime] = None
+) -> Optional[ExportJob]:
+    """Un export finalizat cu același format, aceeași selecție, același reper și aceeași versiune a datelor."""
+    job = (
+        ExportJob.objects.filter(
+            format=fmt,
+            status=ExportJob.STATUS_FINALIZAT,
+            selectie=selectie,
+            versiune=versiune,
+            modificate_dupa=since,
+        )
+        .exclude(fisier="")
+        .order_by("-finalizat_la")
+        .first()
+    )
+    # Fișierul poate lipsi din storage (ex. disc temporar Render); atunci exportul se regenerează.
+    if job is None or not job.fisier.storage.exists(job.fisier.name):
+        return None
+    return job
+
+
+def get_cached_export(fmt: str, questionnaire_ids: Iterable[int], since: Optional[datetime] = None) -> Optional[ExportJob]:
+    ids = list(questionnaire_ids)
+    return find_cached_export(fmt, export_selection_key(ids), export_content_version(ids), since)
+
+
+def create_export_job(
+    user,
+    fmt: str,
+    questionnaires: Iterable[Questionnaire],
+    since: Optional[datetime] = None,
+    background: bool = True,
+) -> Tuple[ExportJob, bool]:
+    """Întoarce (job, refolosit) pentru exportul cerut.
+
+    Dacă aceeași selecție a fost deja exportată în același format și datele nu s-au schimbat de atunci,
+    se întoarce jobul existent (refolosit=True). Altfel se creează un job nou: în așteptare (procesat după
+    commit, dacă EXPORT_JOBS_IN_PROCESS) sau, cu background=False, generat imediat, în cererea curentă.
+    Cu `since`, exportul este incremental (doar submisiile / răspunsurile modificate după acel moment).
+
+    Reperul exportului incremental al utilizatorului avansează doar când exportul reușește: imediat pentru
+    un fișier refolosit (datele nu s-au schimbat), altfel în `run_export_job`, la finalizarea jobului.
+    """
+    questionnaires = list(questionnaires)
+    ids = [q.id for q in questionnaires]
+    selectie, versiune = export_selection_key(ids), export_content_version(ids)
+    cached = find_cached_export(fmt, selectie, versiune, since)
+    if cached is not None:
+        record_export_watermark(user, ids, timezone.now())
+        return cached, True
+
+    job = ExportJob.objects.create(
+        format=fmt,
+        creat_de=user,
+        modificate_dupa=since,
+        selectie=selectie,
+        versiune=versiune,
+        status=ExportJob.STATUS_IN_ASTEPTARE if background else ExportJob.STATUS_IN_LUCRU,
+        inceput_la=None if background else timezone.now(),
+        lot="" if background else uuid.uuid4().hex,
+        heartbeat_la=None if background else timezone.now(),
+    )
+    job.chestionare.set(questionnaires)
+    if not background:
+        run_export_job(job)
+    elif getattr(settings, "EXPORT_JOBS_IN_PROCESS", True):
+        transaction.on_commit(start_export_worker)
+    return job, False
+
+
+def claim_next_export_job() -> Optional[ExportJob]:
+    """Preia cel mai vechi job în așteptare (marcat ca în lucru) sau None dacă nu există."""
+    while True:
+        job = ExportJob.objects.filter(status=ExportJob.STATUS_IN_ASTEPTARE).order_by("creat_la", "pk").first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = ExportJob.objects.filter(pk=job.pk, status=ExportJob.STATUS_IN_ASTEPTARE).update(
+            status=ExportJob.STATUS_IN_LUCRU, lot=uuid.uuid4().hex, inceput_la=now, heartbeat_la=now
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Preluat între timp de alt worker: încercăm următorul.
+
+
+def _heartbeat_seconds() -> float:
+    return getattr(settings, "EXPORT_JOBS_HEARTBEAT_SECONDS", 60)
+
+
+@contextmanager
+def _export_lease(job: ExportJob):
+    """Reîmprospătează `heartbeat_la` (într-un fir separat) cât timp rulează blocul, dacă jobul e încă al nostru."""
+    stop = threading.Event()
+
+    def _beat():
+        try:
+            while not stop.wait(_heartbeat_seconds()):
+                ExportJob.objects.filter(pk=job.pk, lot=job.lot, status=ExportJob.STATUS_IN_LUCRU).update(
+                    heartbeat_la=timezone.now()
+                )
+        except Exception:
+            logger.exception("Reîmprospătarea exportului #%s a eșuat", job.pk)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=_beat, name=f"export-job-{job.pk}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_export_job(job: ExportJob) -> None:
+    """Generează fișierul pentru un job deja preluat și îl salvează în storage-ul implicit.
+
+    Rezultatul este înregistrat printr-un UPDATE condiționat pe tokenul preluării: dacă între timp jobul a
+    fost repus în așteptare (lease expirat) și preluat din nou, fișierul acestei rulări este șters.
+    """
+    try:
+        with _export_lease(job):
+            questionnaires = Questionnaire.objects.filter(exporturi=job).order_by("-creat_la")
+            content = _EXPORT_WRITERS[job.format](questionnaires, job.modificate_dupa)
+            try:
+                nume = f"raspunsuri_{timezone.localtime(job.creat_la).strftime('%Y%m%d_%H%M')}.{job.extensie}"
+                job.fisier.save(nume, content, save=False)
+            finally:
+                content.close()
+        job.nume_fisier = nume
+        job.status = ExportJob.STATUS_FINALIZAT
+        job.eroare = ""
+    except Exception:
+        logger.exception("Exportul #%s a eșuat", job.pk)
+        job.status = ExportJob.STATUS_ESUAT
+        job.eroare = traceback.format_exc(limit=5)
+    job.finalizat_la = timezone.now()
+    saved = ExportJob.objects.filter(pk=job.pk, lot=job.lot, status=ExportJob.STATUS_IN_LUCRU).update(
+        fisier=job.fisier.name or "",
+        nume_fisier=job.nume_fisier,
+        status=job.status,
+        eroare=job.eroare,
+        finalizat_la=job.finalizat_la,
+    )
+    if not saved:
+        logger.warning("Exportul #%s nu mai aparține acestei rulări (lease expirat); rezultatul este ignorat", job.pk)
+        if job.fisier:
+            job.fisier.storage.delete(job.fisier.name)
+        return
+    if job.status == ExportJob.STATUS_FINALIZAT and job.creat_de_id:
+        # creat_la precede citirea datelor: modificările făcute în timpul exportului intră și în următorul.
+        record_export_watermark(job.creat_de_id, job.chestionare.values_list("id", flat=True), job.creat_la)
+
+
+def process_export_jobs(limit: Optional[int] = None) -> int:
+    """Procesează joburile în așteptare (cel mult `limit`); întoarce numărul de joburi procesate."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_export_job()
+        if job is None:
+            break
+        run_export_job(job)
+        processed += 1
+    return processed
+
+
+def requeue_stale_export_jobs(minutes: int) -> int:
+    """Repune în așteptare joburile „în lucru” al căror lease a expirat: fără semn de viață de peste `minutes`.
+
+    Un worker activ reîmprospătează `heartbeat_la` la fiecare EXPORT_JOBS_HEARTBEAT_SECONDS, deci doar joburile
+    rămase fără worker (ex. proces oprit brusc) sunt preluate din nou, oricât ar dura exportul.
+    """
+    limit = timezone.now() - timedelta(minutes=minutes)
+    return (
+        ExportJob.objects.filter(status=ExportJob.STATUS_IN_LUCRU)
+        .filter(Q(heartbeat_la__lt=limit) | Q(heartbeat_la__isnull=True, inceput_la__lt=limit))
+        .update(status=ExportJob.STATUS_IN_ASTEPTARE, lot="", inceput_la=None, heartbeat_la=None)
+    )
+
+
+def cleanup_export_files(days: int) -> int:
+    """Șterge din storage fișierele exporturilor finalizate care nu mai sunt necesare.
+
+    Un fișier este șters dacă există un export finalizat mai nou cu același format, aceeași selecție și același
+    reper (`find_cached_export` îl refolosește doar pe cel mai nou) sau dacă este mai vechi de `days` zile
+    (0 = fără limită de vârstă). Jobul rămâne în istoric, fără fișier. Întoarce numărul de fișiere șterse.
+    """
+    limit = timezone.now() - timedelta(days=days) if days else None
+    seen = set()
+    expired = []
+    for pk, fmt, selectie, since, finalizat_la, name in (
+        ExportJob.objects.filter(status=ExportJob.STATUS_FINALIZAT)
+        .exclude(fisier="")
+        .order_by("-finalizat_la", "-pk")
+        .values_list("pk", "format", "selectie", "modificate_dupa", "finalizat_la", "fisier")
+    ):
+        key = (fmt, selectie, since)
+        superseded = key in seen
+        seen.add(key)
+        if superseded or (limit is not None and (finalizat_la is None or finalizat_la < limit)):
+            expired.append((pk, name))
+    if not expired:
+        return 0
+
+    storage = ExportJob._meta.get_field("fisier").storage
+    for pk, name in expired:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception("Fișierul exportului #%s (%s) nu a putut fi șters", pk, name)
+    ExportJob.objects.filter(pk__in=[pk for pk, _ in expired]).update(fisier="")
+    return len(expired)
+
+
+def _retention_days() -> int:
+    return getattr(settings, "EXPORT_FILES_RETENTION_DAYS", 7)
+
+
+def _stale_minutes() -> int:
+    return getattr(settings, "EXPORT_JOBS_STALE_MINUTES", 30)
+
+
+def resume_stale_export_job(job: ExportJob) -> ExportJob:
+    """Folosit de pagina de status: reia un job neterminat care nu mai este procesat de nimeni.
+
+    Un job „în lucru” fără semn de viață de peste EXPORT_JOBS_STALE_MINUTES este repus în așteptare; un job în așteptare
+    pornește workerul din proces, dacă acesta nu rulează deja (ex. după o repornire a procesului web).
+    """
+    if job.este_terminat:
+        return job
+    if job.status == ExportJob.STATUS_IN_LUCRU and requeue_stale_export_jobs(_stale_minutes()):
+        job.refresh_from_db()
+    if (
+        job.status == ExportJob.STATUS_IN_ASTEPTARE
+        and getattr(settings, "EXPORT_JOBS_IN_PROCESS", True)
+        and (_last_run is None or _last_run.done())
+    ):
+        start_export_worker()
+    return job
+
+
+# Un singur fir per proces: exporturile mari nu concurează între ele pentru memorie și CPU.
+_executor: Optional[ThreadPoolExecutor] = None
+_last_run: Optional[Future] = None
+
+
+def _process_in_thread() -> None:
+    close_old_connections()
+    try:
+        requeued = requeue_stale_export_jobs(_stale_minutes())
+        if requeued:
+            logger.warning("%s exporturi rămase în lucru au fost repuse în așteptare", requeued)
+        process_export_jobs()
+        cleanup_export_files(_retention_days())
+    except Exception:
+        logger.exception("Procesarea exporturilor în fundal a eșuat")
+    finally:
+        connections.close_all()
+
+
+def start_export_worker() -> None:
+    """Pornește (în firul de fundal al procesului) procesarea joburilor în așteptare."""
+    global _executor, _last_run
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-jobs")
+    _last_run = _executor.submit(_process_in_thread)
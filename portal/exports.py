@@ -1,17 +1,32 @@
 import csv
+import hashlib
 import io
+import multiprocessing
+import tempfile
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Iterable, List
-
+from functools import lru_cache
+from itertools import groupby, islice, repeat
+from operator import attrgetter
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+
+import django
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
 from django.utils import timezone
+from django.utils.text import slugify
 
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 
 from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 
-from .models import Questionnaire, Submission
+from .models import Answer, Chapter, ExportWatermark, Question, Questionnaire, Submission
 
 
 def _fmt_dt(dt: datetime | None) -> str:
@@ -22,82 +37,375 @@ def _fmt_dt(dt: datetime | None) -> str:
     return dt.strftime("%Y-%m-%d %H:%M")
 
 
-def export_csv(questionnaires: Iterable[Questionnaire]) -> bytes:
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow(
-        [
-            "Chestionar",
-            "ID chestionar",
-            "Termen limită",
-            "Capitole",
-            "Foi de parcurs",
-            "Categorie",
-            "Expert",
-            "Email",
-            "Status",
-            "Actualizat la",
-            "Trimis la",
-            "Nr. întrebare",
-            "Întrebare",
-            "Răspuns",
-        ]
+EXPORT_CHUNK_SIZE = 500
+
+
+# -------------------- Date comune pentru exporturi --------------------
+#
+# CSV, XLSX și PDF consumă aceleași date: chestionarele selectate (cu capitole, foi de parcurs și
+# întrebări) și submisiile trimise (cu expertul, profilul și răspunsurile). Le citim în bloc, cu
+# values_list, pentru toate chestionarele deodată: numărul de interogări nu depinde de câte
+# chestionare sunt exportate, iar răspunsurile sunt încărcate per bloc de submisii.
+
+
+@dataclass
+class ExportQuestion:
+    id: int
+    ord: int
+    text: str
+
+
+@dataclass
+class ExportQuestionnaire:
+    id: int
+    titlu: str
+    termen_limita: datetime | None
+    categorie: str
+    capitole: str
+    criterii: str
+    questions: List[ExportQuestion] = field(default_factory=list)
+
+
+@dataclass
+class ExportSubmission:
+    id: int
+    questionnaire_id: int
+    status: str
+    actualizat_la: datetime | None
+    trimis_la: datetime | None
+    expert: str
+    email: str
+    telefon: str
+    organizatie: str
+    functie: str
+    answers: Dict[int, str] = field(default_factory=dict)
+
+
+def load_export_questionnaires(questionnaires: Iterable[Questionnaire]) -> List[ExportQuestionnaire]:
+    """Chestionarele de exportat, în ordinea primită, cu capitolele, criteriile și întrebările atașate."""
+    items = [
+        ExportQuestionnaire(
+            id=q.id,
+            titlu=q.titlu,
+            termen_limita=q.termen_limita,
+            categorie="General" if getattr(q, "este_general", False) else "Alocat",
+            capitole="",
+            criterii="",
+        )
+        for q in questionnaires
+    ]
+    by_id = {item.id: item for item in items}
+    if not by_id:
+        return items
+
+    chapters: Dict[int, List[str]] = defaultdict(list)
+    for q_id, numar, denumire in (
+        Questionnaire.capitole.through.objects.filter(questionnaire_id__in=by_id)
+        .order_by("chapter__numar")
+        .values_list("questionnaire_id", "chapter__numar", "chapter__denumire")
+    ):
+        chapters[q_id].append(str(Chapter(numar=numar, denumire=denumire)))
+
+    criteria: Dict[int, List[str]] = defaultdict(list)
+    for q_id, denumire in (
+        Questionnaire.criterii.through.objects.filter(questionnaire_id__in=by_id)
+        .order_by("criterion__cod")
+        .values_list("questionnaire_id", "criterion__denumire")
+    ):
+        criteria[q_id].append(denumire)
+
+    for q_id, qu_id, ord_, text in (
+        Question.objects.filter(questionnaire_id__in=by_id)
+        .order_by("questionnaire_id", "ord", "id")
+        .values_list("questionnaire_id", "id", "ord", "text")
+    ):
+        by_id[q_id].questions.append(ExportQuestion(id=qu_id, ord=ord_, text=text))
+
+    for item in items:
+        item.capitole = "; ".join(chapters.get(item.id, []))
+        item.criterii = "; ".join(criteria.get(item.id, []))
+    return items
+
+
+def iter_export_submissions(
+    questionnaire_ids: List[int], chunk_size: int = EXPORT_CHUNK_SIZE, since: datetime | None = None
+) -> Iterator[ExportSubmission]:
+    """Submisiile trimise pentru chestionarele date, grupate în ordinea `questionnaire_ids`.
+
+    O singură interogare parcursă cu `.iterator(chunk_size=...)`; răspunsurile se citesc printr-o
+    interogare per bloc de submisii. Cu `since` (export incremental) se păstrează doar submisiile
+    modificate după acel moment sau care au răspunsuri modificate după el (cu toate răspunsurile lor).
+    """
+    if not questionnaire_ids:
+        return
+    position = Case(
+        *[When(questionnaire_id=q_id, then=Value(pos)) for pos, q_id in enumerate(questionnaire_ids)],
+        output_field=IntegerField(),
+    )
+    submissions = Submission.objects.filter(
+        questionnaire_id__in=questionnaire_ids, status=Submission.STATUS_TRIMIS
+    )
+    if since is not None:
+        changed_answers = Answer.objects.filter(
+            updated_at__gt=since, submission__questionnaire_id__in=questionnaire_ids
+        ).values("submission_id")
+        submissions = submissions.filter(Q(actualizat_la__gt=since) | Q(id__in=changed_answers))
+    rows = (
+        submissions.order_by(position, "-actualizat_la")
+        .values_list(
+            "id",
+            "questionnaire_id",
+            "status",
+            "actualizat_la",
+            "trimis_la",
+            "expert__first_name",
+            "expert__last_name",
+            "expert__username",
+            "expert__email",
+            "expert__profil_expert__telefon",
+            "expert__profil_expert__organizatie",
+            "expert__profil_expert__functie",
+        )
+        .iterator(chunk_size=chunk_size)
     )
+    status_labels = dict(Submission.STATUS_CHOICES)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        subs = {}
+        for sub_id, q_id, status, actualizat_la, trimis_la, first, last, username, email, tel, org, functie in chunk:
+            subs[sub_id] = ExportSubmission(
+                id=sub_id,
+                questionnaire_id=q_id,
+                status=status_labels.get(status, status),
+                actualizat_la=actualizat_la,
+                trimis_la=trimis_la,
+                expert=f"{first} {last}".strip() or username,
+                email=email,
+                telefon=tel or "",
+                organizatie=org or "",
+                functie=functie or "",
+            )
+        for sub_id, qu_id, text in Answer.objects.filter(submission_id__in=subs).values_list(
+            "submission_id", "question_id", "text"
+        ):
+            subs[sub_id].answers[qu_id] = text
+        yield from subs.values()
+
+
+def iter_export_data(
+    questionnaires: Iterable[Questionnaire], chunk_size: int = EXPORT_CHUNK_SIZE, since: datetime | None = None
+) -> Iterator[Tuple[ExportQuestionnaire, Iterator[ExportSubmission]]]:
+    """Perechi (chestionar, submisiile lui), pentru fiecare chestionar (și cele fără răspunsuri).
+
+    Submisiile unui chestionar trebuie consumate înainte de a trece la următorul.
+    """
+    items = load_export_questionnaires(questionnaires)
+    groups = groupby(
+        iter_export_submissions([item.id for item in items], chunk_size=chunk_size, since=since),
+        key=attrgetter("questionnaire_id"),
+    )
+    pending = next(groups, None)
+    for item in items:
+        if pending is not None and pending[0] == item.id:
+            yield item, pending[1]
+            pending = next(groups, None)
+        else:
+            yield item, iter(())
 
-    for q in questionnaires:
-        chapters = "; ".join([str(ch) for ch in q.capitole.all().order_by("numar")])
-        criteria = "; ".join([c.denumire for c in q.criterii.all().order_by("cod")])
-        cat = "General" if getattr(q, "este_general", False) else "Alocat"
 
-        questions = list(q.intrebari.all().order_by("ord"))
-        submissions = (
-            q.submisii.select_related("expert")
-            .prefetch_related("raspunsuri", "raspunsuri__question")
-            .filter(status=Submission.STATUS_TRIMIS)
-        )
+# -------------------- Export incremental --------------------
+#
+# Pentru fiecare utilizator și selecție de chestionare păstrăm momentul ultimului export (ExportWatermark);
+# exportul incremental include doar ce s-a modificat după acel moment. Reperul avansează doar după ce exportul
+# a reușit (job finalizat / flux CSV trimis complet), la momentul în care au început citirile.
+
+
+def export_selection_key(questionnaire_ids: Iterable[int]) -> str:
+    return hashlib.sha1(",".join(str(i) for i in sorted(set(questionnaire_ids))).encode()).hexdigest()
 
+
+def get_export_watermark(user, questionnaire_ids: Iterable[int]) -> datetime | None:
+    """Momentul ultimului export al selecției de către `user` (None dacă nu a mai exportat-o)."""
+    return (
+        ExportWatermark.objects.filter(user=user, selectie=export_selection_key(questionnaire_ids))
+        .values_list("exportat_la", flat=True)
+        .first()
+    )
+
+
+def record_export_watermark(user, questionnaire_ids: Iterable[int], exportat_la: datetime) -> None:
+    """Avansează reperul selecției (`user` = utilizator sau ID); un export mai vechi, terminat după unul
+    mai nou, nu îl mută înapoi."""
+    selectie = export_selection_key(questionnaire_ids)
+    user_id = getattr(user, "pk", user)
+    mark, created = ExportWatermark.objects.get_or_create(
+        user_id=user_id, selectie=selectie, defaults={"exportat_la": exportat_la}
+    )
+    if not created:
+        ExportWatermark.objects.filter(pk=mark.pk, exportat_la__lt=exportat_la).update(exportat_la=exportat_la)
+
+
+def stream_csv_and_record_watermark(
+    questionnaires: Iterable[Questionnaire], user, since: datetime | None = None
+) -> Iterator[bytes]:
+    """`stream_csv` care avansează reperul utilizatorului doar după ce ultima bucată a fost trimisă.
+
+    Dacă descărcarea este întreruptă, generatorul este închis înainte de final și reperul rămâne neschimbat.
+    """
+    questionnaires = list(questionnaires)
+    started_at = timezone.now()
+    yield from stream_csv(questionnaires, since=since)
+    record_export_watermark(user, [q.id for q in questionnaires], started_at)
+
+
+def export_content_version(questionnaire_ids: Iterable[int]) -> str:
+    """Versiunea datelor exportate pentru chestionarele date.
+
+    Se schimbă la orice submisie / răspuns adăugat, modificat sau șters (numărul și ultima modificare) și la
+    orice modificare a celorlalte date din fișier, care nu au marcaj de timp: titlul, termenul și alocările
+    chestionarelor (cu denumirile capitolelor / criteriilor), întrebările și datele experților (nume, email,
+    telefon, organizație, funcție) — amprentă sha1, `_export_metadata_digest`.
+    Folosită pentru a refolosi un export deja generat cât timp datele nu s-au schimbat.
+    """
+    ids = list(questionnaire_ids)
+    subs = Submission.objects.filter(questionnaire_id__in=ids, status=Submission.STATUS_TRIMIS).aggregate(
+        n=Count("id"), last=Max("actualizat_la")
+    )
+    answers = Answer.objects.filter(
+        submission__questionnaire_id__in=ids, submission__status=Submission.STATUS_TRIMIS
+    ).aggregate(n=Count("id"), last=Max("updated_at"))
+
+    def stamp(dt: datetime | None) -> str:
+        return dt.strftime("%Y%m%d%H%M%S%f") if dt else "0"
+
+    return (
+        f"s{subs['n']}-{stamp(subs['last'])}-a{answers['n']}-{stamp(answers['last'])}"
+        f"-m{_export_metadata_digest(ids)}"
+    )
+
+
+def _export_metadata_digest(questionnaire_ids: List[int]) -> str:
+    digest = hashlib.sha1()
+    for rows in (
+        Questionnaire.objects.filter(id__in=questionnaire_ids)
+        .order_by("id")
+        .values_list("id", "titlu", "termen_limita", "este_general"),
+        Questionnaire.capitole.through.objects.filter(questionnaire_id__in=questionnaire_ids)
+        .order_by("questionnaire_id", "chapter_id")
+        .values_list("questionnaire_id", "chapter_id", "chapter__numar", "chapter__denumire"),
+        Questionnaire.criterii.through.objects.filter(questionnaire_id__in=questionnaire_ids)
+        .order_by("questionnaire_id", "criterion_id")
+        .values_list("questionnaire_id", "criterion_id", "criterion__denumire"),
+        Question.objects.filter(questionnaire_id__in=questionnaire_ids)
+        .order_by("id")
+        .values_list("questionnaire_id", "id", "ord", "text"),
+        Submission.objects.filter(questionnaire_id__in=questionnaire_ids, status=Submission.STATUS_TRIMIS)
+        .order_by("expert_id")
+        .values_list(
+            "expert_id",
+            "expert__first_name",
+            "expert__last_name",
+            "expert__username",
+            "expert__email",
+            "expert__profil_expert__telefon",
+            "expert__profil_expert__organizatie",
+            "expert__profil_expert__functie",
+        )
+        .distinct(),
+    ):
+        for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            digest.update(repr(row).encode())
+        digest.update(b"|")
+    return digest.hexdigest()[:12]
+
+
+CSV_HEADERS = [
+    "Chestionar",
+    "ID chestionar",
+    "Termen limită",
+    "Capitole",
+    "Foi de parcurs",
+    "Categorie",
+    "Expert",
+    "Email",
+    "Status",
+    "Actualizat la",
+    "Trimis la",
+    "Nr. întrebare",
+    "Întrebare",
+    "Răspuns",
+]
+
+
+class _Echo:
+    """Pseudo-buffer pentru csv.writer: `write` întoarce direct rândul formatat, fără a-l păstra."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv_rows(
+    questionnaires: Iterable[Questionnaire], chunk_size: int = EXPORT_CHUNK_SIZE, since: datetime | None = None
+) -> Iterator[list]:
+    """Generează rândurile exportului CSV (inclusiv antetul), câte unul pe (submisie, întrebare).
+
+    Submisiile sunt citite în blocuri (vezi iter_export_data), deci memoria folosită nu depinde de
+    numărul total de răspunsuri exportate.
+    """
+    yield CSV_HEADERS
+
+    for q, submissions in iter_export_data(questionnaires, chunk_size=chunk_size, since=since):
         for sub in submissions:
-            expert = sub.expert.get_full_name() or sub.expert.username
-            ans_map = {a.question_id: a.text for a in sub.raspunsuri.all()}
-            for qu in questions:
-                writer.writerow(
-                    [
-                        q.titlu,
-                        q.id,
-                        _fmt_dt(q.termen_limita),
-                        chapters,
-                        criteria,
-                        cat,
-                        expert,
-                        sub.expert.email,
-                        dict(sub.STATUS_CHOICES).get(sub.status, sub.status),
-                        _fmt_dt(sub.actualizat_la),
-                        _fmt_dt(sub.trimis_la),
-                        qu.ord,
-                        qu.text,
-                        ans_map.get(qu.id, ""),
-                    ]
-                )
-
-    return output.getvalue().encode("utf-8")
+            for qu in q.questions:
+                yield [
+                    q.titlu,
+                    q.id,
+                    _fmt_dt(q.termen_limita),
+                    q.capitole,
+                    q.criterii,
+                    q.categorie,
+                    sub.expert,
+                    sub.email,
+                    sub.status,
+                    _fmt_dt(sub.actualizat_la),
+                    _fmt_dt(sub.trimis_la),
+                    qu.ord,
+                    qu.text,
+                    sub.answers.get(qu.id, ""),
+                ]
+
+
+def stream_csv(
+    questionnaires: Iterable[Questionnaire], chunk_size: int = EXPORT_CHUNK_SIZE, since: datetime | None = None
+) -> Iterator[bytes]:
+    """Exportul CSV ca flux de bucăți UTF-8 (pentru StreamingHttpResponse)."""
+    writer = csv.writer(_Echo())
+    for row in iter_csv_rows(questionnaires, chunk_size=chunk_size, since=since):
+        yield writer.writerow(row).encode("utf-8")
 
 
-def export_xlsx(questionnaires: Iterable[Questionnaire]) -> bytes:
-    wb = Workbook()
-    # elimină sheet-ul default
-    default = wb.active
-    wb.remove(default)
+def export_csv(questionnaires: Iterable[Questionnaire]) -> bytes:
+    return b"".join(stream_csv(questionnaires))
+
+
+def write_xlsx(questionnaires: Iterable[Questionnaire], fileobj: IO[bytes], since: datetime | None = None) -> None:
+    """Scrie exportul XLSX în `fileobj` folosind un workbook openpyxl `write_only`.
 
-    for q in questionnaires:
+    Rândurile sunt serializate pe măsură ce sunt adăugate (nu rămân obiecte celulă în memorie), așa că
+    lățimile coloanelor și panoul înghețat se setează înainte de primul rând.
+    """
+    wb = Workbook(write_only=True)
+
+    for q, submissions in iter_export_data(questionnaires, since=since):
         title = q.titlu.strip() or f"Chestionar {q.id}"
         sheet_name = title[:31]
         if sheet_name in wb.sheetnames:
             sheet_name = f"{sheet_name[:28]}_{q.id}"
         ws = wb.create_sheet(title=sheet_name)
 
-        questions = list(q.intrebari.all().order_by("ord"))
-
         headers = [
             "Expert",
             "Email",
@@ -108,129 +416,216 @@ def export_xlsx(questionnaires: Iterable[Questionnaire]) -> bytes:
             "Status",
             "Actualizat la",
             "Trimis la",
-        ] + [f"Î{qu.ord}" for qu in questions]
+        ] + [f"Î{qu.ord}" for qu in q.questions]
 
-        ws.append(headers)
+        # formatare: lățimi
+        for idx, _ in enumerate(headers, start=1):
+            ws.column_dimensions[get_column_letter(idx)].width = 22 if idx <= 9 else 35
 
-        submissions = (
-            q.submisii.select_related("expert")
-            .prefetch_related("raspunsuri", "raspunsuri__question", "expert__profil_expert")
-            .filter(status=Submission.STATUS_TRIMIS)
-        )
+        ws.freeze_panes = "A2"
+        ws.append(headers)
 
         for sub in submissions:
-            expert = sub.expert
-            profil = getattr(expert, "profil_expert", None)
-            ans_map = {a.question_id: a.text for a in sub.raspunsuri.all()}
-
-            cat = "General" if getattr(q, "este_general", False) else "Alocat"
-
             row = [
-                expert.get_full_name() or expert.username,
-                expert.email,
-                getattr(profil, "telefon", ""),
-                getattr(profil, "organizatie", ""),
-                getattr(profil, "functie", ""),
-                cat,
-                dict(sub.STATUS_CHOICES).get(sub.status, sub.status),
+                sub.expert,
+                sub.email,
+                sub.telefon,
+                sub.organizatie,
+                sub.functie,
+                q.categorie,
+                sub.status,
                 _fmt_dt(sub.actualizat_la),
                 _fmt_dt(sub.trimis_la),
             ]
 
-            for qu in questions:
-                row.append(ans_map.get(qu.id, ""))
+            for qu in q.questions:
+                row.append(sub.answers.get(qu.id, ""))
 
             ws.append(row)
 
-        # formatare: lățimi
-        for idx, _ in enumerate(headers, start=1):
-            ws.column_dimensions[get_column_letter(idx)].width = 22 if idx <= 9 else 35
+    wb.save(fileobj)
 
-        ws.freeze_panes = "A2"
 
+def export_xlsx_file(questionnaires: Iterable[Questionnaire], since: datetime | None = None) -> IO[bytes]:
+    """Exportul XLSX într-un fișier temporar (poziționat la început), de trimis în bucăți cu FileResponse."""
+    fileobj = tempfile.TemporaryFile()
+    try:
+        write_xlsx(questionnaires, fileobj, since=since)
+    except Exception:
+        fileobj.close()
+        raise
+    fileobj.seek(0)
+    return fileobj
+
+
+def export_xlsx(questionnaires: Iterable[Questionnaire]) -> bytes:
     stream = io.BytesIO()
-    wb.save(stream)
+    write_xlsx(questionnaires, stream)
     return stream.getvalue()
 
 
-def export_pdf(questionnaires: Iterable[Questionnaire]) -> bytes:
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    margin_x = 40
-    y = height - 50
-
-    def write_line(text: str, y_pos: float, font="Helvetica", size=10) -> float:
-        c.setFont(font, size)
-        # simplu wrap
-        max_width = width - 2 * margin_x
-        words = text.split()
-        line = ""
-        for w in words:
-            test = (line + " " + w).strip()
-            if c.stringWidth(test, font, size) <= max_width:
-                line = test
-            else:
-                c.drawString(margin_x, y_pos, line)
-                y_pos -= 14
-                line = w
-        if line:
-            c.drawString(margin_x, y_pos, line)
-            y_pos -= 14
-        return y_pos
-
-    for q in questionnaires:
-        if y < 120:
-            c.showPage()
-            y = height - 50
-
-        y = write_line(f"Chestionar: {q.titlu}", y, font="Helvetica-Bold", size=12)
-        y = write_line(f"Termen limită: {_fmt_dt(q.termen_limita)}", y)
-        categorie = "General" if getattr(q, "este_general", False) else "Alocat"
-        y = write_line(f"Categorie: {categorie}", y)
-        chapters = "; ".join([str(ch) for ch in q.capitole.all().order_by("numar")])
-        criteria = "; ".join([c.denumire for c in q.criterii.all().order_by("cod")])
-        if chapters:
-            y = write_line(f"Capitole: {chapters}", y)
-        if criteria:
-            y = write_line(f"Foi de parcurs: {criteria}", y)
-        y -= 6
-
-        questions = list(q.intrebari.all().order_by("ord"))
-        submissions = (
-            q.submisii.select_related("expert")
-            .prefetch_related("raspunsuri", "raspunsuri__question")
-            .filter(status=Submission.STATUS_TRIMIS)
-        )
+# -------------------- PDF --------------------
+#
+# Randare directă pe canvas (fără Platypus), cu lățimile cuvintelor memorate per font/mărime: la
+# împărțirea în rânduri, lățimea unui rând se obține adunând lățimile cuvintelor, fără a remăsura
+# rândul întreg la fiecare cuvânt adăugat. Cuprinsul este generat ca outline PDF (semne de carte):
+# câte o intrare per chestionar, cu experții ca sub-intrări.
+
+PDF_MARGIN_X = 40
+PDF_TOP = 50
+PDF_LEADING = 14
+# Sub această poziție nu mai începem un bloc nou (chestionar / expert / întrebare).
+PDF_BLOCK_MIN_Y = 120
+# Sub această poziție un text lung continuă pe pagina următoare.
+PDF_BOTTOM = 40
+
+
+@lru_cache(maxsize=65536)
+def _text_width(text: str, font: str, size: float) -> float:
+    return pdfmetrics.stringWidth(text, font, size)
+
+
+def wrap_text(text: str, font: str, size: float, max_width: float) -> List[str]:
+    """Împarte `text` în rânduri de cel mult `max_width` puncte (un cuvânt prea lung rămâne pe rândul lui)."""
+    space = _text_width(" ", font, size)
+    lines: List[str] = []
+    line: List[str] = []
+    line_width = 0.0
+    for word in text.split():
+        word_width = _text_width(word, font, size)
+        if line and line_width + space + word_width > max_width:
+            lines.append(" ".join(line))
+            line, line_width = [], 0.0
+        line_width = line_width + space + word_width if line else word_width
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+class _PdfRenderer:
+    def __init__(self, fileobj: IO[bytes]):
+        self.canvas = canvas.Canvas(fileobj, pagesize=A4)
+        self.width, self.height = A4
+        self.max_width = self.width - 2 * PDF_MARGIN_X
+        self.y = self.height - PDF_TOP
+
+    def new_page(self) -> None:
+        self.canvas.showPage()
+        self.y = self.height - PDF_TOP
+
+    def ensure_block_space(self) -> None:
+        if self.y < PDF_BLOCK_MIN_Y:
+            self.new_page()
+
+    def write(self, text: str, font: str = "Helvetica", size: float = 10) -> None:
+        self.canvas.setFont(font, size)
+        for line in wrap_text(text, font, size, self.max_width):
+            if self.y < PDF_BOTTOM:
+                self.new_page()
+                self.canvas.setFont(font, size)
+            self.canvas.drawString(PDF_MARGIN_X, self.y, line)
+            self.y -= PDF_LEADING
+
+    def bookmark(self, key: str, title: str, level: int) -> None:
+        """Intrare în cuprins (outline) care trimite la poziția curentă."""
+        self.canvas.bookmarkHorizontal(key, 0, self.y + PDF_LEADING)
+        self.canvas.addOutlineEntry(title, key, level=level, closed=level == 0)
+
+    def save(self) -> None:
+        self.canvas.showOutline()
+        self.canvas.save()
+
+
+def write_pdf(questionnaires: Iterable[Questionnaire], fileobj: IO[bytes], since: datetime | None = None) -> None:
+    pdf = _PdfRenderer(fileobj)
+
+    for q, submissions in iter_export_data(questionnaires, since=since):
+        pdf.ensure_block_space()
+
+        pdf.bookmark(f"q{q.id}", q.titlu or f"Chestionar {q.id}", level=0)
+        pdf.write(f"Chestionar: {q.titlu}", font="Helvetica-Bold", size=12)
+        pdf.write(f"Termen limită: {_fmt_dt(q.termen_limita)}")
+        pdf.write(f"Categorie: {q.categorie}")
+        if q.capitole:
+            pdf.write(f"Capitole: {q.capitole}")
+        if q.criterii:
+            pdf.write(f"Foi de parcurs: {q.criterii}")
+        pdf.y -= 6
+
+        has_submissions = False
+        for sub in submissions:
+            has_submissions = True
+            pdf.ensure_block_space()
+
+            pdf.bookmark(f"q{q.id}_s{sub.id}", sub.expert, level=1)
+            pdf.write(f"Expert: {sub.expert} ({sub.email})", font="Helvetica-Bold")
+            pdf.write(f"Status: {sub.status} | Actualizat: {_fmt_dt(sub.actualizat_la)}")
+
+            for qu in q.questions:
+                pdf.ensure_block_space()
+                pdf.write(f"Î{qu.ord}. {qu.text}", font="Helvetica-Bold")
+                rasp = sub.answers.get(qu.id, "") or "(fără răspuns)"
+                pdf.write(f"Răspuns: {rasp}")
+                pdf.y -= 4
 
-        if not submissions:
-            y = write_line("(Nu există răspunsuri încă)", y)
-            y -= 10
+            pdf.y -= 10
+
+        if not has_submissions:
+            pdf.write("(Nu există răspunsuri încă)")
+            pdf.y -= 10
             continue
 
-        for sub in submissions:
-            if y < 120:
-                c.showPage()
-                y = height - 50
+        pdf.y -= 10
 
-            expert = sub.expert.get_full_name() or sub.expert.username
-            y = write_line(f"Expert: {expert} ({sub.expert.email})", y, font="Helvetica-Bold")
-            y = write_line(f"Status: {dict(sub.STATUS_CHOICES).get(sub.status, sub.status)} | Actualizat: {_fmt_dt(sub.actualizat_la)}", y)
-            ans_map = {a.question_id: a.text for a in sub.raspunsuri.all()}
+    pdf.save()
 
-            for qu in questions:
-                if y < 120:
-                    c.showPage()
-                    y = height - 50
-                y = write_line(f"Î{qu.ord}. {qu.text}", y, font="Helvetica-Bold")
-                rasp = ans_map.get(qu.id, "") or "(fără răspuns)"
-                y = write_line(f"Răspuns: {rasp}", y)
-                y -= 4
 
-            y -= 10
+def export_pdf(questionnaires: Iterable[Questionnaire]) -> bytes:
+    buffer = io.BytesIO()
+    write_pdf(questionnaires, buffer)
+    return buffer.getvalue()
 
-        y -= 10
 
-    c.save()
+def _render_pdf_part(questionnaire_id: int, since: datetime | None = None) -> bytes:
+    """PDF-ul unui singur chestionar (rulat în procesele worker din write_pdf_zip)."""
+    buffer = io.BytesIO()
+    write_pdf(Questionnaire.objects.filter(pk=questionnaire_id), buffer, since=since)
     return buffer.getvalue()
+
+
+def write_pdf_zip(
+    questionnaires: Iterable[Questionnaire],
+    fileobj: IO[bytes],
+    workers: int | None = None,
+    since: datetime | None = None,
+) -> None:
+    """Arhivă ZIP cu câte un PDF per chestionar.
+
+    Chestionarele sunt independente, așa că, pentru `workers` > 1 (implicit EXPORT_PARALLEL_WORKERS),
+    sunt randate în paralel într-un ProcessPoolExecutor; fiecare proces își deschide propria conexiune
+    la baza de date. Părțile sunt adăugate în arhivă în ordinea chestionarelor.
+    """
+    items = [(q.id, q.titlu) for q in questionnaires]
+    if workers is None:
+        workers = getattr(settings, "EXPORT_PARALLEL_WORKERS", 0)
+    workers = min(workers, len(items))
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+
+        def add_parts(parts: Iterable[bytes]) -> None:
+            for idx, ((q_id, titlu), content) in enumerate(zip(items, parts), start=1):
+                nume = slugify(titlu)[:60] or "chestionar"
+                archive.writestr(f"{idx:02d}_{nume}_{q_id}.pdf", content)
+
+        ids = [q_id for q_id, _ in items]
+        if workers > 1:
+            # "spawn": procesele noi nu moștenesc conexiunile / firele procesului web.
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            ) as pool:
+                add_parts(pool.map(_render_pdf_part, ids, repeat(since)))
+        else:
+            add_parts(map(_render_pdf_part, ids, repeat(since)))
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from portal.exports import export_csv, export_pdf, export_xlsx
+from portal.models import (
+    Answer,
+    Chapter,
+    Criterion,
+    ExpertProfile,
+    Question,
+    Questionnaire,
+    Submission,
+)
+from portal.stats import refresh_expert_scope_index, refresh_response_counters
+
+EXPORTERS = {
+    "csv": export_csv,
+    "xlsx": export_xlsx,
+    "pdf": export_pdf,
+}
+
+_WORDS = (
+    "transpunere directivă regulament capitol criteriu aliniere legislație instituție termen "
+    "acquis implementare evaluare raport comisie parlament guvern consultare expertiză impact "
+    "buget reformă administrație stat drept piață concurență mediu energie transport agricultură"
+).split()
+
+
+class Command(BaseCommand):
+    """Măsoară durata și memoria exporturilor de răspunsuri pe un set de date sintetic.
+
+    Generează N experți, M chestionare (cu câte `--questions` întrebări, asociate capitolelor și
+    criteriilor din `seed_referinte`) și câte o submisie trimisă per expert și chestionar, cu răspunsuri
+    de `--answer-length` caractere. Apoi rulează export_csv / export_xlsx / export_pdf și raportează
+    timpul (mediana din `--repeat` rulări), vârful de memorie Python (tracemalloc, într-o rulare separată),
+    numărul de interogări și dimensiunea fișierului.
+
+    Datele sintetice sunt create într-o tranzacție anulată la final (cu `--keep` rămân în baza de date):
+      python manage.py benchmark_exports
+      python manage.py benchmark_exports --experts 200 --questionnaires 10 --formats csv,xlsx --repeat 3
+      python manage.py benchmark_exports --json > inainte.json   # pentru comparații înainte / după
+    """
+
+    help = "Măsoară durata și memoria exporturilor CSV / XLSX / PDF pe un set de date sintetic."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--experts", type=int, default=50, help="Numărul de experți sintetici (implicit 50).")
+        parser.add_argument(
+            "--questionnaires", type=int, default=5, help="Numărul de chestionare sintetice (implicit 5)."
+        )
+        parser.add_argument("--questions", type=int, default=20, help="Întrebări per chestionar (implicit 20).")
+        parser.add_argument(
+            "--answer-length", type=int, default=3000, help="Lungimea fiecărui răspuns, în caractere (implicit 3000)."
+        )
+        parser.add_argument(
+            "--formats",
+            default=",".join(EXPORTERS),
+            help=f"Formatele măsurate, separate prin virgulă (implicit {','.join(EXPORTERS)}).",
+        )
+        parser.add_argument("--repeat", type=int, default=1, help="Rulări cronometrate per format (implicit 1).")
+        parser.add_argument("--seed", type=int, default=1, help="Seed pentru textul generat (implicit 1).")
+        parser.add_argument("--json", action="store_true", help="Afișează rezultatele ca JSON.")
+        parser.add_argument(
+            "--keep", action="store_true", help="Păstrează datele sintetice în baza de date (implicit sunt anulate)."
+        )
+
+    def handle(self, *args, **options):
+        formats = [f.strip() for f in options["formats"].split(",") if f.strip()]
+        unknown = [f for f in formats if f not in EXPORTERS]
+        if unknown:
+            raise CommandError(f"benchmark_exports: format necunoscut: {', '.join(unknown)}")
+        for name in ("experts", "questionnaires", "questions", "answer_length", "repeat"):
+            if options[name] < 1:
+                raise CommandError(f"benchmark_exports: --{name.replace('_', '-')} trebuie să fie cel puțin 1.")
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            questionnaires = self._seed(options)
+            seed_seconds = time.perf_counter() - started
+
+            results = [self._measure(fmt, questionnaires, options["repeat"]) for fmt in formats]
+
+            if options["keep"]:
+                refresh_response_counters([q.id for q in questionnaires])
+                # Alocările sintetice sunt create cu bulk_create, fără semnalele care întrețin indexul.
+                refresh_expert_scope_index()
+            else:
+                transaction.set_rollback(True)
+
+        dataset = {
+            "experti": options["experts"],
+            "chestionare": options["questionnaires"],
+            "intrebari": options["questions"],
+            "lungime_raspuns": options["answer_length"],
+            "submisii": options["experts"] * options["questionnaires"],
+            "raspunsuri": options["experts"] * options["questionnaires"] * options["questions"],
+            "generare_s": round(seed_seconds, 2),
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps({"date": dataset, "rezultate": results}, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(
+            "Date: {experti} experți, {chestionare} chestionare x {intrebari} întrebări, {submisii} submisii, "
+            "{raspunsuri} răspunsuri x {lungime_raspuns} caractere (generate în {generare_s}s)".format(**dataset)
+        )
+        self.stdout.write(f"{'format':<6} {'timp (s)':>10} {'min (s)':>10} {'memorie (MB)':>13} {'interogări':>11} {'fișier (KB)':>12}")
+        for row in results:
+            self.stdout.write(
+                f"{row['format']:<6} {row['timp_s']:>10.2f} {row['timp_min_s']:>10.2f} {row['memorie_mb']:>13.1f} "
+                f"{row['interogari']:>11} {row['dimensiune_kb']:>12.0f}"
+            )
+        kept = "păstrate" if options["keep"] else "anulate"
+        self.stdout.write(self.style.SUCCESS(f"benchmark_exports: {len(results)} formate măsurate (date sintetice {kept})."))
+
+    # -------------------- date sintetice --------------------
+
+    def _seed(self, options) -> list[Questionnaire]:
+        if not Chapter.objects.exists() or not Criterion.objects.exists():
+            call_command("seed_referinte", stdout=self.stdout)
+        chapters = list(Chapter.objects.order_by("numar"))
+        criteria = list(Criterion.objects.order_by("cod"))
+
+        rnd = random.Random(options["seed"])
+        now = timezone.now()
+        tag = now.strftime("%Y%m%d%H%M%S")
+        password = make_password(None)
+
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"bench_{tag}_{i:05d}",
+                    first_name="Expert",
+                    last_name=f"Benchmark {i}",
+                    email=f"bench_{tag}_{i:05d}@example.invalid",
+                    password=password,
+                )
+                for i in range(options["experts"])
+            ]
+        )
+        # SQLite / PostgreSQL întorc cheile primare la bulk_create; pentru alte backend-uri le recitim.
+        if users and users[0].pk is None:
+            users = list(User.objects.filter(username__startswith=f"bench_{tag}_").order_by("username"))
+        profiles = ExpertProfile.objects.bulk_create(
+            [
+                ExpertProfile(user=u, telefon="+373 22 000 000", organizatie="Organizație benchmark", functie="Expert")
+                for u in users
+            ]
+        )
+
+        questionnaires = []
+        for i in range(options["questionnaires"]):
+            q = Questionnaire.objects.create(
+                titlu=f"Chestionar benchmark {i + 1}",
+                descriere=self._text(rnd, 300),
+                termen_limita=now + timedelta(days=30),
+            )
+            q.capitole.set(rnd.sample(chapters, k=min(2, len(chapters))))
+            q.criterii.set(rnd.sample(criteria, k=min(1, len(criteria))))
+            questionnaires.append(q)
+
+        # Fiecare expert este alocat unui capitol, ca să apară în statistici ca un expert real.
+        ChapterLink = ExpertProfile.capitole.through
+        ChapterLink.objects.bulk_create(
+            [ChapterLink(expertprofile_id=p.pk, chapter_id=chapters[n % len(chapters)].pk) for n, p in enumerate(profiles)]
+        )
+
+        questions = Question.objects.bulk_create(
+            [
+                Question(questionnaire=q, ord=n + 1, text=f"Întrebarea {n + 1}: {self._text(rnd, 120)}")
+                for q in questionnaires
+                for n in range(options["questions"])
+            ]
+        )
+        if questions and questions[0].pk is None:
+            questions = list(Question.objects.filter(questionnaire__in=questionnaires).order_by("questionnaire_id", "ord"))
+        questions_by_q: dict[int, list[Question]] = {}
+        for question in questions:
+            questions_by_q.setdefault(question.questionnaire_id, []).append(question)
+
+        # Un set mic de texte refolosite: generarea a milioane de caractere aleatoare ar domina durata comenzii.
+        answer_texts = [self._text(rnd, options["answer_length"]) for _ in range(50)]
+        for q in questionnaires:
+            submissions = Submission.objects.bulk_create(
+                [
+                    Submission(questionnaire=q, expert=u, status=Submission.STATUS_TRIMIS, trimis_la=now)
+                    for u in users
+                ]
+            )
+            if submissions and submissions[0].pk is None:
+                submissions = list(Submission.objects.filter(questionnaire=q).order_by("expert_id"))
+            Answer.objects.bulk_create(
+                [
+                    Answer(submission=s, question=question, text=rnd.choice(answer_texts))
+                    for s in submissions
+                    for question in questions_by_q[q.pk]
+                ],
+                batch_size=1000,
+            )
+        return questionnaires
+
+    @staticmethod
+    def _text(rnd: random.Random, length: int) -> str:
+        parts: list[str] = []
+        size = 0
+        while size < length:
+            word = rnd.choice(_WORDS)
+            parts.append(word)
+            size += len(word) + 1
+        return " ".join(parts)[:length]
+
+    # -------------------- măsurători --------------------
+
+    def _measure(self, fmt: str, questionnaires: list[Questionnaire], repeat: int) -> dict:
+        exporter = EXPORTERS[fmt]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                data = exporter(questionnaires)
+            timings.append(time.perf_counter() - started)
+
+        # Rulare separată pentru memorie: tracemalloc încetinește semnificativ execuția.
+        tracemalloc.start()
+        try:
+            exporter(questionnaires)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "format": fmt,
+            "timp_s": round(statistics.median(timings), 3),
+            "timp_min_s": round(min(timings), 3),
+            "memorie_mb": round(peak / (1024 * 1024), 1),
+            "interogari": len(queries),
+            "dimensiune_kb": round(len(data) / 1024, 1),
+        }
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portal.stats import closed_questionnaire_snapshot_targets, freeze_scope_snapshots
+
+
+class Command(BaseCommand):
+    """Îngheață (în bloc) ratele de răspuns pentru chestionarele închise.
+
+    Caută toate chestionarele nearhivate cu termenul limită depășit care nu au încă snapshot
+    pentru scope-urile lor (General / capitole / foi de parcurs) și le creează dintr-o singură
+    trecere. Astfel, dashboardurile doar citesc snapshot-urile și nu plătesc costul înghețării.
+
+    Poate fi rulată oricât de des (este idempotentă), de ex. din cron la fiecare oră:
+      python manage.py freeze_snapshots
+    """
+
+    help = "Creează snapshot-urile lipsă pentru chestionarele închise (rulare periodică / cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Afișează doar câte perechi (chestionar, scope) ar fi verificate, fără a scrie în baza de date.",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        targets = closed_questionnaire_snapshot_targets()
+
+        if options["dry_run"]:
+            self.stdout.write(f"freeze_snapshots: {len(targets)} perechi (chestionar, scope) închise de verificat.")
+            return
+
+        created = freeze_scope_snapshots(targets)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"freeze_snapshots: {created} snapshot-uri create ({len(targets)} perechi verificate)."
+            )
+        )
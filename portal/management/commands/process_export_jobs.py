@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portal.export_jobs import cleanup_export_files, process_export_jobs, requeue_stale_export_jobs
+
+
+class Command(BaseCommand):
+    """Procesează exporturile de răspunsuri aflate în așteptare (ExportJob).
+
+    Folosește doar baza de date; poate rula din cron sau ca serviciu worker separat:
+      python manage.py process_export_jobs                 # procesează ce e în așteptare și iese
+      python manage.py process_export_jobs --loop          # rulează continuu (verifică la --sleep secunde)
+    Joburile „în lucru” fără semn de viață de peste --stale-minutes (worker oprit brusc) sunt repuse în așteptare,
+    iar fișierele exporturilor înlocuite sau mai vechi de --retention-days sunt șterse din storage.
+    """
+
+    help = "Generează fișierele pentru exporturile de răspunsuri aflate în așteptare."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Rulează continuu, în loc să iasă după o trecere.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Pauza (secunde) între verificări cu --loop.")
+        parser.add_argument("--limit", type=int, default=None, help="Numărul maxim de joburi procesate per trecere.")
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=30,
+            help="Repune în așteptare joburile aflate în lucru fără semn de viață de mai mult de atâtea minute.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=None,
+            help="Șterge fișierele exporturilor mai vechi de atâtea zile (implicit EXPORT_FILES_RETENTION_DAYS; 0 = fără limită).",
+        )
+
+    def handle(self, *args, **options):
+        retention_days = options["retention_days"]
+        if retention_days is None:
+            retention_days = getattr(settings, "EXPORT_FILES_RETENTION_DAYS", 7)
+        while True:
+            requeued = requeue_stale_export_jobs(options["stale_minutes"])
+            if requeued:
+                self.stdout.write(f"process_export_jobs: {requeued} joburi blocate repuse în așteptare.")
+            processed = process_export_jobs(limit=options["limit"])
+            if processed or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"process_export_jobs: {processed} exporturi procesate."))
+            removed = cleanup_export_files(retention_days)
+            if removed:
+                self.stdout.write(f"process_export_jobs: {removed} fișiere de export vechi șterse.")
+            if not options["loop"]:
+                return
+            time.sleep(options["sleep"])
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from portal.outbox import process_outbox_parallel, requeue_stale_outbound_emails
+
+
+class Command(BaseCommand):
+    """Trimite emailurile scadente din coada de trimitere (OutboundEmail).
+
+    Folosește doar baza de date; poate rula din cron sau ca serviciu worker separat:
+      python manage.py process_outbox                      # trimite ce e scadent și iese
+      python manage.py process_outbox --loop --threads 4   # rulează continuu, cu 4 fire de trimitere
+    Mesajele rămase „în lucru” peste --stale-minutes (worker oprit brusc) sunt repuse în așteptare.
+    """
+
+    help = "Trimite emailurile aflate în coada de trimitere."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Rulează continuu, în loc să iasă după o trecere.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Pauza (secunde) între verificări cu --loop.")
+        parser.add_argument("--threads", type=int, default=1, help="Numărul de fire de trimitere (implicit 1).")
+        parser.add_argument("--limit", type=int, default=None, help="Numărul maxim de mesaje trimise per trecere.")
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=30,
+            help="Repune în așteptare mesajele aflate în lucru de mai mult de atâtea minute.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale_outbound_emails(options["stale_minutes"])
+            if requeued:
+                self.stdout.write(f"process_outbox: {requeued} mesaje blocate repuse în așteptare.")
+            processed = process_outbox_parallel(options["threads"], limit=options["limit"])
+            if processed or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"process_outbox: {processed} mesaje procesate."))
+            if not options["loop"]:
+                return
+            time.sleep(options["sleep"])
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.stats import diff_expert_scope_index, refresh_expert_scope_index
+
+
+class Command(BaseCommand):
+    """Reconstruiește (sau verifică) indexul experți ↔ scope-uri (`ExpertScopeIndex`).
+
+    Indexul este întreținut de semnale la schimbarea alocărilor / stării experților. Operațiile în bloc
+    care ocolesc semnalele (ex. `bulk_create` pe tabelele de alocări, `update()` pe User) îl pot lăsa
+    în urmă; comanda îl recalculează din alocări:
+      python manage.py rebuild_expert_scope_index           # adaugă rândurile lipsă, le șterge pe cele în plus
+      python manage.py rebuild_expert_scope_index --verify  # doar compară; eroare dacă diferă
+    """
+
+    help = "Reconstruiește sau verifică indexul experți ↔ capitole / foi de parcurs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Nu modifică nimic; raportează diferențele dintre index și alocări.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["verify"]:
+            added, removed = refresh_expert_scope_index()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"rebuild_expert_scope_index: indexul a fost reconstruit ({added} rânduri adăugate, {removed} șterse)."
+                )
+            )
+            return
+
+        missing, extra = diff_expert_scope_index()
+        diffs = [f"U{row.user_id} {row.scope_key}: lipsește din index" for row in missing]
+        diffs += [f"U{user_id} {scope_key}: în plus în index" for user_id, scope_key in extra]
+
+        for line in diffs:
+            self.stdout.write(line)
+        if diffs:
+            raise CommandError(
+                f"rebuild_expert_scope_index: {len(diffs)} diferențe. "
+                "Rulați comanda fără --verify pentru a reconstrui indexul."
+            )
+        self.stdout.write(self.style.SUCCESS("rebuild_expert_scope_index: indexul este corect."))
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.models import Questionnaire, QuestionnaireScopeCounter
+from portal.stats import count_response_counters, refresh_response_counters
+
+
+class Command(BaseCommand):
+    """Reconstruiește (sau verifică) contoarele denormalizate de răspunsuri trimise.
+
+    Contoarele (`Questionnaire.nr_trimise` și `QuestionnaireScopeCounter`) sunt întreținute incremental
+    de aplicație. Comanda le renumără din Submission:
+      python manage.py rebuild_response_counters           # reconstruiește toate contoarele
+      python manage.py rebuild_response_counters --verify  # doar compară; eroare dacă diferă
+    """
+
+    help = "Reconstruiește sau verifică contoarele de răspunsuri trimise per chestionar / capitol / criteriu."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Nu modifică nimic; raportează diferențele dintre contoare și valorile renumărate.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["verify"]:
+            refresh_response_counters()
+            self.stdout.write(self.style.SUCCESS("rebuild_response_counters: contoarele au fost reconstruite."))
+            return
+
+        totals, per_scope = count_response_counters()
+
+        stored_totals = {qid: n for qid, n in Questionnaire.objects.exclude(nr_trimise=0).values_list("id", "nr_trimise")}
+        stored_scope = {
+            (qid, key): n
+            for qid, key, n in QuestionnaireScopeCounter.objects.exclude(nr_trimise=0).values_list(
+                "questionnaire_id", "scope_key", "nr_trimise"
+            )
+        }
+
+        diffs = []
+        for qid in sorted(set(totals) | set(stored_totals)):
+            if totals.get(qid, 0) != stored_totals.get(qid, 0):
+                diffs.append(f"Q{qid} total: stocat {stored_totals.get(qid, 0)}, real {totals.get(qid, 0)}")
+        for qid, key in sorted(set(per_scope) | set(stored_scope)):
+            if per_scope.get((qid, key), 0) != stored_scope.get((qid, key), 0):
+                diffs.append(
+                    f"Q{qid} {key}: stocat {stored_scope.get((qid, key), 0)}, real {per_scope.get((qid, key), 0)}"
+                )
+
+        for line in diffs:
+            self.stdout.write(line)
+        if diffs:
+            raise CommandError(
+                f"rebuild_response_counters: {len(diffs)} contoare diferă. "
+                "Rulați comanda fără --verify pentru a le reconstrui."
+            )
+        self.stdout.write(self.style.SUCCESS("rebuild_response_counters: toate contoarele sunt corecte."))
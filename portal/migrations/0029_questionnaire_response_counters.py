@@ -0,0 +1,109 @@
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    Questionnaire = apps.get_model("portal", "Questionnaire")
+    Submission = apps.get_model("portal", "Submission")
+    Counter = apps.get_model("portal", "QuestionnaireScopeCounter")
+
+    subs = Submission.objects.filter(status="TRIMIS", expert__is_active=True, expert__is_staff=False)
+
+    totals = [
+        Questionnaire(id=row["questionnaire_id"], nr_trimise=row["cnt"])
+        for row in subs.values("questionnaire_id").annotate(cnt=Count("id"))
+    ]
+    if totals:
+        Questionnaire.objects.bulk_update(totals, ["nr_trimise"], batch_size=500)
+
+    counters = []
+    for lookup, scope, prefix, field in (
+        ("expert__profil_expert__capitole", "CHAPTER", "CH", "chapter_id"),
+        ("expert__profil_expert__criterii", "CRITERION", "CR", "criterion_id"),
+    ):
+        for row in subs.values("questionnaire_id", lookup).annotate(cnt=Count("id")):
+            scope_id = row[lookup]
+            if scope_id is None:
+                continue
+            counters.append(
+                Counter(
+                    questionnaire_id=row["questionnaire_id"],
+                    scope=scope,
+                    scope_key=f"{prefix}:{scope_id}",
+                    nr_trimise=row["cnt"],
+                    **{field: scope_id},
+                )
+            )
+    if counters:
+        Counter.objects.bulk_create(counters, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portal", "0028_pna_project_multiple_scopes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="questionnaire",
+            name="nr_trimise",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="QuestionnaireScopeCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[("GENERAL", "General"), ("CHAPTER", "Capitol"), ("CRITERION", "Foaie de parcurs")],
+                        db_index=True,
+                        max_length=20,
+                    ),
+                ),
+                ("scope_key", models.CharField(max_length=64)),
+                ("nr_trimise", models.PositiveIntegerField(default=0)),
+                ("actualizat_la", models.DateTimeField(auto_now=True)),
+                (
+                    "chapter",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="questionnaire_scope_counters",
+                        to="portal.chapter",
+                    ),
+                ),
+                (
+                    "criterion",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="questionnaire_scope_counters",
+                        to="portal.criterion",
+                    ),
+                ),
+                (
+                    "questionnaire",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="scope_counters",
+                        to="portal.questionnaire",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Contor răspunsuri pe scope",
+                "verbose_name_plural": "Contoare răspunsuri pe scope",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("questionnaire", "scope_key"),
+                        name="uniq_questionnaire_scope_counter",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
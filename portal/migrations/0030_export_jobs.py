@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0029_questionnaire_response_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel (XLSX)'), ('pdf', 'PDF')], default='csv', max_length=10)),
+                ('status', models.CharField(choices=[('IN_ASTEPTARE', 'În așteptare'), ('IN_LUCRU', 'În lucru'), ('FINALIZAT', 'Finalizat'), ('ESUAT', 'Eșuat')], db_index=True, default='IN_ASTEPTARE', max_length=20)),
+                ('creat_la', models.DateTimeField(auto_now_add=True)),
+                ('inceput_la', models.DateTimeField(blank=True, null=True)),
+                ('finalizat_la', models.DateTimeField(blank=True, null=True)),
+                ('fisier', models.FileField(blank=True, upload_to='exporturi/%Y/%m/')),
+                ('nume_fisier', models.CharField(blank=True, max_length=255)),
+                ('eroare', models.TextField(blank=True)),
+                ('chestionare', models.ManyToManyField(blank=True, related_name='exporturi', to='portal.questionnaire')),
+                ('creat_de', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exporturi_create', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Export răspunsuri',
+                'verbose_name_plural': 'Exporturi răspunsuri',
+                'ordering': ['-creat_la'],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0031_export_job_pdf_zip'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selectie', models.CharField(max_length=40)),
+                ('exportat_la', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Reper export incremental',
+                'verbose_name_plural': 'Repere export incremental',
+            },
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='modificate_dupa',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['updated_at'], name='answer_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['questionnaire', 'status', 'actualizat_la'], name='submission_q_status_upd_idx'),
+        ),
+        migrations.AddField(
+            model_name='exportwatermark',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_watermarks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='exportwatermark',
+            constraint=models.UniqueConstraint(fields=('user', 'selectie'), name='uniq_export_watermark_user_selectie'),
+        ),
+    ]
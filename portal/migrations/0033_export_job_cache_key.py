@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0032_incremental_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='selectie',
+            field=models.CharField(blank=True, db_index=True, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='versiune',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0033_export_job_cache_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tip', models.CharField(choices=[('CHESTIONAR_NOU', 'Chestionar nou'), ('NEWSLETTER', 'Newsletter')], max_length=20)),
+                ('status', models.CharField(choices=[('IN_ASTEPTARE', 'În așteptare'), ('IN_LUCRU', 'În lucru'), ('TRIMIS', 'Trimis'), ('ESUAT', 'Eșuat')], default='IN_ASTEPTARE', max_length=20)),
+                ('destinatar', models.EmailField(max_length=254)),
+                ('subiect', models.CharField(max_length=500)),
+                ('corp_text', models.TextField()),
+                ('corp_html', models.TextField(blank=True)),
+                ('creat_la', models.DateTimeField(auto_now_add=True)),
+                ('incercari', models.PositiveSmallIntegerField(default=0)),
+                ('urmatoarea_incercare_la', models.DateTimeField(default=django.utils.timezone.now)),
+                ('lot', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('inceput_la', models.DateTimeField(blank=True, null=True)),
+                ('trimis_la', models.DateTimeField(blank=True, null=True)),
+                ('eroare', models.TextField(blank=True)),
+                ('newsletter', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emailuri', to='portal.newsletter')),
+                ('questionnaire', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emailuri', to='portal.questionnaire')),
+            ],
+            options={
+                'verbose_name': 'Email în coadă',
+                'verbose_name_plural': 'Emailuri în coadă',
+                'ordering': ['-creat_la'],
+                'indexes': [models.Index(fields=['status', 'urmatoarea_incercare_la'], name='outbound_email_queue_idx')],
+            },
+        ),
+    ]
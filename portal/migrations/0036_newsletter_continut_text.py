@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+def backfill_continut_text(apps, schema_editor):
+    from portal.textutils import newsletter_text_to_plain
+
+    Newsletter = apps.get_model("portal", "Newsletter")
+    newsletters = list(Newsletter.objects.only("id", "continut"))
+    for nl in newsletters:
+        nl.continut_text = newsletter_text_to_plain(nl.continut or "")
+    if newsletters:
+        Newsletter.objects.bulk_update(newsletters, ["continut_text"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portal", "0035_outbound_email_recipient"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newsletter",
+            name="continut_text",
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(backfill_continut_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_expert_scope_index(apps, schema_editor):
+    ExpertProfile = apps.get_model("portal", "ExpertProfile")
+    ExpertScopeIndex = apps.get_model("portal", "ExpertScopeIndex")
+    rows = []
+    for prefix, through, id_field in (
+        ("CH", ExpertProfile.capitole.through, "chapter_id"),
+        ("CR", ExpertProfile.criterii.through, "criterion_id"),
+    ):
+        for user_id, scope_id in through.objects.filter(
+            expertprofile__arhivat=False,
+            expertprofile__user__is_active=True,
+            expertprofile__user__is_staff=False,
+        ).values_list("expertprofile__user_id", id_field):
+            rows.append(ExpertScopeIndex(user_id=user_id, scope_key=f"{prefix}:{scope_id}", **{id_field: scope_id}))
+    ExpertScopeIndex.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0036_newsletter_continut_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpertScopeIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope_key', models.CharField(max_length=64)),
+                ('chapter', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portal.chapter')),
+                ('criterion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portal.criterion')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scope_index', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Index expert – scope',
+                'verbose_name_plural': 'Index experți – scope-uri',
+                'constraints': [models.UniqueConstraint(fields=('scope_key', 'user'), name='uniq_expert_scope_index')],
+            },
+        ),
+        migrations.RunPython(backfill_expert_scope_index, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,7 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 
 class Cluster(models.Model):
@@ -166,6 +167,10 @@ class Questionnaire(models.Model):
     arhivat = models.BooleanField(default=False)
     arhivat_la = models.DateTimeField(null=True, blank=True)
 
+    # Contor denormalizat: răspunsuri trimise (TRIMIS) de experții activi.
+    # Întreținut de stats.py; vezi și QuestionnaireScopeCounter.
+    nr_trimise = models.PositiveIntegerField(default=0, editable=False)
+
 
     class Meta:
         verbose_name = "Chestionar"
@@ -285,6 +290,93 @@ class QuestionnaireScopeSnapshot(models.Model):
         return super().save(*args, **kwargs)
 
 
+class QuestionnaireScopeCounter(models.Model):
+    """Contor denormalizat: răspunsuri trimise la un chestionar, pe capitol / foaie de parcurs.
+
+    Numără submisiile TRIMIS ale experților activi (non-admin) alocați scope-ului respectiv.
+    Totalul per chestionar este păstrat în `Questionnaire.nr_trimise`.
+
+    Întreținere (vezi stats.py):
+      - incremental, în aceeași tranzacție, când o submisie trece în TRIMIS;
+      - prin renumărare, când se schimbă alocările / starea unui expert;
+      - complet, cu comanda `rebuild_response_counters` (care poate și doar verifica).
+    """
+
+    questionnaire = models.ForeignKey(
+        Questionnaire,
+        on_delete=models.CASCADE,
+        related_name="scope_counters",
+    )
+    scope = models.CharField(max_length=20, choices=QuestionnaireScopeSnapshot.SCOPE_CHOICES, db_index=True)
+    # Aceeași cheie ca la snapshot-uri: CH:<chapter_id> / CR:<criterion_id>
+    scope_key = models.CharField(max_length=64)
+
+    chapter = models.ForeignKey(
+        Chapter,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="questionnaire_scope_counters",
+    )
+    criterion = models.ForeignKey(
+        Criterion,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="questionnaire_scope_counters",
+    )
+
+    nr_trimise = models.PositiveIntegerField(default=0)
+    actualizat_la = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Contor răspunsuri pe scope"
+        verbose_name_plural = "Contoare răspunsuri pe scope"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["questionnaire", "scope_key"],
+                name="uniq_questionnaire_scope_counter",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"Contor {self.scope_key} – Q{self.questionnaire_id}: {self.nr_trimise}"
+
+
+class ExpertScopeIndex(models.Model):
+    """Index denormalizat expert ↔ scope: un rând pentru fiecare capitol / foaie de parcurs alocată.
+
+    Conține doar experții eligibili (activi, non-admin, nearhivați), deci „cine este în scope-ul X”
+    (după `scope_key`) și „ce scope-uri are expertul Y” (după `user`) se rezolvă dintr-o singură
+    interogare indexată, fără join-uri User → ExpertProfile → tabelele de alocări.
+
+    Întreținere (vezi stats.py):
+      - la schimbarea alocărilor (m2m_changed) și a stării expertului (User.is_active / is_staff,
+        ExpertProfile.arhivat), prin semnale;
+      - complet, cu comanda `rebuild_expert_scope_index` (care poate și doar verifica).
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="scope_index")
+    # Aceeași cheie ca la snapshot-uri / contoare: CH:<chapter_id> / CR:<criterion_id>
+    scope_key = models.CharField(max_length=64)
+    chapter = models.ForeignKey(Chapter, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    criterion = models.ForeignKey(Criterion, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        verbose_name = "Index expert – scope"
+        verbose_name_plural = "Index experți – scope-uri"
+        constraints = [
+            # Indexul unic începe cu scope_key: „cine este în scope-ul X” citește doar indexul.
+            models.UniqueConstraint(
+                fields=["scope_key", "user"],
+                name="uniq_expert_scope_index",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope_key} – U{self.user_id}"
+
+
 class Newsletter(models.Model):
     """Newsletter trimis către toți experții."""
 
@@ -296,6 +388,8 @@ class Newsletter(models.Model):
         )
     )
     continut_html = models.TextField(blank=True)
+    # Varianta text (fără marcaj) a conținutului, folosită în partea text/plain a emailului.
+    continut_text = models.TextField(blank=True)
 
     creat_de = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -328,20 +422,24 @@ class Newsletter(models.Model):
         return self.subiect
 
     def save(self, *args, **kwargs):
-        """Păstrează `continut_html` sincronizat cu `continut`.
+        """Păstrează `continut_html` și `continut_text` sincronizate cu `continut`.
 
         `continut_html` este folosit atât pentru previzualizarea din platformă, cât și pentru corpul HTML
-        al emailului. Îl generăm mereu din `continut` pentru a evita inconsecvențe (ex: editare din Django Admin).
+        al emailului, iar `continut_text` pentru partea text a emailului. Le generăm mereu din `continut`
+        pentru a evita inconsecvențe (ex: editare din Django Admin).
         """
         try:
-            from .textutils import newsletter_text_to_html
+            from .textutils import newsletter_text_to_html, newsletter_text_to_plain
 
             self.continut_html = newsletter_text_to_html(self.continut or "")
+            self.continut_text = newsletter_text_to_plain(self.continut or "")
         except Exception:
             # Fallback sigur: nu blocăm salvarea dacă apare o problemă de import/format.
             # În cel mai rău caz rămâne varianta existentă / goală.
             if self.continut_html is None:
                 self.continut_html = ""
+            if self.continut_text is None:
+                self.continut_text = ""
         return super().save(*args, **kwargs)
 
     @property
@@ -389,6 +487,178 @@ class ImportRun(models.Model):
         return f"{self.get_kind_display()} – {self.creat_la:%d.%m.%Y %H:%M}"
 
 
+class ExportJob(models.Model):
+    """Export de răspunsuri generat în fundal (vezi export_jobs.py).
+
+    Fișierul rezultat este salvat în storage-ul implicit (STORAGES["default"]) și poate fi descărcat
+    de mai multe ori fără a fi regenerat.
+    """
+
+    FORMAT_CSV = "csv"
+    FORMAT_XLSX = "xlsx"
+    FORMAT_PDF = "pdf"
+    FORMAT_PDF_ZIP = "pdf_zip"
+
+    FORMAT_CHOICES = [
+        (FORMAT_CSV, "CSV"),
+        (FORMAT_XLSX, "Excel (XLSX)"),
+        (FORMAT_PDF, "PDF"),
+        (FORMAT_PDF_ZIP, "PDF per chestionar (ZIP)"),
+    ]
+
+    STATUS_IN_ASTEPTARE = "IN_ASTEPTARE"
+    STATUS_IN_LUCRU = "IN_LUCRU"
+    STATUS_FINALIZAT = "FINALIZAT"
+    STATUS_ESUAT = "ESUAT"
+
+    STATUS_CHOICES = [
+        (STATUS_IN_ASTEPTARE, "În așteptare"),
+        (STATUS_IN_LUCRU, "În lucru"),
+        (STATUS_FINALIZAT, "Finalizat"),
+        (STATUS_ESUAT, "Eșuat"),
+    ]
+
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default=FORMAT_CSV)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_IN_ASTEPTARE, db_index=True)
+    chestionare = models.ManyToManyField(Questionnaire, blank=True, related_name="exporturi")
+
+    creat_de = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="exporturi_create",
+    )
+    creat_la = models.DateTimeField(auto_now_add=True)
+    inceput_la = models.DateTimeField(null=True, blank=True)
+    finalizat_la = models.DateTimeField(null=True, blank=True)
+    # Lease-ul workerului care generează fișierul (vezi export_jobs.claim_next_export_job): un token per
+    # preluare și ultimul semn de viață, reîmprospătat cât timp exportul rulează.
+    lot = models.CharField(max_length=32, blank=True)
+    heartbeat_la = models.DateTimeField(null=True, blank=True)
+
+    # Export incremental: doar submisiile / răspunsurile modificate după acest moment (None = export complet).
+    modificate_dupa = models.DateTimeField(null=True, blank=True)
+
+    # Cheia pentru refolosirea fișierului: selecția (exports.export_selection_key) și versiunea conținutului
+    # (exports.export_content_version) la momentul creării jobului.
+    selectie = models.CharField(max_length=40, blank=True, db_index=True)
+    versiune = models.CharField(max_length=100, blank=True)
+
+    fisier = models.FileField(upload_to="exporturi/%Y/%m/", blank=True)
+    nume_fisier = models.CharField(max_length=255, blank=True)
+    eroare = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Export răspunsuri"
+        verbose_name_plural = "Exporturi răspunsuri"
+        ordering = ["-creat_la"]
+
+    def __str__(self) -> str:
+        return f"Export {self.get_format_display()} – {self.creat_la:%d.%m.%Y %H:%M}"
+
+    @property
+    def este_terminat(self) -> bool:
+        return self.status in (self.STATUS_FINALIZAT, self.STATUS_ESUAT)
+
+    @property
+    def extensie(self) -> str:
+        return "zip" if self.format == self.FORMAT_PDF_ZIP else self.format
+
+
+class ExportWatermark(models.Model):
+    """Momentul ultimului export al unui utilizator pentru o anumită selecție de chestionare.
+
+    Folosit de exportul incremental: se includ doar submisiile / răspunsurile modificate după acest moment.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="export_watermarks")
+    # Hash (sha1) al ID-urilor chestionarelor selectate, sortate; vezi exports.export_selection_key.
+    selectie = models.CharField(max_length=40)
+    exportat_la = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Reper export incremental"
+        verbose_name_plural = "Repere export incremental"
+        constraints = [
+            models.UniqueConstraint(fields=("user", "selectie"), name="uniq_export_watermark_user_selectie"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} – {self.exportat_la:%d.%m.%Y %H:%M}"
+
+
+class OutboundEmail(models.Model):
+    """Email pus în coada de trimitere (outbox); trimis în fundal de outbox.py.
+
+    Fiecare mesaj are un singur destinatar și propriul status: la eroare este reîncercat după o pauză
+    crescătoare, până la EMAIL_MAX_ATTEMPTS încercări. Pentru newslettere, rândurile sunt și evidența
+    livrării per destinatar (status, încercări, ultima eroare).
+    """
+
+    TIP_CHESTIONAR_NOU = "CHESTIONAR_NOU"
+    TIP_NEWSLETTER = "NEWSLETTER"
+
+    TIP_CHOICES = [
+        (TIP_CHESTIONAR_NOU, "Chestionar nou"),
+        (TIP_NEWSLETTER, "Newsletter"),
+    ]
+
+    STATUS_IN_ASTEPTARE = "IN_ASTEPTARE"
+    STATUS_IN_LUCRU = "IN_LUCRU"
+    STATUS_TRIMIS = "TRIMIS"
+    STATUS_ESUAT = "ESUAT"
+
+    STATUS_CHOICES = [
+        (STATUS_IN_ASTEPTARE, "În așteptare"),
+        (STATUS_IN_LUCRU, "În lucru"),
+        (STATUS_TRIMIS, "Trimis"),
+        (STATUS_ESUAT, "Eșuat"),
+    ]
+
+    tip = models.CharField(max_length=20, choices=TIP_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_IN_ASTEPTARE)
+
+    destinatar = models.EmailField()
+    # Utilizatorul destinatar (dacă emailul a fost trimis unui cont din platformă).
+    destinatar_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="emailuri_primite"
+    )
+    subiect = models.CharField(max_length=500)
+    corp_text = models.TextField()
+    corp_html = models.TextField(blank=True)
+
+    # Legături opționale, pentru raportare (ex. progresul unui newsletter).
+    newsletter = models.ForeignKey(
+        Newsletter, on_delete=models.SET_NULL, null=True, blank=True, related_name="emailuri"
+    )
+    questionnaire = models.ForeignKey(
+        Questionnaire, on_delete=models.SET_NULL, null=True, blank=True, related_name="emailuri"
+    )
+
+    creat_la = models.DateTimeField(auto_now_add=True)
+    incercari = models.PositiveSmallIntegerField(default=0)
+    urmatoarea_incercare_la = models.DateTimeField(default=timezone.now)
+    # Identificatorul lotului preluat de un worker (vezi outbox.claim_outbound_emails).
+    lot = models.CharField(max_length=32, blank=True, db_index=True)
+    inceput_la = models.DateTimeField(null=True, blank=True)
+    trimis_la = models.DateTimeField(null=True, blank=True)
+    eroare = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Email în coadă"
+        verbose_name_plural = "Emailuri în coadă"
+        ordering = ["-creat_la"]
+        indexes = [
+            models.Index(fields=["status", "urmatoarea_incercare_la"], name="outbound_email_queue_idx"),
+            # Livrările unui newsletter, pe status (raport / retrimitere doar către eșuate).
+            models.Index(fields=["newsletter", "status"], name="outbound_email_nl_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.destinatar} – {self.subiect[:60]}"
+
+
 class Question(models.Model):
     questionnaire = models.ForeignKey(Questionnaire, on_delete=models.CASCADE, related_name="intrebari")
     ord = models.PositiveSmallIntegerField()
@@ -426,6 +696,10 @@ class Submission(models.Model):
         verbose_name_plural = "Răspunsuri (seturi)"
         unique_together = ("questionnaire", "expert")
         ordering = ["-actualizat_la"]
+        indexes = [
+            # Exportul incremental: submisiile unui chestionar modificate după un moment dat.
+            models.Index(fields=["questionnaire", "status", "actualizat_la"], name="submission_q_status_upd_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.expert} → {self.questionnaire}"
@@ -460,6 +734,10 @@ class Answer(models.Model):
         verbose_name = "Răspuns"
         verbose_name_plural = "Răspunsuri"
         unique_together = ("submission", "question")
+        indexes = [
+            # Exportul incremental: răspunsurile modificate după un moment dat.
+            models.Index(fields=["updated_at"], name="answer_updated_at_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.submission_id}:{self.question_id}"
@@ -657,6 +935,31 @@ class EUAct(models.Model):
         return f"https://eur-lex.europa.eu/legal-content/RO/TXT/?uri=CELEX:{self.celex_curat}"
 
 
+def attach_pna_scope_ids(projects) -> None:
+    """Setează ID-urile de scope (memoizate) pe proiectele date, din tabelele M2M.
+
+    Două interogări pe tabelele de legătură, oricâte proiecte – pentru listele care au nevoie
+    doar de ID-urile capitolelor / foilor de parcurs, fără prefetch pe obiecte.
+    """
+    projects = [p for p in projects if p.pk]
+    if not projects:
+        return
+    ids = [p.pk for p in projects]
+    chapters = {}
+    for project_id, chapter_id in PnaProject.chapters.through.objects.filter(pnaproject_id__in=ids).values_list(
+        "pnaproject_id", "chapter_id"
+    ):
+        chapters.setdefault(project_id, set()).add(chapter_id)
+    criteria = {}
+    for project_id, criterion_id in PnaProject.criteria.through.objects.filter(pnaproject_id__in=ids).values_list(
+        "pnaproject_id", "criterion_id"
+    ):
+        criteria.setdefault(project_id, set()).add(criterion_id)
+    for p in projects:
+        p.__dict__["scope_chapter_ids"] = frozenset(chapters.get(p.pk) or ([p.chapter_id] if p.chapter_id else []))
+        p.__dict__["scope_criterion_ids"] = frozenset(criteria.get(p.pk) or ([p.criterion_id] if p.criterion_id else []))
+
+
 class PnaProject(models.Model):
     """Unitate logică din PNA monitorizată în platformă ("proiect de lege").
 
@@ -899,6 +1202,20 @@ class PnaProject(models.Model):
             return selected
         return [self.criterion] if self.criterion_id and self.criterion else []
 
+    # ID-urile de scope sunt calculate o singură dată per obiect (memoizate); se resetează din
+    # signals.py când se modifică capitolele / foile de parcurs ale proiectului.
+    @cached_property
+    def scope_chapter_ids(self) -> frozenset:
+        return frozenset(ch.id for ch in self.scope_chapters() if ch and ch.id)
+
+    @cached_property
+    def scope_criterion_ids(self) -> frozenset:
+        return frozenset(cr.id for cr in self.scope_criteria() if cr and cr.id)
+
+    def reset_scope_ids(self) -> None:
+        self.__dict__.pop("scope_chapter_ids", None)
+        self.__dict__.pop("scope_criterion_ids", None)
+
     @property
     def atasare_label(self) -> str:
         labels = [f"Cap. {ch.numar} – {ch.denumire}" for ch in self.scope_chapters()]
@@ -1,20 +1,38 @@
+"""Notificările pe email ale platformei.
+
+Funcțiile de aici doar pregătesc mesajele (câte unul per expert) și le pun în coada de trimitere
+(OutboundEmail, vezi outbox.py); trimiterea propriu-zisă se face în fundal.
+"""
+
 from __future__ import annotations
 
-import logging
 from typing import Iterable, Tuple
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.mail import EmailMessage
-from django.core.mail import EmailMultiAlternatives
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.template.loader import get_template
 from django.urls import reverse
 from django.utils import timezone
 
-from .models import Questionnaire, Newsletter
+from .models import Questionnaire, Newsletter, OutboundEmail
+from .outbox import enqueue_emails, requeue_failed_emails
+from .stats import experts_in_scopes
+
+
+# Marcaj pentru salutul personalizat, înlocuit per destinatar în corpul randat o singură dată.
+_SALUT_PLACEHOLDER = "\x00salut\x00"
 
 
-logger = logging.getLogger(__name__)
+def render_email_template(template_name: str, context: dict) -> str:
+    """Randează un șablon de email din templates/portal/emails/.
+
+    Șabloanele sunt compilate o singură dată per proces (loader-ul cu cache al Django), deci costul per
+    trimitere este doar randarea.
+    """
+    return get_template(template_name).render(context).strip()
 
 
 def _build_expert_questionnaire_url(base_url: str, questionnaire_id: int) -> str:
@@ -45,29 +63,24 @@ def _expert_recipients_for_questionnaire(q: Questionnaire) -> Iterable[User]:
     if getattr(q, "este_general", False):
         return base_qs.order_by("last_name", "first_name").distinct()
 
-    chapters = list(q.capitole.all())
-    criteria = list(q.criterii.all())
+    chapter_ids = list(q.capitole.values_list("id", flat=True))
+    criterion_ids = list(q.criterii.values_list("id", flat=True))
 
-    if not chapters and not criteria:
+    if not chapter_ids and not criterion_ids:
         return base_qs.none()
 
-    return (
-        base_qs.filter(
-            Q(profil_expert__capitole__in=chapters) | Q(profil_expert__criterii__in=criteria)
-        )
-        .distinct()
-        .order_by("last_name", "first_name")
-    )
+    # Subinterogarea pe index nu dublează experții (fără distinct()).
+    return base_qs.filter(id__in=experts_in_scopes(chapter_ids, criterion_ids)).order_by("last_name", "first_name")
 
 
-def send_new_questionnaire_emails(
+def queue_new_questionnaire_emails(
     questionnaire: Questionnaire,
     *,
     request_base_url: str | None = None,
-) -> Tuple[int, int]:
-    """Trimite emailuri individuale către experții relevanți când se creează un chestionar nou.
+) -> int:
+    """Pune în coada de trimitere emailurile individuale către experții relevanți pentru un chestionar nou.
 
-    Returnează (nr_trimise_cu_succes, nr_esecuri).
+    Returnează numărul de emailuri puse în coadă.
     """
     base_url = _get_site_base_url(request_base_url)
     link = _build_expert_questionnaire_url(base_url, questionnaire.id)
@@ -97,49 +110,35 @@ def send_new_questionnaire_emails(
 
     subject = f"[CIE] Chestionar nou: {questionnaire.titlu}".strip()
 
-    ok = 0
-    fail = 0
+    # Corpul este randat o singură dată; per destinatar se înlocuiește doar salutul.
+    body = render_email_template(
+        "portal/emails/chestionar_nou.txt",
+        {
+            "salut": _SALUT_PLACEHOLDER,
+            "titlu": questionnaire.titlu,
+            "context_txt": context_txt,
+            "descriere": descriere,
+            "termen": termen_txt,
+            "link": link,
+        },
+    )
 
+    emails = []
     for u in _expert_recipients_for_questionnaire(questionnaire):
-        try:
-            nume = (u.get_full_name() or u.username or "").strip()
-            salut = f"Bună {nume}," if nume else "Bună,"
-
-            lines = [
-                salut,
-                "",
-                "A fost creat un chestionar nou în platformă.",
-                "",
-                f"Titlu: {questionnaire.titlu}",
-            ]
-            if context_txt:
-                lines.append(context_txt)
-            if descriere:
-                lines.extend(["", f"Descriere: {descriere}"])
-            lines.extend(
-                [
-                    "",
-                    f"Termen limită: {termen_txt}",
-                    f"Link către chestionar: {link}",
-                    "",
-                    "Mulțumim,",
-                    "Echipa Comisiei pentru integrare europeană",
-                ]
-            )
-
-            msg = EmailMessage(
-                subject=subject,
-                body="\n".join(lines),
-                from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None) or None,
-                to=[u.email],
+        nume = (u.get_full_name() or u.username or "").strip()
+        salut = f"Bună {nume}," if nume else "Bună,"
+        emails.append(
+            OutboundEmail(
+                tip=OutboundEmail.TIP_CHESTIONAR_NOU,
+                destinatar=u.email,
+                destinatar_user=u,
+                subiect=subject,
+                corp_text=body.replace(_SALUT_PLACEHOLDER, salut, 1),
+                questionnaire=questionnaire,
             )
-            msg.send(fail_silently=False)
-            ok += 1
-        except Exception as e:
-            fail += 1
-            logger.exception("Eroare trimitere email pentru chestionar %s către %s: %s", questionnaire.id, getattr(u, "email", ""), e)
+        )
 
-    return ok, fail
+    return enqueue_emails(emails)
 
 
 def _build_expert_newsletter_url(base_url: str, newsletter_id: int) -> str:
@@ -148,73 +147,66 @@ def _build_expert_newsletter_url(base_url: str, newsletter_id: int) -> str:
     return f"{base}{path}" if base else path
 
 
-def send_newsletter_emails(
-    newsletter: Newsletter,
-    *,
-    request_base_url: str | None = None,
-) -> Tuple[int, int]:
-    """Trimite un newsletter către toți experții activi (un email per expert).
+def newsletter_recipients():
+    """Destinatarii unui newsletter: experții activi cu email."""
+    return User.objects.filter(is_staff=False, is_active=True).exclude(email="").order_by("last_name", "first_name").distinct()
 
-    Returnează (nr_trimise_cu_succes, nr_esecuri).
-    """
-    base_url = _get_site_base_url(request_base_url)
-    link = _build_expert_newsletter_url(base_url, newsletter.id)
 
-    subject = f"[CIE] Newsletter: {newsletter.subiect}".strip()
+def _newsletter_bodies(newsletter: Newsletter, base_url: str) -> Tuple[str, str, str]:
+    """(subiect, text, html) pentru emailul unui newsletter (același pentru toți destinatarii).
 
-    # Lista destinatari
-    recipients = User.objects.filter(is_staff=False, is_active=True).exclude(email="").order_by("last_name", "first_name").distinct()
-
-    ok = 0
-    fail = 0
-
-    # Body text (fallback)
-    plain_lines = [
-        "Bună,",
-        "",
-        "Ai primit un newsletter nou în platforma experților.",
-        "",
-        f"Subiect: {newsletter.subiect}",
-        "",
-        (newsletter.continut or "").strip(),
-        "",
-        f"Vezi online: {link}",
-        "",
-        "Mulțumim,",
-        "Echipa Comisiei pentru integrare europeană",
-    ]
-    plain_body = "\n".join([l for l in plain_lines if l is not None])
-
-    # HTML body
-    html_body = f"""
-    <div style='font-family: Onest, Arial, sans-serif; font-size: 14px; line-height: 1.5;'>
-      <p>Bună,</p>
-      <p>Ai primit un newsletter nou în platforma experților.</p>
-      <h3 style='margin: 12px 0 8px 0;'>{newsletter.subiect}</h3>
-      <div style='margin: 8px 0 16px 0;'>{newsletter.continut_html or ''}</div>
-      <p style='margin-top: 16px;'>Vezi online: <a href='{link}' target='_blank' rel='noopener noreferrer'>{link}</a></p>
-      <p style='margin-top: 16px;'>Mulțumim,<br>Echipa Comisiei pentru integrare europeană</p>
-    </div>
+    Ambele variante folosesc conținutul deja convertit și salvat pe newsletter (`continut_text`,
+    `continut_html`).
     """
+    context = {
+        "subiect": newsletter.subiect,
+        "continut_text": newsletter.continut_text,
+        "continut_html": newsletter.continut_html,
+        "link": _build_expert_newsletter_url(base_url, newsletter.id),
+    }
+    subject = f"[CIE] Newsletter: {newsletter.subiect}".strip()
+    return (
+        subject,
+        render_email_template("portal/emails/newsletter.txt", context),
+        render_email_template("portal/emails/newsletter.html", context),
+    )
 
-    for u in recipients:
-        try:
-            msg = EmailMultiAlternatives(
-                subject=subject,
-                body=plain_body,
-                from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None) or None,
-                to=[u.email],
-            )
-            msg.attach_alternative(html_body, "text/html")
-            msg.send(fail_silently=False)
-            ok += 1
-        except Exception as e:
-            fail += 1
-            logger.exception(
-                "Eroare trimitere newsletter %s către %s: %s",
-                newsletter.id,
-                getattr(u, "email", ""),
-                e,
-            )
 
-    return ok, fail
+def queue_newsletter_emails(newsletter: Newsletter, user, *, request_base_url: str | None = None) -> int:
+    """Marchează newsletterul ca trimis și pune în coadă câte un email per expert activ.
+
+    Newsletterul este marcat imediat (nu poate fi trimis de două ori); contoarele `nr_trimise` / `nr_esecuri`
+    cresc pe măsură ce mesajele sunt trimise din coadă. Returnează numărul de destinatari.
+    """
+    subject, plain_body, html_body = _newsletter_bodies(newsletter, _get_site_base_url(request_base_url))
+    emails = [
+        OutboundEmail(
+            tip=OutboundEmail.TIP_NEWSLETTER,
+            destinatar=email,
+            destinatar_user_id=user_id,
+            subiect=subject,
+            corp_text=plain_body,
+            corp_html=html_body,
+            newsletter=newsletter,
+        )
+        for user_id, email in newsletter_recipients().values_list("pk", "email")
+    ]
+
+    with transaction.atomic():
+        newsletter.trimis_la = timezone.now()
+        newsletter.trimis_de = user
+        newsletter.nr_destinatari = len(emails)
+        newsletter.nr_trimise = 0
+        newsletter.nr_esecuri = 0
+        newsletter.save(update_fields=["trimis_la", "trimis_de", "nr_destinatari", "nr_trimise", "nr_esecuri"])
+        enqueue_emails(emails)
+    return newsletter.nr_destinatari
+
+
+def resend_failed_newsletter_emails(newsletter: Newsletter) -> int:
+    """Repune în coadă doar emailurile eșuate ale newsletterului; returnează câte au fost repuse."""
+    with transaction.atomic():
+        requeued = requeue_failed_emails(OutboundEmail.objects.filter(newsletter=newsletter))
+        if requeued:
+            Newsletter.objects.filter(pk=newsletter.pk).update(nr_esecuri=Greatest(F("nr_esecuri") - requeued, 0))
+    return requeued
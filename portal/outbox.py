@@ -0,0 +1,263 @@
+"""Coada de emailuri (outbox).
+
+Cererile HTTP nu trimit emailuri: le pun în OutboundEmail (`enqueue_emails`), iar mesajele sunt trimise de un
+worker care folosește doar baza de date:
+  - implicit, un fir de execuție din procesul web, pornit după commit (OUTBOX_IN_PROCESS=true);
+  - sau comanda `python manage.py process_outbox` (cron / serviciu worker separat, cu --threads fire).
+
+Workerul din proces pornește și la prima cerere HTTP după (re)pornirea procesului web: repune în așteptare
+mesajele rămase „în lucru” de peste OUTBOX_STALE_MINUTES și trimite ce a devenit scadent între timp
+(temporizatorul reîncercărilor nu supraviețuiește unei reporniri).
+
+Un worker preia un lot de EMAIL_BATCH_SIZE mesaje (UPDATE condiționat pe status, marcat cu un identificator de
+lot, deci mai mulți workeri pot rula în paralel) și îl trimite pe o singură conexiune SMTP. Un mesaj eșuat este
+reprogramat după EMAIL_RETRY_DELAY x 2^(n-1) secunde, până la EMAIL_MAX_ATTEMPTS încercări; apoi rămâne „Eșuat”.
+"""
+
+import logging
+import smtplib
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Newsletter, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_emails(emails: Iterable[OutboundEmail]) -> int:
+    """Salvează mesajele în coadă și (cu OUTBOX_IN_PROCESS) pornește trimiterea după commit."""
+    created = OutboundEmail.objects.bulk_create(list(emails), batch_size=500)
+    if created and getattr(settings, "OUTBOX_IN_PROCESS", True):
+        transaction.on_commit(start_outbox_worker)
+    return len(created)
+
+
+def claim_outbound_emails(limit: Optional[int] = None) -> List[OutboundEmail]:
+    """Preia (marcate ca în lucru) cel mult `limit` mesaje scadente; listă goală dacă nu există."""
+    limit = limit or getattr(settings, "EMAIL_BATCH_SIZE", 50)
+    while True:
+        now = timezone.now()
+        ids = list(
+            OutboundEmail.objects.filter(status=OutboundEmail.STATUS_IN_ASTEPTARE, urmatoarea_incercare_la__lte=now)
+            .order_by("urmatoarea_incercare_la", "pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        lot = uuid.uuid4().hex
+        claimed = OutboundEmail.objects.filter(pk__in=ids, status=OutboundEmail.STATUS_IN_ASTEPTARE).update(
+            status=OutboundEmail.STATUS_IN_LUCRU, lot=lot, inceput_la=now
+        )
+        if claimed:
+            return list(OutboundEmail.objects.filter(lot=lot, status=OutboundEmail.STATUS_IN_LUCRU).order_by("pk"))
+        # Preluate între timp de alt worker: încercăm din nou.
+
+
+def _build_message(email: OutboundEmail) -> EmailMultiAlternatives:
+    msg = EmailMultiAlternatives(
+        subject=email.subiect,
+        body=email.corp_text,
+        from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None) or None,
+        to=[email.destinatar],
+    )
+    if email.corp_html:
+        msg.attach_alternative(email.corp_html, "text/html")
+    return msg
+
+
+def _record_failure(email: OutboundEmail, error: Exception, permanent: bool = False) -> bool:
+    """Notează eroarea și reprogramează mesajul; întoarce True dacă mesajul a eșuat definitiv."""
+    email.eroare = f"{type(error).__name__}: {error}"[:2000]
+    if permanent or email.incercari >= getattr(settings, "EMAIL_MAX_ATTEMPTS", 5):
+        email.status = OutboundEmail.STATUS_ESUAT
+        logger.warning("Email #%s către %s eșuat definitiv: %s", email.pk, email.destinatar, email.eroare)
+        return True
+    delay = getattr(settings, "EMAIL_RETRY_DELAY", 60) * 2 ** (email.incercari - 1)
+    email.status = OutboundEmail.STATUS_IN_ASTEPTARE
+    email.urmatoarea_incercare_la = timezone.now() + timedelta(seconds=delay)
+    logger.warning("Email #%s către %s reprogramat peste %ss: %s", email.pk, email.destinatar, delay, email.eroare)
+    return False
+
+
+def deliver_outbound_emails(emails: List[OutboundEmail]) -> Tuple[int, int]:
+    """Trimite un lot preluat pe o singură conexiune și salvează statusul fiecărui mesaj.
+
+    Returnează (nr_trimise, nr_esuate_definitiv); mesajele reprogramate nu sunt numărate.
+    """
+    sent = Counter()
+    failed = Counter()
+    connection = None
+    try:
+        for idx, email in enumerate(emails):
+            email.incercari += 1
+            try:
+                if connection is None:
+                    connection = get_connection(fail_silently=False)
+                    connection.open()
+                connection.send_messages([_build_message(email)])
+            except smtplib.SMTPRecipientsRefused as e:
+                # Adresă respinsă de server: eroare permanentă, doar pentru acest mesaj.
+                if _record_failure(email, e, permanent=True):
+                    failed[email.newsletter_id] += 1
+            except Exception as e:
+                # Conexiune căzută / server indisponibil: o redeschidem pentru următorul mesaj.
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                    connection = None
+                if _record_failure(email, e):
+                    failed[email.newsletter_id] += 1
+            else:
+                email.status = OutboundEmail.STATUS_TRIMIS
+                email.trimis_la = timezone.now()
+                email.eroare = ""
+                sent[email.newsletter_id] += 1
+            email.save(update_fields=["status", "incercari", "urmatoarea_incercare_la", "trimis_la", "eroare"])
+    finally:
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    # Progresul newsletterelor (lista de newslettere afișează trimise / eșecuri).
+    for newsletter_id in (set(sent) | set(failed)) - {None}:
+        Newsletter.objects.filter(pk=newsletter_id).update(
+            nr_trimise=F("nr_trimise") + sent[newsletter_id], nr_esecuri=F("nr_esecuri") + failed[newsletter_id]
+        )
+    return sum(sent.values()), sum(failed.values())
+
+
+def process_outbox(limit: Optional[int] = None) -> int:
+    """Trimite loturi din coadă până la golire (sau `limit` mesaje); întoarce numărul de mesaje procesate."""
+    processed = 0
+    while limit is None or processed < limit:
+        batch_size = getattr(settings, "EMAIL_BATCH_SIZE", 50)
+        if limit is not None:
+            batch_size = min(batch_size, limit - processed)
+        emails = claim_outbound_emails(batch_size)
+        if not emails:
+            break
+        deliver_outbound_emails(emails)
+        processed += len(emails)
+    return processed
+
+
+def _process_in_thread(limit: Optional[int] = None) -> int:
+    close_old_connections()
+    try:
+        return process_outbox(limit=limit)
+    except Exception:
+        logger.exception("Procesarea cozii de emailuri a eșuat")
+        return 0
+    finally:
+        connections.close_all()
+
+
+def process_outbox_parallel(threads: int, limit: Optional[int] = None) -> int:
+    """Golește coada cu `threads` fire de execuție (fiecare cu loturile și conexiunea SMTP proprii)."""
+    if threads <= 1:
+        return process_outbox(limit=limit)
+    per_thread = None if limit is None else max(1, limit // threads)
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="outbox") as pool:
+        return sum(pool.map(lambda _: _process_in_thread(per_thread), range(threads)))
+
+
+def requeue_stale_outbound_emails(minutes: int) -> int:
+    """Repune în așteptare mesajele rămase „în lucru” mai mult de `minutes` (ex. worker oprit brusc)."""
+    limit = timezone.now() - timedelta(minutes=minutes)
+    return OutboundEmail.objects.filter(status=OutboundEmail.STATUS_IN_LUCRU, inceput_la__lt=limit).update(
+        status=OutboundEmail.STATUS_IN_ASTEPTARE, lot="", inceput_la=None
+    )
+
+
+def requeue_failed_emails(emails) -> int:
+    """Repune în așteptare (cu încercările resetate) mesajele eșuate din queryset-ul dat, printr-un singur UPDATE.
+
+    Ultima eroare rămâne vizibilă până la următoarea încercare. Returnează numărul de mesaje repuse în coadă.
+    """
+    requeued = emails.filter(status=OutboundEmail.STATUS_ESUAT).update(
+        status=OutboundEmail.STATUS_IN_ASTEPTARE,
+        incercari=0,
+        urmatoarea_incercare_la=timezone.now(),
+        lot="",
+        inceput_la=None,
+    )
+    if requeued and getattr(settings, "OUTBOX_IN_PROCESS", True):
+        transaction.on_commit(start_outbox_worker)
+    return requeued
+
+
+# Un singur fir per proces: trimiterile din procesul web nu concurează între ele pentru conexiuni SMTP.
+_executor: Optional[ThreadPoolExecutor] = None
+# Temporizatorul (daemon) care repornește workerul la scadența următoarei reîncercări.
+_retry_timer: Optional[threading.Timer] = None
+_retry_lock = threading.Lock()
+
+
+def _schedule_next_run() -> None:
+    global _retry_timer
+    next_at = (
+        OutboundEmail.objects.filter(status=OutboundEmail.STATUS_IN_ASTEPTARE)
+        .order_by("urmatoarea_incercare_la")
+        .values_list("urmatoarea_incercare_la", flat=True)
+        .first()
+    )
+    if next_at is None:
+        return
+    delay = max(1.0, (next_at - timezone.now()).total_seconds())
+    with _retry_lock:
+        if _retry_timer is not None and _retry_timer.is_alive():
+            _retry_timer.cancel()
+        _retry_timer = threading.Timer(delay, start_outbox_worker)
+        _retry_timer.daemon = True
+        _retry_timer.start()
+
+
+def _process_in_process() -> None:
+    close_old_connections()
+    try:
+        requeued = requeue_stale_outbound_emails(getattr(settings, "OUTBOX_STALE_MINUTES", 30))
+        if requeued:
+            logger.warning("%s emailuri rămase în lucru au fost repuse în așteptare", requeued)
+    except Exception:
+        logger.exception("Repunerea în așteptare a emailurilor blocate a eșuat")
+    _process_in_thread()
+    try:
+        _schedule_next_run()
+    except Exception:
+        logger.exception("Programarea reîncercărilor din coada de emailuri a eșuat")
+    finally:
+        connections.close_all()
+
+
+def start_outbox_worker() -> None:
+    """Pornește (în firul de fundal al procesului) trimiterea mesajelor scadente din coadă."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+    _executor.submit(_process_in_process)
+
+
+_started = False
+
+
+def start_outbox_worker_on_first_request(sender=None, **kwargs) -> None:
+    """Receptor `request_started`: o singură trecere a workerului după pornirea procesului web."""
+    global _started
+    if _started or not getattr(settings, "OUTBOX_IN_PROCESS", True):
+        return
+    _started = True
+    start_outbox_worker()
@@ -0,0 +1,578 @@
+"""Agregarea dashboard-ului PNA într-o singură trecere peste proiecte.
+
+Fiecare widget al dashboard-ului are un acumulator (`PnaAccumulator`): primește proiectele unul câte
+unul prin `add()` și își produce rezultatul la final prin `result()`. `run_pna_pipeline` parcurge lista
+de proiecte o singură dată și alimentează toți acumulatorii înregistrați, astfel încât costul rămâne
+liniar în numărul de proiecte (fără liste refiltrate per capitol / foaie de parcurs).
+
+Capitolele / foile de parcurs ale fiecărui proiect sunt rezolvate o singură dată, în `PnaDashboardItem`.
+Acumulatorii produc doar date; URL-urile și etichetele pentru template se construiesc în views.py.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Sequence
+
+from .models import PnaProject
+
+PNA_STAGE_GROUP_NEINITIATE = [PnaProject.STATUS_NEINITIAT]
+PNA_STAGE_GROUP_GUVERN = [
+    PnaProject.STATUS_INITIAT_GUVERN,
+    PnaProject.STATUS_AVIZARE_GUVERN,
+    PnaProject.STATUS_COORDONARE_CE,
+    PnaProject.STATUS_APROBARE_GUVERN,
+]
+PNA_STAGE_GROUP_PARLAMENT = [
+    PnaProject.STATUS_INITIAT_PARLAMENT,
+    PnaProject.STATUS_AVIZARE_PARLAMENT,
+    PnaProject.STATUS_ADOPTAT_PRIMA_LECTURA,
+]
+PNA_STAGE_GROUP_FINAL = [PnaProject.STATUS_ADOPTAT_FINAL]
+PNA_STAGE_PRE_PARLAMENT = PNA_STAGE_GROUP_NEINITIATE + PNA_STAGE_GROUP_GUVERN
+
+# Valorile acceptate pentru filtrul `stage` din listele / dashboard-ul PNA.
+PNA_STAGE_FILTERS = ("neinitiate", "guvern", "parlament", "adoptat_final")
+
+PNA_COST_YEARS = (2026, 2027, 2028, 2029)
+
+
+def pna_stage_bucket(status_code: str) -> str:
+    """Grupa de etapă (coloanele din tabelele de resurse) pentru un status de implementare."""
+    if status_code in PNA_STAGE_GROUP_NEINITIATE:
+        return "neinitiate"
+    if status_code in PNA_STAGE_GROUP_GUVERN:
+        return "guvern"
+    if status_code in PNA_STAGE_GROUP_PARLAMENT:
+        return "parlament"
+    if status_code in PNA_STAGE_GROUP_FINAL:
+        return "adoptat"
+    return "other"
+
+
+def _months_diff(d1, d2) -> int:
+    """Diferență aproximativă în luni între două date (bazată pe an/lună)."""
+    if not d1 or not d2:
+        return 0
+    return (d2.year - d1.year) * 12 + (d2.month - d1.month)
+
+
+@dataclass
+class PnaDashboardItem:
+    """Un proiect pregătit pentru agregare (scope și flag-uri de contribuții rezolvate o singură dată)."""
+
+    project: PnaProject
+    chapter_ids: frozenset
+    criterion_ids: frozenset
+    deadline: date | None
+    has_f: bool = False
+    has_c: bool = False
+    has_t: bool = False
+    has_any: bool = False
+
+    @property
+    def has_all(self) -> bool:
+        return self.has_f and self.has_c and self.has_t
+
+
+class PnaAccumulator(ABC):
+    """Acumulator pentru un widget al dashboard-ului PNA."""
+
+    name = ""
+
+    @abstractmethod
+    def add(self, item: PnaDashboardItem) -> None:
+        """Adaugă un proiect la agregat."""
+
+    @abstractmethod
+    def result(self) -> Any:
+        """Rezultatul agregat, pus în contextul dashboard-ului sub `name`."""
+
+
+def run_pna_pipeline(items: Iterable[PnaDashboardItem], accumulators: Sequence[PnaAccumulator]) -> Dict[str, Any]:
+    """Parcurge proiectele o singură dată și returnează {acumulator.name: acumulator.result()}."""
+    for item in items:
+        for acc in accumulators:
+            acc.add(item)
+    return {acc.name: acc.result() for acc in accumulators}
+
+
+# -------------------- acumulatori --------------------
+
+
+class StatusCountsAccumulator(PnaAccumulator):
+    """Distribuția proiectelor pe status de implementare."""
+
+    name = "status"
+
+    def __init__(self):
+        self.counts = {code: 0 for code, _ in PnaProject.STATUS_IMPLEMENTARE_CHOICES}
+
+    def add(self, item):
+        code = item.project.status_implementare
+        self.counts[code] = self.counts.get(code, 0) + 1
+
+    def result(self):
+        return self.counts
+
+
+def _empty_contrib_stats() -> dict:
+    return {"total": 0, "any": 0, "f": 0, "c": 0, "t": 0, "all": 0}
+
+
+def _add_contrib_stats(s: dict, item: PnaDashboardItem) -> None:
+    s["total"] += 1
+    if item.has_any:
+        s["any"] += 1
+    if item.has_f:
+        s["f"] += 1
+    if item.has_c:
+        s["c"] += 1
+    if item.has_t:
+        s["t"] += 1
+    if item.has_all:
+        s["all"] += 1
+
+
+@dataclass
+class ContributionProgress:
+    nr_any: int = 0
+    nr_f: int = 0
+    nr_c: int = 0
+    nr_t: int = 0
+    nr_all: int = 0
+    dims_dist: Dict[int, int] = field(default_factory=lambda: {0: 0, 1: 0, 2: 0, 3: 0})
+    missing: List[PnaDashboardItem] = field(default_factory=list)
+    by_chapter: Dict[int, dict] = field(default_factory=dict)
+    by_criterion: Dict[int, dict] = field(default_factory=dict)
+    by_institution: Dict[int, dict] = field(default_factory=dict)
+
+
+class ContributionProgressAccumulator(PnaAccumulator):
+    """Progresul contribuțiilor experților (total, pe dimensiuni, pe capitol / foaie / instituție)."""
+
+    name = "contributii"
+
+    def __init__(self):
+        self.progress = ContributionProgress()
+
+    def add(self, item):
+        pr = self.progress
+        if item.has_any:
+            pr.nr_any += 1
+        else:
+            pr.missing.append(item)
+        if item.has_f:
+            pr.nr_f += 1
+        if item.has_c:
+            pr.nr_c += 1
+        if item.has_t:
+            pr.nr_t += 1
+        if item.has_all:
+            pr.nr_all += 1
+        dims = int(item.has_f) + int(item.has_c) + int(item.has_t)
+        pr.dims_dist[dims] = pr.dims_dist.get(dims, 0) + 1
+
+        # Proiectul contribuie la fiecare capitol și foaie de parcurs bifată.
+        for scope_id in item.chapter_ids:
+            _add_contrib_stats(pr.by_chapter.setdefault(scope_id, _empty_contrib_stats()), item)
+        for scope_id in item.criterion_ids:
+            _add_contrib_stats(pr.by_criterion.setdefault(scope_id, _empty_contrib_stats()), item)
+        inst_id = int(item.project.institutie_principala_ref_id or 0)
+        _add_contrib_stats(pr.by_institution.setdefault(inst_id, _empty_contrib_stats()), item)
+
+    def result(self):
+        return self.progress
+
+
+@dataclass
+class DeadlineSummary:
+    nr_no_deadline: int = 0
+    nr_overdue: int = 0
+    nr_upcoming_30: int = 0
+    nr_upcoming_60: int = 0
+    nr_upcoming_90: int = 0
+    overdue: List[PnaProject] = field(default_factory=list)
+    upcoming: List[PnaProject] = field(default_factory=list)
+    years: set = field(default_factory=set)
+
+
+class DeadlineAccumulator(PnaAccumulator):
+    """Termene: depășite / apropiate (30/60/90 zile), fără deadline, anii acoperiți."""
+
+    name = "termene"
+
+    def __init__(self, today: date):
+        self.today = today
+        self.in_30 = today + timedelta(days=30)
+        self.in_60 = today + timedelta(days=60)
+        self.in_90 = today + timedelta(days=90)
+        self.summary = DeadlineSummary()
+
+    def add(self, item):
+        s = self.summary
+        deadline = item.deadline
+        if not deadline:
+            s.nr_no_deadline += 1
+            return
+        s.years.add(deadline.year)
+        if deadline < self.today:
+            s.nr_overdue += 1
+            s.overdue.append(item.project)
+            return
+        if deadline <= self.in_30:
+            s.nr_upcoming_30 += 1
+        if deadline <= self.in_60:
+            s.nr_upcoming_60 += 1
+        if deadline <= self.in_90:
+            s.nr_upcoming_90 += 1
+            s.upcoming.append(item.project)
+
+    def result(self):
+        s = self.summary
+        s.overdue.sort(key=lambda p: (p.termen_deadline or date.max, p.titlu))
+        s.upcoming.sort(key=lambda p: (p.termen_deadline or date.max, p.titlu))
+        return s
+
+
+@dataclass
+class DataQualitySummary:
+    nr_necesita_ce: int = 0
+    nr_ce_status_mismatch: int = 0
+    nr_expertiza_externa: int = 0
+    nr_expertiza_externa_fara_furnizor: int = 0
+    nr_expertiza_interna_insuf: int = 0
+    nr_missing_cost: int = 0
+    nr_missing_volum: int = 0
+    nr_missing_institutie: int = 0
+    nr_missing_acte: int = 0
+    sum_cost: Dict[int, Decimal] = field(default_factory=lambda: {y: Decimal("0") for y in PNA_COST_YEARS})
+    sum_zile: int = 0
+
+
+class DataQualityAccumulator(PnaAccumulator):
+    """KPI-uri de expertiză / avizare CE, costuri, volum de muncă și date lipsă."""
+
+    name = "kpi"
+
+    def __init__(self):
+        self.summary = DataQualitySummary()
+
+    def add(self, item):
+        s = self.summary
+        p = item.project
+
+        if p.necesita_avizare_comisia_europeana:
+            s.nr_necesita_ce += 1
+            if p.status_implementare != PnaProject.STATUS_COORDONARE_CE:
+                s.nr_ce_status_mismatch += 1
+
+        if p.necesita_expertiza_externa:
+            s.nr_expertiza_externa += 1
+            if not p.este_identificata_expertiza_externa:
+                s.nr_expertiza_externa_fara_furnizor += 1
+
+        if p.expertiza_interna == 1:
+            s.nr_expertiza_interna_insuf += 1
+
+        # costuri
+        any_cost = False
+        for y in PNA_COST_YEARS:
+            val = getattr(p, f"cost_{y}")
+            if val is not None:
+                any_cost = True
+                try:
+                    s.sum_cost[y] += Decimal(str(val))
+                except Exception:
+                    pass
+        if not any_cost:
+            s.nr_missing_cost += 1
+
+        # volum
+        if p.volum_munca_zile is None:
+            s.nr_missing_volum += 1
+        else:
+            try:
+                s.sum_zile += int(p.volum_munca_zile)
+            except Exception:
+                pass
+
+        # instituție principală
+        if not p.institutie_principala_ref_id and not (p.institutie_principala or "").strip():
+            s.nr_missing_institutie += 1
+
+        if not p.acte_ue_legaturi.all():
+            s.nr_missing_acte += 1
+
+    def result(self):
+        return self.summary
+
+
+@dataclass
+class EUActsSummary:
+    tip_counts: Dict[str, int] = field(default_factory=dict)
+    transp_counts: Dict[str, int] = field(default_factory=lambda: {"TOTAL": 0, "PARTIAL": 0, "": 0})
+    act_to_projects: Dict[int, set] = field(default_factory=dict)
+    acts: Dict[int, Any] = field(default_factory=dict)
+
+
+class EUActsAccumulator(PnaAccumulator):
+    """Acte UE: distribuție pe tip, pe tip de transpunere și proiectele per act."""
+
+    name = "acte_ue"
+
+    def __init__(self):
+        self.summary = EUActsSummary()
+
+    def add(self, item):
+        s = self.summary
+        for link in item.project.acte_ue_legaturi.all():
+            act = link.eu_act
+            if not act:
+                continue
+            tip = (act.tip_document or "").strip() or "(nespecificat)"
+            s.tip_counts[tip] = s.tip_counts.get(tip, 0) + 1
+            ttr = (link.tip_transpunere or "").strip()
+            s.transp_counts[ttr] = s.transp_counts.get(ttr, 0) + 1
+            s.act_to_projects.setdefault(act.id, set()).add(item.project.id)
+            s.acts.setdefault(act.id, act)
+
+    def result(self):
+        return self.summary
+
+
+class DerapajeAccumulator(PnaAccumulator):
+    """Proiectele al căror termen actualizat (Guvern) diferă de termenul inițial."""
+
+    name = "derapaje"
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, item):
+        p = item.project
+        if not p.termen_actualizat_aprobare_guvern:
+            return
+        baseline = p.termen_aprobare_guvern or p.termen_aprobare_parlament
+        if not baseline:
+            return
+        diff_m = _months_diff(baseline, p.termen_actualizat_aprobare_guvern)
+        if diff_m != 0:
+            self.rows.append(
+                {
+                    "project": p,
+                    "baseline": baseline,
+                    "updated": p.termen_actualizat_aprobare_guvern,
+                    "diff_months": diff_m,
+                }
+            )
+
+    def result(self):
+        self.rows.sort(key=lambda r: abs(r["diff_months"]), reverse=True)
+        return self.rows
+
+
+class RiskAccumulator(PnaAccumulator):
+    """Scor euristic de risc per proiect (termene, prioritate, complexitate, expertiză, CE)."""
+
+    name = "riscuri"
+
+    def __init__(self, today: date):
+        self.today = today
+        self.in_60 = today + timedelta(days=60)
+        self.rows = []
+
+    def add(self, item):
+        p = item.project
+        deadline = item.deadline
+        score = 0
+        flags = []
+        if not deadline:
+            score += 2
+            flags.append("Fără deadline")
+        elif deadline < self.today:
+            score += 3
+            flags.append("Termen depășit")
+        elif deadline <= self.in_60:
+            score += 2
+            flags.append("Termen < 60 zile")
+
+        if p.prioritate == 3:
+            score += 1
+            flags.append("Prioritate înaltă")
+        if p.complexitate and p.complexitate >= 4:
+            score += 1
+            flags.append("Complexitate ridicată")
+        if p.expertiza_interna == 1:
+            score += 2
+            flags.append("Expertiză internă insuficientă")
+        elif p.expertiza_interna == 2:
+            score += 1
+            flags.append("Expertiză internă parțială")
+        if p.necesita_expertiza_externa:
+            score += 2
+            flags.append("Expertiză externă necesară")
+            if not p.este_identificata_expertiza_externa:
+                score += 2
+                flags.append("Fără expertiză externă identificată")
+        if p.necesita_avizare_comisia_europeana:
+            score += 2
+            flags.append("Necesită avizare/coord. CE")
+            if p.status_implementare != PnaProject.STATUS_COORDONARE_CE:
+                score += 1
+                flags.append("Status ≠ coordonare CE")
+
+        if score > 0:
+            self.rows.append({"project": p, "score": score, "flags": flags})
+
+    def result(self):
+        self.rows.sort(key=lambda r: (r["score"], (r["project"].termen_deadline or date.max)), reverse=True)
+        return self.rows
+
+
+class StaleAccumulator(PnaAccumulator):
+    """Proiecte (nefinalizate) care stau în același status de cel puțin `threshold_days` zile."""
+
+    name = "stagnare"
+
+    def __init__(self, today: date, threshold_days: int, last_status_by_project: Dict[int, Any]):
+        self.today = today
+        self.threshold_days = threshold_days
+        self.last_status_by_project = last_status_by_project
+        self.rows = []
+
+    def add(self, item):
+        p = item.project
+        # În lipsa istoricului (nu ar trebui după migrare), fallback: creat_la
+        since_dt = self.last_status_by_project.get(p.id) or getattr(p, "creat_la", None) or getattr(p, "actualizat_la", None)
+        if not since_dt:
+            return
+        days = (self.today - since_dt.date()).days
+        if days >= self.threshold_days and p.status_implementare != PnaProject.STATUS_ADOPTAT_FINAL:
+            self.rows.append({"project": p, "days": days, "since": since_dt})
+
+    def result(self):
+        # Sortare: cele mai multe zile în același status, apoi deadline-ul cel mai apropiat
+        self.rows.sort(
+            key=lambda r: (
+                -int(r["days"]),
+                (r["project"].termen_deadline or date.max),
+                (r["project"].titlu or ""),
+            )
+        )
+        return self.rows
+
+
+class DeadlineMatrixAccumulator(PnaAccumulator):
+    """Matricea capitole / foi de parcurs × (an, lună), în nr. proiecte sau zile de muncă.
+
+    Acumulează toți anii; anul afișat se alege după trecere (depinde de anii existenți).
+    """
+
+    name = "matrice"
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.matrix: Dict[tuple, Dict[tuple, int]] = {}
+
+    def add(self, item):
+        d = item.deadline
+        if not d:
+            return
+        value = int(item.project.volum_munca_zile or 0) if self.mode == "days" else 1
+        for key in [("CH", scope_id) for scope_id in item.chapter_ids] + [("CR", scope_id) for scope_id in item.criterion_ids]:
+            cell = self.matrix.setdefault(key, {})
+            cell[(d.year, d.month)] = cell.get((d.year, d.month), 0) + value
+
+    def result(self):
+        return self.matrix
+
+
+def empty_resource_row(label: str, filter_url: str | None = None, dashboard_url: str | None = None) -> dict:
+    return {
+        "label": label,
+        "filter_url": filter_url,
+        "dashboard_url": dashboard_url,
+        "total": 0,
+        "neinitiate": 0,
+        "guvern": 0,
+        "parlament": 0,
+        "adoptat": 0,
+        "overdue": 0,
+        "upcoming60": 0,
+        "zile": 0,
+        "cost_total": Decimal("0"),
+    }
+
+
+@dataclass
+class ResourceBreakdown:
+    # cheie -> (obiect, rând); pentru instituții cheia 0 = fără instituție principală
+    by_institution: Dict[int, tuple] = field(default_factory=dict)
+    by_chapter: Dict[int, dict] = field(default_factory=dict)
+    by_criterion: Dict[int, dict] = field(default_factory=dict)
+    # (kind, id) -> (obiect, rând); doar pentru dashboard-ul per instituție
+    by_scope: Dict[tuple, tuple] = field(default_factory=dict)
+
+
+class ResourceAccumulator(PnaAccumulator):
+    """Resurse & expertiză (etape, termene, zile, costuri) pe instituție / capitol / foaie de parcurs."""
+
+    name = "resurse"
+
+    def __init__(self, today: date, include_scopes: bool = False):
+        self.today = today
+        self.in_60 = today + timedelta(days=60)
+        self.include_scopes = include_scopes
+        self.breakdown = ResourceBreakdown()
+
+    def _update_row(self, row: dict, item: PnaDashboardItem) -> None:
+        p = item.project
+        row["total"] += 1
+        bucket = pna_stage_bucket(p.status_implementare)
+        row[bucket] = row.get(bucket, 0) + 1
+        dl = item.deadline
+        if dl and dl < self.today:
+            row["overdue"] += 1
+        if dl and self.today <= dl <= self.in_60:
+            row["upcoming60"] += 1
+        if p.volum_munca_zile:
+            try:
+                row["zile"] += int(p.volum_munca_zile)
+            except Exception:
+                pass
+        for y in PNA_COST_YEARS:
+            val = getattr(p, f"cost_{y}")
+            if val is not None:
+                try:
+                    row["cost_total"] += Decimal(str(val))
+                except Exception:
+                    pass
+
+    def add(self, item):
+        b = self.breakdown
+        p = item.project
+
+        inst = p.institutie_principala_ref
+        key = inst.id if inst else 0
+        if key not in b.by_institution:
+            b.by_institution[key] = (inst, empty_resource_row(inst.nume if inst else "(nespecificat)"))
+        self._update_row(b.by_institution[key][1], item)
+
+        for scope_id in item.chapter_ids:
+            self._update_row(b.by_chapter.setdefault(scope_id, empty_resource_row("")), item)
+        for scope_id in item.criterion_ids:
+            self._update_row(b.by_criterion.setdefault(scope_id, empty_resource_row("")), item)
+
+        if self.include_scopes:
+            scopes = [("CH", ch) for ch in p.scope_chapters()] + [("CR", cr) for cr in p.scope_criteria()]
+            for kind, obj in scopes:
+                if (kind, obj.id) not in b.by_scope:
+                    b.by_scope[(kind, obj.id)] = (obj, empty_resource_row(""))
+                self._update_row(b.by_scope[(kind, obj.id)][1], item)
+
+    def result(self):
+        return self.breakdown
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import csv
 import io
 import re
 import unicodedata
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
-from typing import Any
+from typing import Any, Iterator
 
 import openpyxl
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.comments import Comment
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils import get_column_letter
@@ -1407,3 +1409,212 @@ def build_pna_import_template_bytes() -> bytes:
     buffer = io.BytesIO()
     wb.save(buffer)
     return buffer.getvalue()
+
+
+# -------------------- Export în formatul template-ului --------------------
+#
+# Exportul proiectelor PNA folosește aceleași coloane ca template-ul de import, deci fișierul poate fi
+# modificat și reîncărcat prin run_pna_import_workbook. Workbook-ul este `write_only`, iar proiectele
+# sunt parcurse cu `.iterator()`.
+
+PNA_EXPORT_CHUNK_SIZE = 500
+
+_EXPORT_MONTH_FORMAT = "mmmm yyyy"
+_EXPORT_DATE_FORMAT = "dd.mm.yyyy"
+_EXPORT_MONEY_FORMAT = "#,##0.00"
+
+
+def _yes_no(value: bool) -> str:
+    return "Da" if value else "Nu"
+
+
+def _choice_label(value: int | None, labels: list[tuple[int, str]]) -> str:
+    if value is None:
+        return ""
+    return f"{value} - {dict(labels).get(value, value)}"
+
+
+def _pna_export_scope(project: PnaProject) -> tuple[Chapter | None, Criterion | None]:
+    """Capitolul / foaia de parcurs scrise în rândul proiectului (template-ul are câte o singură coloană).
+
+    Folosim câmpurile principale; dacă lipsesc, primul capitol / prima foaie din relațiile multiple.
+    La reimport, scope-urile suplimentare rămân neatinse (importul doar adaugă în relațiile multiple).
+    """
+    chapter = project.chapter
+    if chapter is None:
+        chapter = min(project.chapters.all(), key=lambda ch: ch.numar, default=None)
+    criterion = project.criterion
+    if criterion is None:
+        criterion = min(project.criteria.all(), key=lambda cr: cr.cod, default=None)
+    return chapter, criterion
+
+
+def pna_export_project_values(project: PnaProject) -> dict[str, Any]:
+    """Valorile unui proiect, pe coloanele din _TEMPLATE_PROJECT_COLUMNS (cheie = antet)."""
+    chapter, criterion = _pna_export_scope(project)
+    principal = project.institutie_principala_ref.nume if project.institutie_principala_ref else project.institutie_principala
+    principal_key = _norm_inst_name(principal)
+    others = [i.nume for i in project.institutii_responsabile.all() if _norm_inst_name(i.nume) != principal_key]
+    return {
+        "Cod unic identificabil": project.pna_cod_unic,
+        "Nr. acțiune": project.pna_nr_actiune,
+        "Denumire proiect": project.titlu,
+        "Descriere": project.descriere,
+        "Cluster PNA": project.pna_cluster,
+        "Capitol (număr)": chapter.numar if chapter else None,
+        "Capitol (denumire)": chapter.denumire if chapter else "",
+        "Foaie de parcurs (cod)": criterion.cod if criterion else "",
+        "Foaie de parcurs (denumire)": criterion.denumire if criterion else "",
+        "Status implementare": project.get_status_implementare_display() if project.status_implementare else "",
+        "Instituția principală": principal,
+        "Alte instituții responsabile": "; ".join(sorted(others)),
+        "Contact responsabil": project.contact_responsabil,
+        "Email contact": project.contact_responsabil_email,
+        "Termen aprobare în Guvern": project.termen_aprobare_guvern,
+        "Termen aprobare în Parlament": project.termen_aprobare_parlament,
+        "Termen actualizat aprobare în Guvern": project.termen_actualizat_aprobare_guvern,
+        "Consultări publice în Parlament": project.consultari_publice_parlament,
+        "Intrare planificată în vigoare": project.intrare_planificata_vigoare,
+        "Complexitate": _choice_label(project.complexitate, PnaProject.COMPLEXITATE_CHOICES),
+        "Prioritate (1-3)": _choice_label(project.prioritate, PnaProject.PRIORITATE_CHOICES),
+        "Disponibilitate expertiză internă": _choice_label(project.expertiza_interna, PnaProject.EXPERTIZA_INTERNA_CHOICES),
+        "Volum de muncă (zile)": project.volum_munca_zile,
+        "Necesită expertiză externă": _yes_no(project.necesita_expertiza_externa),
+        "Disponibilitate expertiză externă": project.disponibilitate_expertiza_externa,
+        "Parteneri societate civilă": project.parteneri_societate_civila,
+        "Cost 2026 (mii lei)": project.cost_2026,
+        "Cost 2027 (mii lei)": project.cost_2027,
+        "Cost 2028 (mii lei)": project.cost_2028,
+        "Cost 2029 (mii lei)": project.cost_2029,
+        "Riscuri": project.riscuri,
+        "Raport de extindere 2023": _yes_no(project.raport_extindere_2023),
+        "Raport de extindere 2024": _yes_no(project.raport_extindere_2024),
+        "Raport de extindere 2025": _yes_no(project.raport_extindere_2025),
+        "Raport de extindere 2026": _yes_no(project.raport_extindere_2026),
+        "Raport de extindere 2027": _yes_no(project.raport_extindere_2027),
+        "Planul de creștere economică": _yes_no(project.plan_crestere_economica),
+        "Necesită avizare Comisia Europeană": _yes_no(project.necesita_avizare_comisia_europeana),
+        "Comentariu PNA": project.comentariu_pna,
+        "Întârziat 2025": _yes_no(project.intarziat_2025),
+        "Note explicative": project.note_explicative,
+        "Partener de dezvoltare": project.partener_de_dezvoltare,
+        "Executor acțiune": project.executor_actiune,
+        "Cost total (mii lei)": project.cost_total_mii_lei,
+        "Acoperit din bugetul de stat (mii lei)": project.cost_buget_stat_mii_lei,
+        "Acoperit din asistență externă (mii lei)": project.cost_asistenta_externa_mii_lei,
+        "Costuri neacoperite (mii lei)": project.cost_neacoperite_mii_lei,
+        "Acte normative în vigoare de transpunere": project.acte_normative_transpunere_existente,
+        "Prioritate PNA (text)": project.pna_prioritate_text,
+    }
+
+
+_EXPORT_PROJECT_FORMATS = {
+    "Termen aprobare în Guvern": _EXPORT_MONTH_FORMAT,
+    "Termen aprobare în Parlament": _EXPORT_MONTH_FORMAT,
+    "Termen actualizat aprobare în Guvern": _EXPORT_MONTH_FORMAT,
+    "Consultări publice în Parlament": _EXPORT_DATE_FORMAT,
+    "Cost 2026 (mii lei)": _EXPORT_MONEY_FORMAT,
+    "Cost 2027 (mii lei)": _EXPORT_MONEY_FORMAT,
+    "Cost 2028 (mii lei)": _EXPORT_MONEY_FORMAT,
+    "Cost 2029 (mii lei)": _EXPORT_MONEY_FORMAT,
+    "Cost total (mii lei)": _EXPORT_MONEY_FORMAT,
+    "Acoperit din bugetul de stat (mii lei)": _EXPORT_MONEY_FORMAT,
+    "Acoperit din asistență externă (mii lei)": _EXPORT_MONEY_FORMAT,
+    "Costuri neacoperite (mii lei)": _EXPORT_MONEY_FORMAT,
+}
+
+
+def _write_only_header(ws, columns: list[tuple[str, int, str]]) -> None:
+    """Antetul stilizat ca în template (în modul write_only, înainte de orice rând)."""
+    fill = PatternFill("solid", fgColor="0B3D91")
+    font = Font(color="FFFFFF", bold=True)
+    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    border = Border(bottom=Side(style="thin", color="D5D9E2"))
+    cells = []
+    for col_idx, (header, width, comment) in enumerate(columns, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill, cell.font, cell.alignment, cell.border = fill, font, alignment, border
+        _add_comment(cell, comment)
+        cells.append(cell)
+    ws.freeze_panes = "A2"
+    ws.append(cells)
+
+
+def _export_cell(ws, value: Any, number_format: str | None):
+    if number_format is None or value in (None, ""):
+        return value
+    cell = WriteOnlyCell(ws, value=value)
+    cell.number_format = number_format
+    return cell
+
+
+def iter_pna_export_rows(projects) -> Iterator[tuple[PnaProject, dict[str, Any]]]:
+    """(proiect, valori) pentru fiecare proiect din queryset, citit în blocuri cu `.iterator()`."""
+    qs = projects.select_related("chapter", "criterion", "institutie_principala_ref").prefetch_related(
+        "chapters", "criteria", "institutii_responsabile"
+    )
+    for project in qs.iterator(chunk_size=PNA_EXPORT_CHUNK_SIZE):
+        yield project, pna_export_project_values(project)
+
+
+def write_pna_export_workbook(projects, fileobj) -> None:
+    """Scrie proiectele (queryset PnaProject) și actele lor UE în formatul template-ului de import."""
+    wb = Workbook(write_only=True)
+
+    ws_main = wb.create_sheet(_TEMPLATE_MAIN_SHEET)
+    _write_only_header(ws_main, _TEMPLATE_PROJECT_COLUMNS)
+    # Identificarea fiecărui proiect, reluată în sheet-ul de acte UE (aceeași ca la import).
+    project_keys: dict[int, list[Any]] = {}
+    for project, values in iter_pna_export_rows(projects):
+        ws_main.append(
+            [
+                _export_cell(ws_main, values[header], _EXPORT_PROJECT_FORMATS.get(header))
+                for header, _width, _comment in _TEMPLATE_PROJECT_COLUMNS
+            ]
+        )
+        project_keys[project.pk] = [
+            values["Cod unic identificabil"],
+            values["Nr. acțiune"],
+            values["Denumire proiect"],
+            values["Capitol (număr)"],
+            values["Foaie de parcurs (cod)"],
+        ]
+
+    ws_acts = wb.create_sheet(_TEMPLATE_ACTS_SHEET)
+    _write_only_header(ws_acts, _TEMPLATE_ACT_COLUMNS)
+    transpunere_labels = {
+        PnaProjectEUAct.TIP_TRANSPUNERE_TOTAL: "Total",
+        PnaProjectEUAct.TIP_TRANSPUNERE_PARTIAL: "Parțial",
+    }
+    links = (
+        PnaProjectEUAct.objects.filter(project_id__in=list(project_keys))
+        .order_by("project_id", "eu_act__celex")
+        .values_list("project_id", "eu_act__celex", "eu_act__denumire", "eu_act__tip_document", "eu_act__url", "tip_transpunere")
+    )
+    for project_id, celex, denumire, tip_document, url, tip_transpunere in links.iterator(chunk_size=PNA_EXPORT_CHUNK_SIZE):
+        ws_acts.append(
+            project_keys[project_id] + [celex, denumire, tip_document, url, transpunere_labels.get(tip_transpunere, "")]
+        )
+
+    wb.save(fileobj)
+
+
+def stream_pna_export_csv(projects) -> Iterator[bytes]:
+    """Proiectele ca flux CSV (UTF-8, pentru StreamingHttpResponse), pe coloanele sheet-ului principal.
+
+    Actele UE nu sunt incluse (CSV-ul are o singură foaie); pentru reimport se folosește exportul XLSX.
+    """
+    headers = [header for header, _width, _comment in _TEMPLATE_PROJECT_COLUMNS]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def _line(row: list[Any]) -> bytes:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow(row)
+        return buf.getvalue().encode("utf-8")
+
+    yield _line(headers)
+    for _project, values in iter_pna_export_rows(projects):
+        yield _line(["" if values[h] is None else values[h] for h in headers])
@@ -1,11 +1,25 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.signals import user_logged_in
-from django.db.models.signals import post_save, m2m_changed
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save, m2m_changed
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import ExpertProfile
-from .stats import freeze_closed_questionnaires_for_chapters, freeze_closed_questionnaires_for_criteria
+from .models import Chapter, ExpertProfile, ExpertScopeIndex, PnaProject, QuestionnaireScopeSnapshot, Submission
+from .outbox import start_outbox_worker_on_first_request
+from .stats import (
+    freeze_closed_questionnaires_for_chapters,
+    freeze_closed_questionnaires_for_criteria,
+    refresh_expert_scope_index,
+    refresh_response_counters_for_expert,
+    request_response_counter_refresh,
+)
+from .utils import (
+    PNA_DASHBOARD_CACHE_DEPENDENCIES,
+    REFERENCE_CACHE_DEPENDENCIES,
+    invalidate_pna_dashboard_cache,
+    invalidate_reference_cache,
+)
 
 User = get_user_model()
 
@@ -58,3 +72,125 @@ def freeze_closed_questionnaires_on_criteria_allocation_change(sender, instance,
         freeze_closed_questionnaires_for_criteria(pk_set or [])
     elif action == "pre_clear":
         freeze_closed_questionnaires_for_criteria(instance.criterii.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=ExpertProfile.capitole.through)
+@receiver(m2m_changed, sender=ExpertProfile.criterii.through)
+def refresh_response_counters_on_allocation_change(sender, instance, action, reverse, **kwargs):
+    """Renumără contoarele de răspunsuri ale expertului după schimbarea alocărilor."""
+
+    if reverse:
+        return
+
+    if action in ("post_add", "post_remove", "post_clear"):
+        refresh_response_counters_for_expert(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def refresh_response_counters_on_user_change(sender, instance, created, update_fields=None, **kwargs):
+    """Un expert dezactivat / promovat ca staff nu mai este numărat în contoare (și invers)."""
+
+    if created:
+        return
+    if update_fields is not None and not ({"is_active", "is_staff"} & set(update_fields)):
+        return
+    refresh_response_counters_for_expert(instance.id)
+
+
+@receiver(m2m_changed, sender=ExpertProfile.capitole.through)
+@receiver(m2m_changed, sender=ExpertProfile.criterii.through)
+def refresh_expert_scope_index_on_allocation_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Ține indexul experți ↔ scope-uri sincronizat cu alocările (în ambele direcții ale relației)."""
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        refresh_expert_scope_index([instance.user_id])
+    elif action == "post_clear":
+        # capitol.experti.clear(): niciun expert nu mai este alocat acestui scope.
+        scope = (
+            QuestionnaireScopeSnapshot.SCOPE_CHAPTER
+            if isinstance(instance, Chapter)
+            else QuestionnaireScopeSnapshot.SCOPE_CRITERION
+        )
+        key = QuestionnaireScopeSnapshot.make_scope_key(scope, chapter_id=instance.pk, criterion_id=instance.pk)
+        ExpertScopeIndex.objects.filter(scope_key=key).delete()
+    else:
+        refresh_expert_scope_index(ExpertProfile.objects.filter(pk__in=pk_set or []).values_list("user_id", flat=True))
+
+
+@receiver(post_save, sender=User)
+def refresh_expert_scope_index_on_user_change(sender, instance, created, update_fields=None, **kwargs):
+    """Doar experții activi, non-admin sunt în index."""
+
+    if created:
+        return
+    if update_fields is not None and not ({"is_active", "is_staff"} & set(update_fields)):
+        return
+    refresh_expert_scope_index([instance.id])
+
+
+@receiver(post_save, sender=ExpertProfile)
+def refresh_expert_scope_index_on_archive(sender, instance, created, update_fields=None, **kwargs):
+    """Experții arhivați ies din index; la restabilire, alocările lor revin."""
+
+    if created:
+        return
+    if update_fields is not None and "arhivat" not in update_fields:
+        return
+    refresh_expert_scope_index([instance.user_id])
+
+
+@receiver(post_delete, sender=Submission)
+def refresh_response_counters_on_submission_delete(sender, instance, **kwargs):
+    if instance.status == Submission.STATUS_TRIMIS:
+        request_response_counter_refresh([instance.questionnaire_id])
+
+
+def invalidate_reference_cache_on_change(sender, **kwargs):
+    """Invalidează listele de referință din cache când se modifică un cluster/capitol/criteriu/etc."""
+    invalidate_reference_cache(*REFERENCE_CACHE_DEPENDENCIES[sender])
+
+
+for _model in REFERENCE_CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_reference_cache_on_change, sender=_model, dispatch_uid=f"refcache_save_{_model.__name__}")
+    post_delete.connect(invalidate_reference_cache_on_change, sender=_model, dispatch_uid=f"refcache_delete_{_model.__name__}")
+
+
+def invalidate_pna_dashboard_cache_on_change(sender, **kwargs):
+    """Orice modificare pe proiecte PNA / acte UE / contribuții / istoric status invalidează agregatele."""
+    invalidate_pna_dashboard_cache()
+
+
+for _model in PNA_DASHBOARD_CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_pna_dashboard_cache_on_change, sender=_model, dispatch_uid=f"pnadash_save_{_model.__name__}")
+    post_delete.connect(invalidate_pna_dashboard_cache_on_change, sender=_model, dispatch_uid=f"pnadash_delete_{_model.__name__}")
+
+
+@receiver(m2m_changed, sender=PnaProject.chapters.through)
+@receiver(m2m_changed, sender=PnaProject.criteria.through)
+def reset_pna_scope_ids_on_change(sender, instance, action, reverse, **kwargs):
+    """ID-urile de scope memoizate pe proiect nu mai sunt valide după schimbarea capitolelor / foilor."""
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        instance.reset_scope_ids()
+
+
+@receiver(post_save, sender=PnaProject)
+def reset_pna_scope_ids_on_save(sender, instance, **kwargs):
+    # Fallback-ul pe câmpurile vechi (chapter / criterion) poate să se fi schimbat.
+    instance.reset_scope_ids()
+
+
+@receiver(m2m_changed, sender=PnaProject.chapters.through)
+@receiver(m2m_changed, sender=PnaProject.criteria.through)
+@receiver(m2m_changed, sender=PnaProject.institutii_responsabile.through)
+@receiver(m2m_changed, sender=ExpertProfile.capitole.through)
+@receiver(m2m_changed, sender=ExpertProfile.criterii.through)
+def invalidate_pna_dashboard_cache_on_m2m_change(sender, action, **kwargs):
+    """Capitolele / foile de parcurs / instituțiile proiectelor și alocările experților (experți eligibili)."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_pna_dashboard_cache()
+
+
+# Coada de emailuri: după (re)pornirea procesului web, prima cerere reia trimiterile întrerupte.
+request_started.connect(start_outbox_worker_on_first_request, dispatch_uid="outbox_first_request")
@@ -3,25 +3,43 @@
 Acest modul centralizează logica pentru:
 - calculul ratelor per chestionar (în funcție de scope: General / Capitol / Criteriu);
 - înghețarea ratelor la închiderea chestionarelor (snapshot), astfel încât adăugarea ulterioară
-  de experți să nu modifice procentele pentru chestionarele deja închise.
+  de experți să nu modifice procentele pentru chestionarele deja închise;
+- statisticile sintetice pe capitole / foi de parcurs din Panou, calculate pe mulțimi
+  (un număr constant de interogări grupate, indiferent de numărul de chestionare);
+- contoarele denormalizate de răspunsuri trimise (`Questionnaire.nr_trimise`,
+  `QuestionnaireScopeCounter`), întreținute incremental și reconstruibile;
+- indexul experți ↔ scope-uri (`ExpertScopeIndex`), din care se rezolvă „cine este alocat
+  capitolului / foii de parcurs X” și „ce alocări are expertul Y”.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Iterable, Sequence
 
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import Count, F
 from django.utils import timezone
 
 from .models import (
     Chapter,
     Criterion,
+    ExpertProfile,
+    ExpertScopeIndex,
     Questionnaire,
+    QuestionnaireScopeCounter,
     QuestionnaireScopeSnapshot,
     Submission,
 )
+from .utils import invalidate_pna_dashboard_cache
+
+
+def _rate(nr_raspunsuri: int, nr_experti: int) -> float:
+    return round((nr_raspunsuri / nr_experti) * 100, 1) if nr_experti else 0.0
 
 
 def _eligible_experts_qs_for_scope(
@@ -29,20 +47,18 @@ def _eligible_experts_qs_for_scope(
     chapter: Chapter | None = None,
     criterion: Criterion | None = None,
 ):
-    """Returnează queryset cu experții eligibili pentru un scope."""
-
-    qs = User.objects.filter(is_staff=False, is_active=True)
+    """Returnează queryset cu experții eligibili pentru un scope (capitolele / criteriile, din index)."""
 
     if scope == QuestionnaireScopeSnapshot.SCOPE_GENERAL:
-        return qs
+        return User.objects.filter(is_staff=False, is_active=True)
     if scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER:
         if not chapter:
             raise ValueError("chapter este obligatoriu pentru scope CHAPTER")
-        return qs.filter(profil_expert__capitole=chapter)
+        return User.objects.filter(id__in=experts_in_scopes(chapter_ids=[chapter.id]))
     if scope == QuestionnaireScopeSnapshot.SCOPE_CRITERION:
         if not criterion:
             raise ValueError("criterion este obligatoriu pentru scope CRITERION")
-        return qs.filter(profil_expert__criterii=criterion)
+        return User.objects.filter(id__in=experts_in_scopes(criterion_ids=[criterion.id]))
 
     raise ValueError("Scope invalid")
 
@@ -132,14 +148,23 @@ def get_questionnaire_rate_and_counts(
 ):
     """Întoarce (nr_experti, nr_raspunsuri, rata, respondent_ids) pentru un chestionar.
 
-    - dacă chestionarul este închis => folosește snapshot (înghețat)
-    - dacă este deschis => calculează dinamic
+    - dacă chestionarul este închis și are snapshot => folosește snapshot-ul (înghețat)
+    - altfel => calculează dinamic
+
+    Funcția este folosită pe căi de citire (dashboarduri), deci nu creează snapshot-uri și nu ia
+    lock-uri: înghețarea se face de comanda `freeze_snapshots` și de semnalele m2m_changed.
     """
 
     now = timezone.now()
     if questionnaire.termen_limita < now:
-        snap = ensure_scope_snapshot(questionnaire, scope=scope, chapter=chapter, criterion=criterion)
-        return snap.nr_experti, snap.nr_raspunsuri, snap.rata, list(snap.respondent_ids or [])
+        scope_key = QuestionnaireScopeSnapshot.make_scope_key(
+            scope,
+            chapter_id=chapter.id if chapter else None,
+            criterion_id=criterion.id if criterion else None,
+        )
+        snap = QuestionnaireScopeSnapshot.objects.filter(questionnaire=questionnaire, scope_key=scope_key).first()
+        if snap:
+            return snap.nr_experti, snap.nr_raspunsuri, snap.rata, list(snap.respondent_ids or [])
 
     nr_experti, nr_raspunsuri, resp_ids = compute_current_questionnaire_stats(
         questionnaire=questionnaire,
@@ -151,6 +176,204 @@ def get_questionnaire_rate_and_counts(
     return nr_experti, nr_raspunsuri, rata, resp_ids
 
 
+def get_questionnaires_rates_and_counts(
+    questionnaires: Sequence[Questionnaire],
+    scope: str,
+    chapter: Chapter | None = None,
+    criterion: Criterion | None = None,
+) -> dict[int, tuple[int, int, float, list[int]]]:
+    """Varianta pe mulțimi a `get_questionnaire_rate_and_counts` pentru mai multe chestionare.
+
+    Întoarce {questionnaire_id: (nr_experti, nr_raspunsuri, rata, respondent_ids)} folosind un număr
+    fix de interogări (experți eligibili, snapshot-uri, submisii trimise), indiferent de câte
+    chestionare sunt listate. Regulile sunt identice: snapshot pentru chestionarele închise care îl
+    au deja, calcul dinamic în rest.
+    """
+
+    if scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER and not chapter:
+        raise ValueError("chapter este obligatoriu pentru scope CHAPTER")
+    if scope == QuestionnaireScopeSnapshot.SCOPE_CRITERION and not criterion:
+        raise ValueError("criterion este obligatoriu pentru scope CRITERION")
+    if not questionnaires:
+        return {}
+
+    scope_id = chapter.id if chapter else (criterion.id if criterion else None)
+    scope_key = QuestionnaireScopeSnapshot.make_scope_key(scope, chapter_id=scope_id, criterion_id=scope_id)
+
+    now = timezone.now()
+    closed_ids = [q.id for q in questionnaires if q.termen_limita < now]
+    result: dict[int, tuple[int, int, float, list[int]]] = {}
+    if closed_ids:
+        for snap in QuestionnaireScopeSnapshot.objects.filter(questionnaire_id__in=closed_ids, scope_key=scope_key):
+            result[snap.questionnaire_id] = (
+                snap.nr_experti,
+                snap.nr_raspunsuri,
+                snap.rata,
+                list(snap.respondent_ids or []),
+            )
+
+    live_ids = [q.id for q in questionnaires if q.id not in result]
+    if live_ids:
+        eligible = _scope_members(scope, [scope_id]).get(scope_id, set())
+        submitted: dict[int, list[int]] = {}
+        for qid, expert_id in Submission.objects.filter(
+            questionnaire_id__in=live_ids,
+            status=Submission.STATUS_TRIMIS,
+        ).values_list("questionnaire_id", "expert_id"):
+            if expert_id in eligible:
+                submitted.setdefault(qid, []).append(expert_id)
+        for qid in live_ids:
+            resp_ids = submitted.get(qid, [])
+            result[qid] = (len(eligible), len(resp_ids), _rate(len(resp_ids), len(eligible)), resp_ids)
+
+    return result
+
+
+@dataclass(frozen=True)
+class SnapshotTarget:
+    """Un (chestionar, scope) pentru care trebuie înghețat snapshot-ul.
+
+    `scope_id` este ID-ul capitolului / criteriului (None pentru GENERAL).
+    """
+
+    questionnaire_id: int
+    deadline: datetime
+    scope: str
+    scope_id: int | None = None
+
+    @property
+    def scope_key(self) -> str:
+        return QuestionnaireScopeSnapshot.make_scope_key(
+            self.scope,
+            chapter_id=self.scope_id,
+            criterion_id=self.scope_id,
+        )
+
+
+def _scope_members(scope: str, scope_ids: Iterable[int]) -> dict[int | None, set[int]]:
+    """ID-urile experților eligibili pentru fiecare scope, dintr-o singură interogare pe `ExpertScopeIndex`."""
+
+    if scope == QuestionnaireScopeSnapshot.SCOPE_GENERAL:
+        return {None: set(User.objects.filter(is_staff=False, is_active=True).values_list("id", flat=True))}
+
+    if scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER:
+        id_field = "chapter_id"
+    elif scope == QuestionnaireScopeSnapshot.SCOPE_CRITERION:
+        id_field = "criterion_id"
+    else:
+        raise ValueError("Scope invalid")
+
+    keys = [QuestionnaireScopeSnapshot.make_scope_key(scope, chapter_id=i, criterion_id=i) for i in scope_ids]
+    members: dict[int | None, set[int]] = {}
+    for scope_id, user_id in ExpertScopeIndex.objects.filter(scope_key__in=keys).values_list(id_field, "user_id"):
+        members.setdefault(scope_id, set()).add(user_id)
+    return members
+
+
+def freeze_scope_snapshots(targets: Iterable[SnapshotTarget]) -> int:
+    """Creează în bloc snapshot-urile lipsă pentru mai multe (chestionar, scope).
+
+    Echivalentul pe mulțimi al `ensure_scope_snapshot`: în loc de lock + 2 interogări per pereche,
+    folosește un număr fix de interogări grupate (snapshot-uri existente, experți eligibili per tip
+    de scope, submisii trimise) și un singur `bulk_create(ignore_conflicts=True)`. Conflictele cu
+    snapshot-uri create concurent sunt ignorate grație constrângerii unice (questionnaire, scope_key).
+
+    Returnează numărul de snapshot-uri noi propuse pentru inserare.
+    """
+
+    by_key: dict[tuple[int, str], SnapshotTarget] = {}
+    for t in targets:
+        by_key.setdefault((t.questionnaire_id, t.scope_key), t)
+    if not by_key:
+        return 0
+
+    qids = {qid for qid, _key in by_key}
+    existing = set(
+        QuestionnaireScopeSnapshot.objects.filter(
+            questionnaire_id__in=qids,
+            scope_key__in={key for _qid, key in by_key},
+        ).values_list("questionnaire_id", "scope_key")
+    )
+    missing = [t for k, t in by_key.items() if k not in existing]
+    if not missing:
+        return 0
+
+    members: dict[str, dict[int | None, set[int]]] = {}
+    for scope in {t.scope for t in missing}:
+        members[scope] = _scope_members(scope, {t.scope_id for t in missing if t.scope == scope})
+
+    submitted: dict[int, set[int]] = {}
+    for qid, expert_id in Submission.objects.filter(
+        questionnaire_id__in={t.questionnaire_id for t in missing},
+        status=Submission.STATUS_TRIMIS,
+    ).values_list("questionnaire_id", "expert_id"):
+        submitted.setdefault(qid, set()).add(expert_id)
+
+    snaps = []
+    for t in missing:
+        eligible = members[t.scope].get(t.scope_id, set())
+        resp_ids = sorted(submitted.get(t.questionnaire_id, set()) & eligible)
+        snaps.append(
+            QuestionnaireScopeSnapshot(
+                questionnaire_id=t.questionnaire_id,
+                scope=t.scope,
+                scope_key=t.scope_key,
+                chapter_id=t.scope_id if t.scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER else None,
+                criterion_id=t.scope_id if t.scope == QuestionnaireScopeSnapshot.SCOPE_CRITERION else None,
+                frozen_for_deadline=t.deadline,
+                nr_experti=len(eligible),
+                nr_raspunsuri=len(resp_ids),
+                respondent_ids=resp_ids,
+            )
+        )
+
+    QuestionnaireScopeSnapshot.objects.bulk_create(snaps, ignore_conflicts=True)
+    return len(snaps)
+
+
+def _closed_scope_targets(through, id_field: str, scope: str, scope_ids: Iterable[int], now: datetime):
+    """Perechile (chestionar ÎNCHIS, scope) pentru scope-urile date, dintr-o singură interogare."""
+
+    return [
+        SnapshotTarget(questionnaire_id=qid, deadline=deadline, scope=scope, scope_id=scope_id)
+        for qid, scope_id, deadline in through.objects.filter(
+            **{f"{id_field}__in": list(scope_ids)},
+            questionnaire__arhivat=False,
+            questionnaire__termen_limita__lt=now,
+        ).values_list("questionnaire_id", id_field, "questionnaire__termen_limita")
+    ]
+
+
+def closed_questionnaire_snapshot_targets(now: datetime | None = None) -> list[SnapshotTarget]:
+    """Toate perechile (chestionar ÎNCHIS, scope) care ar trebui să aibă snapshot.
+
+    - GENERAL pentru chestionarele generale;
+    - câte un CHAPTER / CRITERION pentru fiecare capitol / criteriu alocat chestionarului.
+    """
+
+    now = now or timezone.now()
+    targets = [
+        SnapshotTarget(questionnaire_id=qid, deadline=deadline, scope=QuestionnaireScopeSnapshot.SCOPE_GENERAL)
+        for qid, deadline in Questionnaire.objects.filter(
+            arhivat=False,
+            este_general=True,
+            termen_limita__lt=now,
+        ).values_list("id", "termen_limita")
+    ]
+    for through, id_field, scope in (
+        (Questionnaire.capitole.through, "chapter_id", QuestionnaireScopeSnapshot.SCOPE_CHAPTER),
+        (Questionnaire.criterii.through, "criterion_id", QuestionnaireScopeSnapshot.SCOPE_CRITERION),
+    ):
+        targets.extend(
+            SnapshotTarget(questionnaire_id=qid, deadline=deadline, scope=scope, scope_id=scope_id)
+            for qid, scope_id, deadline in through.objects.filter(
+                questionnaire__arhivat=False,
+                questionnaire__termen_limita__lt=now,
+            ).values_list("questionnaire_id", id_field, "questionnaire__termen_limita")
+        )
+    return targets
+
+
 def freeze_closed_questionnaires_for_chapters(chapter_ids: Iterable[int]) -> None:
     """Asigură snapshot pentru toate chestionarele ÎNCHISE din capitolele date."""
 
@@ -158,15 +381,15 @@ def freeze_closed_questionnaires_for_chapters(chapter_ids: Iterable[int]) -> Non
     if not ids:
         return
 
-    now = timezone.now()
-    for ch in Chapter.objects.filter(id__in=ids):
-        qs = (
-            Questionnaire.objects.filter(arhivat=False, capitole=ch, termen_limita__lt=now)
-            .distinct()
-            .only("id", "termen_limita")
+    freeze_scope_snapshots(
+        _closed_scope_targets(
+            Questionnaire.capitole.through,
+            "chapter_id",
+            QuestionnaireScopeSnapshot.SCOPE_CHAPTER,
+            ids,
+            timezone.now(),
         )
-        for q in qs:
-            ensure_scope_snapshot(q, scope=QuestionnaireScopeSnapshot.SCOPE_CHAPTER, chapter=ch)
+    )
 
 
 def freeze_closed_questionnaires_for_criteria(criterion_ids: Iterable[int]) -> None:
@@ -176,12 +399,429 @@ def freeze_closed_questionnaires_for_criteria(criterion_ids: Iterable[int]) -> N
     if not ids:
         return
 
-    now = timezone.now()
-    for cr in Criterion.objects.filter(id__in=ids):
-        qs = (
-            Questionnaire.objects.filter(arhivat=False, criterii=cr, termen_limita__lt=now)
-            .distinct()
-            .only("id", "termen_limita")
+    freeze_scope_snapshots(
+        _closed_scope_targets(
+            Questionnaire.criterii.through,
+            "criterion_id",
+            QuestionnaireScopeSnapshot.SCOPE_CRITERION,
+            ids,
+            timezone.now(),
+        )
+    )
+
+
+# ---------------------------------------------------------------------------
+# Contoare denormalizate de răspunsuri trimise
+# ---------------------------------------------------------------------------
+
+# (scope, lookup din Submission către alocările expertului)
+_COUNTER_DIMENSIONS = (
+    (QuestionnaireScopeSnapshot.SCOPE_CHAPTER, "expert__profil_expert__capitole"),
+    (QuestionnaireScopeSnapshot.SCOPE_CRITERION, "expert__profil_expert__criterii"),
+)
+
+
+def _make_counter(questionnaire_id: int, scope: str, scope_id: int, nr_trimise: int = 0) -> QuestionnaireScopeCounter:
+    return QuestionnaireScopeCounter(
+        questionnaire_id=questionnaire_id,
+        scope=scope,
+        scope_key=QuestionnaireScopeSnapshot.make_scope_key(scope, chapter_id=scope_id, criterion_id=scope_id),
+        chapter_id=scope_id if scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER else None,
+        criterion_id=scope_id if scope == QuestionnaireScopeSnapshot.SCOPE_CRITERION else None,
+        nr_trimise=nr_trimise,
+    )
+
+
+def count_response_counters(
+    questionnaire_ids: Iterable[int] | None = None,
+) -> tuple[dict[int, int], dict[tuple[int, str], int]]:
+    """Numără din Submission valorile pe care ar trebui să le aibă contoarele.
+
+    Întoarce ({questionnaire_id: total}, {(questionnaire_id, scope_key): nr}) din 3 interogări grupate.
+    `questionnaire_ids=None` înseamnă toate chestionarele.
+    """
+
+    subs = Submission.objects.filter(
+        status=Submission.STATUS_TRIMIS,
+        expert__is_active=True,
+        expert__is_staff=False,
+    )
+    if questionnaire_ids is not None:
+        subs = subs.filter(questionnaire_id__in=list(questionnaire_ids))
+
+    totals = {
+        row["questionnaire_id"]: row["cnt"]
+        for row in subs.values("questionnaire_id").annotate(cnt=Count("id"))
+    }
+    per_scope: dict[tuple[int, str], int] = {}
+    for scope, lookup in _COUNTER_DIMENSIONS:
+        for row in subs.values("questionnaire_id", lookup).annotate(cnt=Count("id")):
+            if row[lookup] is None:
+                continue
+            key = QuestionnaireScopeSnapshot.make_scope_key(scope, chapter_id=row[lookup], criterion_id=row[lookup])
+            per_scope[(row["questionnaire_id"], key)] = row["cnt"]
+    return totals, per_scope
+
+
+@transaction.atomic
+def refresh_response_counters(questionnaire_ids: Iterable[int] | None = None) -> None:
+    """Renumără contoarele pentru chestionarele date (sau pentru toate, dacă `None`).
+
+    Folosit când se schimbă numitorul „cine contează” (alocările sau starea unui expert) și de comanda
+    `rebuild_response_counters`. Trecerea unei submisii în TRIMIS folosește varianta incrementală
+    `record_submission_sent`.
+    """
+
+    ids = None if questionnaire_ids is None else sorted({int(i) for i in questionnaire_ids})
+    if ids == []:
+        return
+
+    totals, per_scope = count_response_counters(ids)
+
+    q_qs = Questionnaire.objects.all() if ids is None else Questionnaire.objects.filter(id__in=ids)
+    q_qs.exclude(id__in=list(totals)).exclude(nr_trimise=0).update(nr_trimise=0)
+    Questionnaire.objects.bulk_update(
+        [Questionnaire(id=qid, nr_trimise=n) for qid, n in totals.items()],
+        ["nr_trimise"],
+        batch_size=500,
+    )
+
+    c_qs = QuestionnaireScopeCounter.objects.all() if ids is None else QuestionnaireScopeCounter.objects.filter(
+        questionnaire_id__in=ids
+    )
+    c_qs.delete()
+    counters = []
+    for (qid, scope_key), n in per_scope.items():
+        prefix, scope_id = scope_key.split(":")
+        scope = QuestionnaireScopeSnapshot.SCOPE_CHAPTER if prefix == "CH" else QuestionnaireScopeSnapshot.SCOPE_CRITERION
+        counters.append(_make_counter(qid, scope, int(scope_id), n))
+    QuestionnaireScopeCounter.objects.bulk_create(counters, batch_size=500)
+
+
+# Chestionarele de renumărat la ieșirea din `deferred_response_counter_refresh` (None = fără amânare).
+_deferred_counter_refresh: ContextVar[set[int] | None] = ContextVar("deferred_counter_refresh", default=None)
+
+
+def request_response_counter_refresh(questionnaire_ids: Iterable[int]) -> None:
+    """Renumără contoarele chestionarelor date acum sau, într-un bloc `deferred_response_counter_refresh`, la final."""
+
+    pending = _deferred_counter_refresh.get()
+    if pending is None:
+        refresh_response_counters(questionnaire_ids)
+    else:
+        pending.update(questionnaire_ids)
+
+
+@contextmanager
+def deferred_response_counter_refresh():
+    """Adună renumărările cerute în bloc (ex. ștergerea în bloc a submisiilor din Django Admin, câte un semnal
+    post_delete per rând) și le face o singură dată, pentru toate chestionarele atinse."""
+
+    pending: set[int] = set()
+    token = _deferred_counter_refresh.set(pending)
+    try:
+        yield
+    finally:
+        _deferred_counter_refresh.reset(token)
+    if pending:
+        refresh_response_counters(pending)
+
+
+def refresh_response_counters_for_expert(user_id: int) -> None:
+    """Renumără contoarele chestionarelor la care expertul are răspunsuri trimise."""
+
+    refresh_response_counters(
+        Submission.objects.filter(expert_id=user_id, status=Submission.STATUS_TRIMIS).values_list(
+            "questionnaire_id", flat=True
+        )
+    )
+
+
+def record_submission_sent(submission: Submission) -> None:
+    """Actualizare incrementală a contoarelor când o submisie trece în TRIMIS.
+
+    Trebuie apelată o singură dată per tranziție DRAFT → TRIMIS, în aceeași tranzacție cu schimbarea
+    statusului. Incrementările folosesc F() (fără read-modify-write), deci sunt sigure la concurență.
+    """
+
+    expert = submission.expert
+    if not expert.is_active or expert.is_staff:
+        return
+
+    qid = submission.questionnaire_id
+    Questionnaire.objects.filter(id=qid).update(nr_trimise=F("nr_trimise") + 1)
+
+    counters = []
+    for scope, through, id_field in (
+        (QuestionnaireScopeSnapshot.SCOPE_CHAPTER, ExpertProfile.capitole.through, "chapter_id"),
+        (QuestionnaireScopeSnapshot.SCOPE_CRITERION, ExpertProfile.criterii.through, "criterion_id"),
+    ):
+        counters.extend(
+            _make_counter(qid, scope, scope_id)
+            for scope_id in through.objects.filter(expertprofile__user_id=expert.id).values_list(id_field, flat=True)
+        )
+    if not counters:
+        return
+
+    QuestionnaireScopeCounter.objects.bulk_create(counters, ignore_conflicts=True)
+    QuestionnaireScopeCounter.objects.filter(
+        questionnaire_id=qid,
+        scope_key__in=[c.scope_key for c in counters],
+    ).update(nr_trimise=F("nr_trimise") + 1, actualizat_la=timezone.now())
+
+
+# ---------------------------------------------------------------------------
+# Indexul experți ↔ scope-uri (ExpertScopeIndex)
+# ---------------------------------------------------------------------------
+
+# (scope, through alocări, câmp ID)
+_INDEX_DIMENSIONS = (
+    (QuestionnaireScopeSnapshot.SCOPE_CHAPTER, ExpertProfile.capitole.through, "chapter_id"),
+    (QuestionnaireScopeSnapshot.SCOPE_CRITERION, ExpertProfile.criterii.through, "criterion_id"),
+)
+
+
+def _make_index_row(user_id: int, scope: str, scope_id: int) -> ExpertScopeIndex:
+    return ExpertScopeIndex(
+        user_id=user_id,
+        scope_key=QuestionnaireScopeSnapshot.make_scope_key(scope, chapter_id=scope_id, criterion_id=scope_id),
+        chapter_id=scope_id if scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER else None,
+        criterion_id=scope_id if scope == QuestionnaireScopeSnapshot.SCOPE_CRITERION else None,
+    )
+
+
+def count_expert_scope_index(user_ids: Iterable[int] | None = None) -> dict[tuple[int, str], ExpertScopeIndex]:
+    """Rândurile pe care ar trebui să le conțină indexul, calculate din alocări (2 interogări).
+
+    Întoarce {(user_id, scope_key): rând nesalvat}; `user_ids=None` înseamnă toți experții.
+    """
+
+    rows: dict[tuple[int, str], ExpertScopeIndex] = {}
+    for scope, through, id_field in _INDEX_DIMENSIONS:
+        links = through.objects.filter(
+            expertprofile__arhivat=False,
+            expertprofile__user__is_active=True,
+            expertprofile__user__is_staff=False,
         )
-        for q in qs:
-            ensure_scope_snapshot(q, scope=QuestionnaireScopeSnapshot.SCOPE_CRITERION, criterion=cr)
+        if user_ids is not None:
+            links = links.filter(expertprofile__user_id__in=list(user_ids))
+        for user_id, scope_id in links.values_list("expertprofile__user_id", id_field):
+            row = _make_index_row(user_id, scope, scope_id)
+            rows[(user_id, row.scope_key)] = row
+    return rows
+
+
+def diff_expert_scope_index(
+    user_ids: Iterable[int] | None = None,
+) -> tuple[list[ExpertScopeIndex], list[tuple[int, str]]]:
+    """Compară indexul cu alocările: întoarce (rânduri lipsă, perechi (user_id, scope_key) în plus)."""
+
+    ids = None if user_ids is None else list(user_ids)
+    expected = count_expert_scope_index(ids)
+    stored_qs = ExpertScopeIndex.objects.all() if ids is None else ExpertScopeIndex.objects.filter(user_id__in=ids)
+    stored = set(stored_qs.values_list("user_id", "scope_key"))
+    missing = [row for key, row in expected.items() if key not in stored]
+    extra = sorted(stored - set(expected))
+    return missing, extra
+
+
+@transaction.atomic
+def refresh_expert_scope_index(user_ids: Iterable[int] | None = None) -> tuple[int, int]:
+    """Aduce la zi indexul pentru experții dați (sau pentru toți, dacă `None`).
+
+    Inserează doar rândurile lipsă și șterge doar pe cele în plus; întoarce (adăugate, șterse).
+    Folosit de semnalele pe alocări / starea expertului și de comanda `rebuild_expert_scope_index`.
+    """
+
+    ids = None if user_ids is None else sorted({int(i) for i in user_ids})
+    if ids == []:
+        return 0, 0
+
+    missing, extra = diff_expert_scope_index(ids)
+    by_user: dict[int, list[str]] = {}
+    for user_id, scope_key in extra:
+        by_user.setdefault(user_id, []).append(scope_key)
+    for user_id, keys in by_user.items():
+        ExpertScopeIndex.objects.filter(user_id=user_id, scope_key__in=keys).delete()
+    ExpertScopeIndex.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+    if missing or extra:
+        # Dashboard-ul PNA afișează experții eligibili din index; bulk_create / delete nu emit post_save.
+        invalidate_pna_dashboard_cache()
+    return len(missing), len(extra)
+
+
+def experts_in_scopes(chapter_ids: Iterable[int] = (), criterion_ids: Iterable[int] = ()):
+    """Subinterogare cu ID-urile experților eligibili alocați oricăruia dintre scope-uri.
+
+    O singură căutare în indexul unic (scope_key, user); de folosit ca `id__in=` / `expert_id__in=`.
+    """
+
+    keys = [
+        QuestionnaireScopeSnapshot.make_scope_key(QuestionnaireScopeSnapshot.SCOPE_CHAPTER, chapter_id=i)
+        for i in chapter_ids
+    ] + [
+        QuestionnaireScopeSnapshot.make_scope_key(QuestionnaireScopeSnapshot.SCOPE_CRITERION, criterion_id=i)
+        for i in criterion_ids
+    ]
+    return ExpertScopeIndex.objects.filter(scope_key__in=keys).values("user_id")
+
+
+def expert_scope_ids(user: User) -> tuple[set[int], set[int]]:
+    """(ID-uri capitole, ID-uri foi de parcurs) alocate expertului.
+
+    Pentru experții activi se citesc din index (o interogare). Experții inactivi / arhivați nu sunt în
+    index (ex. dashboard-ul unui expert arhivat, văzut de admin), deci pentru ei se citesc alocările.
+    """
+
+    chapter_ids: set[int] = set()
+    criterion_ids: set[int] = set()
+    if user.is_active and not user.is_staff:
+        for chapter_id, criterion_id in ExpertScopeIndex.objects.filter(user_id=user.pk).values_list(
+            "chapter_id", "criterion_id"
+        ):
+            if chapter_id is not None:
+                chapter_ids.add(chapter_id)
+            if criterion_id is not None:
+                criterion_ids.add(criterion_id)
+        return chapter_ids, criterion_ids
+
+    for scope, through, id_field in _INDEX_DIMENSIONS:
+        target = chapter_ids if scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER else criterion_ids
+        target.update(through.objects.filter(expertprofile__user_id=user.pk).values_list(id_field, flat=True))
+    return chapter_ids, criterion_ids
+
+
+# ---------------------------------------------------------------------------
+# Statistici sintetice pe capitole / foi de parcurs (Panou administrator)
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ScopeRateSummary:
+    """Statistica sintetică pentru un capitol sau o foaie de parcurs.
+
+    `rate` conține rata fiecărui chestionar din scope (dinamică pentru cele deschise,
+    înghețată pentru cele închise); media lor este rata afișată în Panou.
+    """
+
+    nr_experti: int = 0
+    nr_chestionare: int = 0
+    nr_raspunsuri: int = 0
+    rate: list[float] = field(default_factory=list)
+
+    @property
+    def rata_medie_raspuns(self) -> float:
+        return round(sum(self.rate) / len(self.rate), 1) if self.rate else 0.0
+
+    def as_row(self, obj) -> dict:
+        """Rândul folosit de șablonul Panoului (`portal/admin_dashboard.html`)."""
+        return {
+            "obj": obj,
+            "nr_experti": self.nr_experti,
+            "nr_chestionare": self.nr_chestionare,
+            "nr_raspunsuri": self.nr_raspunsuri,
+            "rata_medie_raspuns": self.rata_medie_raspuns,
+        }
+
+
+@dataclass
+class DashboardScopeStats:
+    """Statisticile tuturor capitolelor și foilor de parcurs, indexate după ID."""
+
+    chapters: dict[int, ScopeRateSummary] = field(default_factory=dict)
+    criteria: dict[int, ScopeRateSummary] = field(default_factory=dict)
+
+    def chapter_row(self, chapter: Chapter) -> dict:
+        return self.chapters.get(chapter.id, ScopeRateSummary()).as_row(chapter)
+
+    def criterion_row(self, criterion: Criterion) -> dict:
+        return self.criteria.get(criterion.id, ScopeRateSummary()).as_row(criterion)
+
+
+def compute_dashboard_scope_stats(now: datetime | None = None) -> DashboardScopeStats:
+    """Calculează statisticile din Panou pentru TOATE capitolele și foile de parcurs.
+
+    Înlocuiește buclele per capitol / per criteriu cu un număr constant de interogări grupate:
+      1) experții eligibili per capitol și per criteriu (din `ExpertScopeIndex`);
+      2) legăturile chestionar ↔ capitol / criteriu (doar chestionare nearhivate);
+      3) snapshot-urile existente pentru chestionarele închise;
+      4) contoarele de răspunsuri trimise per (chestionar, capitol) și (chestionar, criteriu)
+         (`QuestionnaireScopeCounter`, fără join-uri pe Submission).
+
+    Chestionarele deschise folosesc numărul curent de experți alocați ca denominator.
+    Chestionarele închise folosesc snapshot-ul; dacă acesta lipsește încă, valorile se calculează
+    dinamic (identic cu ce ar îngheța `ensure_scope_snapshot`), fără a scrie în baza de date.
+    """
+
+    now = now or timezone.now()
+    stats = DashboardScopeStats()
+
+    dimensions = (
+        # (dict rezultat, through chestionare, câmp ID, scope)
+        (
+            stats.chapters,
+            Questionnaire.capitole.through,
+            "chapter_id",
+            QuestionnaireScopeSnapshot.SCOPE_CHAPTER,
+        ),
+        (
+            stats.criteria,
+            Questionnaire.criterii.through,
+            "criterion_id",
+            QuestionnaireScopeSnapshot.SCOPE_CRITERION,
+        ),
+    )
+
+    # Snapshot-urile chestionarelor închise (ambele tipuri de scope, o singură interogare).
+    snapshots: dict[tuple[str, int, int], tuple[int, int]] = {}
+    for qid, scope, ch_id, cr_id, nr_exp, nr_resp in QuestionnaireScopeSnapshot.objects.filter(
+        questionnaire__arhivat=False,
+        questionnaire__termen_limita__lt=now,
+        scope__in=[QuestionnaireScopeSnapshot.SCOPE_CHAPTER, QuestionnaireScopeSnapshot.SCOPE_CRITERION],
+    ).values_list("questionnaire_id", "scope", "chapter_id", "criterion_id", "nr_experti", "nr_raspunsuri"):
+        scope_id = ch_id if scope == QuestionnaireScopeSnapshot.SCOPE_CHAPTER else cr_id
+        if scope_id is not None:
+            snapshots[(scope, scope_id, qid)] = (int(nr_exp or 0), int(nr_resp or 0))
+
+    for result, q_through, id_field, scope in dimensions:
+        alloc_counts = {
+            row[id_field]: row["cnt"]
+            for row in ExpertScopeIndex.objects.filter(**{f"{id_field}__isnull": False})
+            .values(id_field)
+            .annotate(cnt=Count("user_id"))
+        }
+
+        links: dict[int, list[tuple[int, bool]]] = {}
+        live_qids: set[int] = set()
+        for qid, scope_id, deadline in q_through.objects.filter(questionnaire__arhivat=False).values_list(
+            "questionnaire_id", id_field, "questionnaire__termen_limita"
+        ):
+            is_open = deadline >= now
+            links.setdefault(scope_id, []).append((qid, is_open))
+            if is_open or (scope, scope_id, qid) not in snapshots:
+                live_qids.add(qid)
+
+        live_counts: dict[tuple[int, int], int] = {}
+        if live_qids:
+            live_counts = {
+                (qid, scope_id): n
+                for qid, scope_id, n in QuestionnaireScopeCounter.objects.filter(
+                    questionnaire_id__in=sorted(live_qids),
+                    scope=scope,
+                ).values_list("questionnaire_id", id_field, "nr_trimise")
+            }
+
+        for scope_id in set(alloc_counts) | set(links):
+            summary = ScopeRateSummary(nr_experti=int(alloc_counts.get(scope_id, 0)))
+            for qid, is_open in links.get(scope_id, []):
+                snap = None if is_open else snapshots.get((scope, scope_id, qid))
+                if snap:
+                    nr_exp, nr_resp = snap
+                else:
+                    nr_exp, nr_resp = summary.nr_experti, int(live_counts.get((qid, scope_id), 0))
+                summary.nr_chestionare += 1
+                summary.nr_raspunsuri += nr_resp
+                summary.rate.append(_rate(nr_resp, nr_exp))
+            result[scope_id] = summary
+
+    return stats
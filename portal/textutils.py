@@ -34,3 +34,15 @@ def newsletter_text_to_html(text: str) -> str:
     s = s.replace("\r\n", "\n").replace("\r", "\n")
     s = s.replace("\n", "<br>\n")
     return mark_safe(s)
+
+
+def newsletter_text_to_plain(text: str) -> str:
+    """Varianta text a newsletterului (partea text/plain a emailului).
+
+    Linkurile Markdown devin „text (https://exemplu.md)”; capetele de linie sunt normalizate.
+    """
+    if not text:
+        return ""
+
+    s = text.replace("\r\n", "\n").replace("\r", "\n").strip()
+    return _MD_LINK_RE.sub(lambda m: f"{m.group(1)} ({m.group(2)})", s)
@@ -50,6 +50,12 @@ urlpatterns = [
     path("administrare/newslettere/nou/", views.admin_newsletter_create, name="admin_newsletter_create"),
     path("administrare/newslettere/<int:pk>/editare/", views.admin_newsletter_edit, name="admin_newsletter_edit"),
     path("administrare/newslettere/<int:pk>/trimite/", views.admin_newsletter_send, name="admin_newsletter_send"),
+    path("administrare/newslettere/<int:pk>/livrare/", views.admin_newsletter_deliveries, name="admin_newsletter_deliveries"),
+    path(
+        "administrare/newslettere/<int:pk>/livrare/retrimite-esuate/",
+        views.admin_newsletter_resend_failed,
+        name="admin_newsletter_resend_failed",
+    ),
 
     path("administrare/chestionare/", views.admin_questionnaire_list, name="admin_chestionare_list"),
     path("administrare/chestionare/nou/", views.admin_questionnaire_create, name="admin_chestionar_create"),
@@ -125,6 +131,8 @@ urlpatterns = [
     path("administrare/arhiva/", views.admin_arhiva, name="admin_arhiva"),
 
     path("administrare/export/", views.admin_export, name="admin_export"),
+    path("administrare/export/job/<int:pk>/", views.admin_export_job, name="admin_export_job"),
+    path("administrare/export/job/<int:pk>/descarca/", views.admin_export_job_download, name="admin_export_job_download"),
 
     # PNA (etapa 1 – doar admin)
     path("administrare/pna/", views.admin_pna_list, name="admin_pna_list"),
@@ -152,6 +160,7 @@ urlpatterns = [
     ),
     path("administrare/pna/scop/", views.admin_pna_scope_list, name="admin_pna_scope_list"),
     path("administrare/pna/filtru/", views.admin_pna_filtered_list, name="admin_pna_filtered_list"),
+    path("administrare/pna/filtru/export/", views.admin_pna_filtered_export, name="admin_pna_filtered_export"),
     path("administrare/pna/contributii/", views.admin_pna_all_contributions, name="admin_pna_all_contributions"),
     path("administrare/pna/solicitari-prezentare/", views.staff_pna_presentation_requests, name="staff_pna_presentation_requests"),
     path("administrare/pna/institutii/", views.admin_pna_institution_list, name="admin_pna_institution_list"),
@@ -1,7 +1,241 @@
+import hashlib
+import time
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, NamedTuple, Tuple
 
-from .models import Chapter, Cluster
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from .models import (
+    Chapter,
+    Cluster,
+    Criterion,
+    EUAct,
+    ParliamentCommission,
+    PnaExpertContribution,
+    PnaInstitution,
+    PnaProject,
+    PnaProjectEUAct,
+    PnaProjectStatusHistory,
+)
+
+
+# -------------------- Cache pentru datele de referință --------------------
+#
+# Clusterele, capitolele, criteriile, comisiile și instituțiile PNA se modifică de câteva ori pe an,
+# dar sunt citite la aproape fiecare pagină. Le păstrăm ca liste în cache-ul configurat (CACHES) și
+# le invalidăm din semnalele post_save / post_delete (vezi signals.py).
+
+REFERENCE_CACHE_PREFIX = "portal:referinte"
+
+_REFERENCE_LOADERS: Dict[str, Callable[[], list]] = {
+    "clusters": lambda: list(Cluster.objects.all().order_by("ordonare", "cod")),
+    "chapters": lambda: list(Chapter.objects.select_related("cluster").order_by("numar")),
+    "criteria": lambda: list(Criterion.objects.all().order_by("cod")),
+    "commissions": lambda: list(ParliamentCommission.objects.filter(activa=True).order_by("ordine", "nume")),
+    "institutions": lambda: list(PnaInstitution.objects.all().order_by("nume")),
+}
+
+# Ce chei trebuie invalidate la modificarea fiecărui model.
+# (Capitolele păstrează clusterul atașat, deci depind și de Cluster.)
+REFERENCE_CACHE_DEPENDENCIES: Dict[type, Tuple[str, ...]] = {
+    Cluster: ("clusters", "chapters"),
+    Chapter: ("chapters",),
+    Criterion: ("criteria",),
+    ParliamentCommission: ("commissions",),
+    PnaInstitution: ("institutions",),
+}
+
+
+def _reference_cache_key(name: str) -> str:
+    return f"{REFERENCE_CACHE_PREFIX}:{name}"
+
+
+def _cached_reference(name: str) -> list:
+    key = _reference_cache_key(name)
+    data = cache.get(key)
+    if data is None:
+        data = _REFERENCE_LOADERS[name]()
+        cache.set(key, data, getattr(settings, "REFERENCE_CACHE_TIMEOUT", 300))
+    # Copie: apelantul poate modifica lista fără a afecta valoarea din cache (locmem).
+    return list(data)
+
+
+def get_clusters() -> List[Cluster]:
+    return _cached_reference("clusters")
+
+
+def get_chapters() -> List[Chapter]:
+    """Capitolele ordonate după număr (cu clusterul deja încărcat)."""
+    return _cached_reference("chapters")
+
+
+def get_criteria() -> List[Criterion]:
+    return _cached_reference("criteria")
+
+
+def get_commissions() -> List[ParliamentCommission]:
+    """Comisiile parlamentare active."""
+    return _cached_reference("commissions")
+
+
+def get_institutions() -> List[PnaInstitution]:
+    return _cached_reference("institutions")
+
+
+def invalidate_reference_cache(*names: str) -> None:
+    """Șterge din cache listele date (sau toate, dacă nu se specifică nimic)."""
+    cache.delete_many([_reference_cache_key(n) for n in (names or _REFERENCE_LOADERS)])
+
+
+# -------------------- Cache pentru dashboard-ul PNA --------------------
+#
+# Agregatele dashboard-ului PNA (KPI-uri, matrice, breakdown-uri) sunt calculate o singură dată per
+# scope / etapă / parametri și păstrate în cache. Cheile includ o "versiune" globală, incrementată la
+# orice modificare relevantă (proiecte, acte UE, contribuții, istoric status, alocări experți);
+# o versiune nouă face ca toate intrările vechi să fie ignorate (și să expire singure).
+
+PNA_DASHBOARD_CACHE_PREFIX = "portal:pna-dashboard"
+
+# Modele a căror modificare invalidează dashboard-ul PNA (post_save / post_delete, vezi signals.py).
+# Indexul experți ↔ scope-uri (experții eligibili) invalidează cache-ul direct, din stats.refresh_expert_scope_index.
+PNA_DASHBOARD_CACHE_DEPENDENCIES: Tuple[type, ...] = (
+    PnaProject,
+    PnaProjectEUAct,
+    PnaExpertContribution,
+    PnaProjectStatusHistory,
+    EUAct,
+    PnaInstitution,
+    ParliamentCommission,
+    Chapter,
+    Criterion,
+    Cluster,
+)
+
+
+def _pna_dashboard_version_key() -> str:
+    return f"{PNA_DASHBOARD_CACHE_PREFIX}:versiune"
+
+
+def _pna_dashboard_version() -> int:
+    key = _pna_dashboard_version_key()
+    version = cache.get(key)
+    if version is None:
+        # Dacă versiunea a fost evacuată din cache, nu refolosim o valoare veche (ar reactiva intrări expirate).
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key) or 0
+    return int(version)
+
+
+def invalidate_pna_dashboard_cache() -> None:
+    """Marchează ca expirate toate agregatele dashboard-ului PNA din cache."""
+    key = _pna_dashboard_version_key()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+class _PnaDashboardRef(NamedTuple):
+    """Referință la un obiect din contextul dashboard-ului PNA, așa cum este păstrată în cache."""
+
+    model: str
+    pk: int
+
+
+def _load_pna_dashboard_projects(ids: list) -> dict:
+    # Capitolele / foile de parcurs sunt necesare pentru atasare_label.
+    return (
+        PnaProject.objects.select_related("chapter", "criterion")
+        .prefetch_related("chapters", "criteria")
+        .in_bulk(ids)
+    )
+
+
+# Cum se reîncarcă obiectele referite din cache: datele de referință din listele deja păstrate în cache,
+# proiectele prin `_load_pna_dashboard_projects`; restul modelelor cu in_bulk.
+_PNA_DASHBOARD_REF_LOADERS: Dict[type, Callable[[list], dict]] = {
+    Cluster: lambda ids: {obj.pk: obj for obj in get_clusters()},
+    Chapter: lambda ids: {obj.pk: obj for obj in get_chapters()},
+    Criterion: lambda ids: {obj.pk: obj for obj in get_criteria()},
+    PnaInstitution: lambda ids: {obj.pk: obj for obj in get_institutions()},
+    PnaProject: _load_pna_dashboard_projects,
+}
+
+
+def _dehydrate_pna_dashboard(value):
+    """Înlocuiește obiectele model din context cu referințe (model, pk) – în cache intră doar ID-uri și scalari."""
+    if isinstance(value, models.Model):
+        return _PnaDashboardRef(value._meta.label, value.pk)
+    if isinstance(value, dict):
+        return {k: _dehydrate_pna_dashboard(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_dehydrate_pna_dashboard(v) for v in value]
+    if type(value) is tuple:
+        return tuple(_dehydrate_pna_dashboard(v) for v in value)
+    return value
+
+
+def _collect_pna_dashboard_refs(value, refs: Dict[str, set]) -> None:
+    if isinstance(value, _PnaDashboardRef):
+        refs.setdefault(value.model, set()).add(value.pk)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _collect_pna_dashboard_refs(v, refs)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _collect_pna_dashboard_refs(v, refs)
+
+
+def _rehydrate_pna_dashboard(data: dict) -> dict | None:
+    """Reconstruiește obiectele referite în `data` (o interogare per model).
+
+    Returnează None dacă un obiect nu mai există (contextul trebuie recalculat).
+    """
+    refs: Dict[str, set] = {}
+    _collect_pna_dashboard_refs(data, refs)
+    loaded: Dict[str, dict] = {}
+    for label, ids in refs.items():
+        model = apps.get_model(label)
+        loader = _PNA_DASHBOARD_REF_LOADERS.get(model)
+        objs = loader(list(ids)) if loader else model._default_manager.in_bulk(list(ids))
+        if not ids.issubset(objs):
+            return None
+        loaded[label] = objs
+
+    def _restore(value):
+        if isinstance(value, _PnaDashboardRef):
+            return loaded[value.model][value.pk]
+        if isinstance(value, dict):
+            return {k: _restore(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [_restore(v) for v in value]
+        if type(value) is tuple:
+            return tuple(_restore(v) for v in value)
+        return value
+
+    return _restore(data)
+
+
+def get_cached_pna_dashboard(key_parts: tuple, build: Callable[[], dict]) -> dict:
+    """Returnează agregatele dashboard-ului PNA pentru `key_parts` (scope, etapă, parametri).
+
+    La miss, le calculează cu `build()` și le salvează pentru PNA_DASHBOARD_CACHE_TIMEOUT secunde.
+    Parametrii sunt rezumați într-un hash (cheile cache-ului în DB sunt limitate la 255 de caractere),
+    iar obiectele model sunt păstrate ca referințe și reîncărcate la afișare.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in key_parts).encode()).hexdigest()
+    key = f"{PNA_DASHBOARD_CACHE_PREFIX}:v{_pna_dashboard_version()}:{digest}"
+    cached = cache.get(key)
+    if cached is not None:
+        data = _rehydrate_pna_dashboard(cached)
+        if data is not None:
+            return data
+    data = build()
+    cache.set(key, _dehydrate_pna_dashboard(data), getattr(settings, "PNA_DASHBOARD_CACHE_TIMEOUT", 60))
+    return data
 
 
 def group_chapters_by_cluster() -> List[Tuple[Cluster | None, List[Chapter]]]:
@@ -9,11 +243,11 @@ def group_chapters_by_cluster() -> List[Tuple[Cluster | None, List[Chapter]]]:
 
     Capitolele fără cluster (34, 35) sunt returnate la final sub cluster=None.
     """
-    clusters = list(Cluster.objects.all().order_by("ordonare", "cod"))
+    clusters = get_clusters()
     by_cluster: Dict[int, List[Chapter]] = defaultdict(list)
     no_cluster: List[Chapter] = []
 
-    for ch in Chapter.objects.all().order_by("numar"):
+    for ch in get_chapters():
         if ch.cluster_id:
             by_cluster[ch.cluster_id].append(ch)
         else:
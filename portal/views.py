@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import base64
 import csv
 import io
+import json
 import secrets
 import re
+import tempfile
 import calendar as pycalendar
 from datetime import datetime, timedelta, date
 from urllib.parse import urlencode
@@ -17,16 +20,17 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
-from django.db.models import Q, Count, Max, Prefetch
+from django.db.models import F, Q, Count, Max, Prefetch
 from django.db.models.functions import Coalesce
 from django.forms import formset_factory
-from django.http import Http404, HttpResponse, JsonResponse, FileResponse
+from django.http import Http404, HttpResponse, JsonResponse, FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 
-from .exports import export_csv, export_pdf, export_xlsx
+from .export_jobs import create_export_job, get_cached_export, resume_stale_export_job
+from .exports import get_export_watermark, record_export_watermark, stream_csv_and_record_watermark
 from .forms import (
     ChestionarForm,
     ExpertCreateForm,
@@ -53,14 +57,15 @@ from .models import (
     Answer,
     AnswerComment,
     Chapter,
-    Cluster,
     Criterion,
     ExpertProfile,
+    ExportJob,
     ImportRun,
     Question,
     Questionnaire,
     Submission,
     Newsletter,
+    OutboundEmail,
     QuestionnaireScopeSnapshot,
     PnaProject,
     PnaInstitution,
@@ -74,11 +79,56 @@ from .models import (
     ParliamentCommission,
     DocumentCategory,
     PlatformDocument,
+    attach_pna_scope_ids,
+)
+from .notifications import (
+    queue_new_questionnaire_emails,
+    queue_newsletter_emails,
+    resend_failed_newsletter_emails,
+)
+from .stats import (
+    compute_dashboard_scope_stats,
+    expert_scope_ids,
+    experts_in_scopes,
+    get_questionnaires_rates_and_counts,
+    record_submission_sent,
+)
+from .utils import (
+    get_chapters,
+    get_clusters,
+    get_commissions,
+    get_criteria,
+    get_cached_pna_dashboard,
+    get_institutions,
+    group_chapters_by_cluster,
+)
+from .pna_dashboard import (
+    PNA_COST_YEARS,
+    PNA_STAGE_FILTERS,
+    PNA_STAGE_GROUP_FINAL,
+    PNA_STAGE_GROUP_GUVERN,
+    PNA_STAGE_GROUP_NEINITIATE,
+    PNA_STAGE_GROUP_PARLAMENT,
+    PNA_STAGE_PRE_PARLAMENT,
+    ContributionProgressAccumulator,
+    DataQualityAccumulator,
+    DeadlineAccumulator,
+    DeadlineMatrixAccumulator,
+    DerapajeAccumulator,
+    EUActsAccumulator,
+    PnaDashboardItem,
+    ResourceAccumulator,
+    RiskAccumulator,
+    StaleAccumulator,
+    StatusCountsAccumulator,
+    run_pna_pipeline,
+)
+from .pna_import_utils import (
+    build_pna_import_template_bytes,
+    run_pna_import_workbook,
+    stream_pna_export_csv,
+    write_pna_export_workbook,
 )
-from .notifications import send_new_questionnaire_emails, send_newsletter_emails
-from .stats import get_questionnaire_rate_and_counts, ensure_scope_snapshot
-from .utils import group_chapters_by_cluster
-from .pna_import_utils import build_pna_import_template_bytes, run_pna_import_workbook
 
 
 def is_admin(user: User) -> bool:
@@ -140,12 +190,12 @@ def _get_or_create_profile(user: User) -> ExpertProfile:
 
 
 def _expert_accessible_qs(user: User):
-    profil = _get_or_create_profile(user)
+    chapter_ids, criterion_ids = expert_scope_ids(user)
     return (
         Questionnaire.objects.filter(arhivat=False).filter(
             Q(este_general=True)
-            | Q(capitole__in=profil.capitole.all())
-            | Q(criterii__in=profil.criterii.all())
+            | Q(capitole__in=chapter_ids)
+            | Q(criterii__in=criterion_ids)
         )
         .distinct()
         .order_by("termen_limita")
@@ -160,9 +210,7 @@ def _expert_can_access(user: User, chestionar: Questionnaire) -> bool:
     if getattr(chestionar, "este_general", False):
         return True
 
-    profil = _get_or_create_profile(user)
-    expert_chapters = set(profil.capitole.values_list("id", flat=True))
-    expert_criteria = set(profil.criterii.values_list("id", flat=True))
+    expert_chapters, expert_criteria = expert_scope_ids(user)
     q_chapters = set(chestionar.capitole.values_list("id", flat=True))
     q_criteria = set(chestionar.criterii.values_list("id", flat=True))
 
@@ -180,14 +228,14 @@ def _expert_pna_accessible_qs(user: User):
     Regulă: proiecte atașate capitolelor sau foilor de parcurs alocate expertului.
     """
 
-    profil = _get_or_create_profile(user)
+    chapter_ids, criterion_ids = expert_scope_ids(user)
     return (
         PnaProject.objects.filter(arhivat=False)
         .filter(
-            Q(chapters__in=profil.capitole.all())
-            | Q(criteria__in=profil.criterii.all())
-            | Q(chapter__in=profil.capitole.all())
-            | Q(criterion__in=profil.criterii.all())
+            Q(chapters__in=chapter_ids)
+            | Q(criteria__in=criterion_ids)
+            | Q(chapter__in=chapter_ids)
+            | Q(criterion__in=criterion_ids)
         )
         .distinct()
         .select_related("chapter", "criterion", "institutie_principala_ref", "comisie_responsabila")
@@ -200,19 +248,18 @@ def _pna_scope_label(proiect: PnaProject) -> str:
     return proiect.atasare_label if proiect else "—"
 
 
-def _pna_chapter_ids(proiect: PnaProject) -> set[int]:
-    return {ch.id for ch in proiect.scope_chapters() if ch and ch.id}
+def _pna_chapter_ids(proiect: PnaProject) -> frozenset[int]:
+    return proiect.scope_chapter_ids
 
 
-def _pna_criterion_ids(proiect: PnaProject) -> set[int]:
-    return {cr.id for cr in proiect.scope_criteria() if cr and cr.id}
+def _pna_criterion_ids(proiect: PnaProject) -> frozenset[int]:
+    return proiect.scope_criterion_ids
 
 
 def _profile_matches_pna_project(profil: ExpertProfile | None, proiect: PnaProject) -> bool:
     if not profil:
         return False
-    expert_chapters = set(profil.capitole.values_list("id", flat=True))
-    expert_criteria = set(profil.criterii.values_list("id", flat=True))
+    expert_chapters, expert_criteria = expert_scope_ids(profil.user)
     return bool(
         expert_chapters.intersection(_pna_chapter_ids(proiect))
         or expert_criteria.intersection(_pna_criterion_ids(proiect))
@@ -220,22 +267,6 @@ def _profile_matches_pna_project(profil: ExpertProfile | None, proiect: PnaProje
 
 
 
-PNA_STAGE_GROUP_NEINITIATE = [PnaProject.STATUS_NEINITIAT]
-PNA_STAGE_GROUP_GUVERN = [
-    PnaProject.STATUS_INITIAT_GUVERN,
-    PnaProject.STATUS_AVIZARE_GUVERN,
-    PnaProject.STATUS_COORDONARE_CE,
-    PnaProject.STATUS_APROBARE_GUVERN,
-]
-PNA_STAGE_GROUP_PARLAMENT = [
-    PnaProject.STATUS_INITIAT_PARLAMENT,
-    PnaProject.STATUS_AVIZARE_PARLAMENT,
-    PnaProject.STATUS_ADOPTAT_PRIMA_LECTURA,
-]
-PNA_STAGE_GROUP_FINAL = [PnaProject.STATUS_ADOPTAT_FINAL]
-PNA_STAGE_PRE_PARLAMENT = PNA_STAGE_GROUP_NEINITIATE + PNA_STAGE_GROUP_GUVERN
-
-
 def _apply_pna_stage_filter_to_qs(qs, stage: str):
     """Aplică filtrul agregat de etapă pentru liste/dashboard PNA.
 
@@ -260,6 +291,103 @@ def _apply_pna_stage_filter_to_qs(qs, stage: str):
     return qs
 
 
+def _pna_deadline_expr():
+    """Deadline-ul proiectului în SQL (aceeași regulă ca PnaProject.termen_deadline)."""
+    return Coalesce(
+        "termen_actualizat_aprobare_guvern",
+        "termen_aprobare_parlament",
+        "termen_aprobare_guvern",
+    )
+
+
+def _pna_stage_counts(qs) -> dict:
+    """Total + nr. proiecte pe etape, dintr-o singură interogare agregată."""
+    counts = {
+        r["status_implementare"]: int(r["nr"])
+        for r in qs.order_by().values("status_implementare").annotate(nr=Count("id", distinct=True))
+    }
+    return {
+        "total": sum(counts.values()),
+        "nr_neinitiate": sum(n for code, n in counts.items() if code in PNA_STAGE_GROUP_NEINITIATE),
+        "nr_in_procedura_guvern": sum(n for code, n in counts.items() if code in PNA_STAGE_GROUP_GUVERN),
+        "nr_in_procedura_parlament": sum(n for code, n in counts.items() if code in PNA_STAGE_GROUP_PARLAMENT),
+        "nr_adoptate_final": sum(n for code, n in counts.items() if code in PNA_STAGE_GROUP_FINAL),
+    }
+
+
+PNA_PAGE_SIZES = (25, 50, 100, 200, 500)
+
+
+def _encode_pna_cursor(p: PnaProject) -> str:
+    deadline = p.deadline.isoformat() if p.deadline else None
+    raw = json.dumps([deadline, p.titlu, p.pk], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_pna_cursor(value: str):
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode("utf-8")
+        deadline, titlu, pk = json.loads(raw)
+        return (date.fromisoformat(deadline) if deadline else None), str(titlu), int(pk)
+    except Exception:
+        return None
+
+
+def _paginate_pna_projects(request, qs, default_page_size: int = 50):
+    """Paginare keyset pe (deadline, titlu, id) pentru listele PNA.
+
+    `qs` trebuie să aibă adnotarea `deadline` (vezi `_pna_deadline_expr`). Parametri GET:
+      - per_page: mărimea paginii (una din PNA_PAGE_SIZES)
+      - after: cursorul ultimului proiect de pe pagina anterioară
+    Proiectele fără deadline sunt la final. Se încarcă doar pagina curentă (cu prefetch-urile lui `qs`).
+    Returnează (proiecte, pager) – pager este folosit de portal/pna_pager.html.
+    """
+
+    try:
+        per_page = int(request.GET.get("per_page") or default_page_size)
+    except (TypeError, ValueError):
+        per_page = default_page_size
+    if per_page not in PNA_PAGE_SIZES:
+        per_page = default_page_size
+
+    cursor = _decode_pna_cursor((request.GET.get("after") or "").strip())
+    if cursor:
+        deadline, titlu, pk = cursor
+        after_title = Q(titlu__gt=titlu) | Q(titlu=titlu, pk__gt=pk)
+        if deadline is None:
+            qs = qs.filter(Q(deadline__isnull=True) & after_title)
+        else:
+            qs = qs.filter(
+                Q(deadline__gt=deadline)
+                | (Q(deadline=deadline) & after_title)
+                | Q(deadline__isnull=True)
+            )
+
+    page = list(qs.order_by(F("deadline").asc(nulls_last=True), "titlu", "pk")[: per_page + 1])
+    has_next = len(page) > per_page
+    page = page[:per_page]
+
+    def _url(**changes) -> str:
+        params = request.GET.copy()
+        for key, value in changes.items():
+            params.pop(key, None)
+            if value:
+                params[key] = value
+        qs_str = params.urlencode()
+        return request.path + (f"?{qs_str}" if qs_str else "")
+
+    pager = {
+        "per_page": per_page,
+        "is_first": cursor is None,
+        "shown": len(page),
+        "first_url": _url(after=None),
+        "next_url": _url(after=_encode_pna_cursor(page[-1])) if has_next else None,
+        "page_size_links": [
+            {"size": size, "url": _url(per_page=str(size), after=None), "active": size == per_page}
+            for size in PNA_PAGE_SIZES
+        ],
+    }
+    return page, pager
 
 
 def _is_truthy(value):
@@ -873,29 +1001,25 @@ def expert_pna_list(request):
     if selected_commissions:
         proiecte_qs = proiecte_qs.filter(comisie_responsabila_id__in=selected_commissions)
 
-    all_projects = list(proiecte_qs)
-    total = len(all_projects)
-    nr_neinitiate = sum(1 for p in all_projects if p.status_implementare in PNA_STAGE_GROUP_NEINITIATE)
-    nr_in_procedura_guvern = sum(1 for p in all_projects if p.status_implementare in PNA_STAGE_GROUP_GUVERN)
-    nr_in_procedura_parlament = sum(1 for p in all_projects if p.status_implementare in PNA_STAGE_GROUP_PARLAMENT)
-    nr_adoptate_final = sum(1 for p in all_projects if p.status_implementare in PNA_STAGE_GROUP_FINAL)
+    stage_counts = _pna_stage_counts(proiecte_qs)
 
     proiecte_qs = _apply_pna_stage_filter_to_qs(proiecte_qs, stage)
     if pending:
-        contrib_project_ids = set(
-            PnaExpertContribution.objects.filter(expert=request.user, project__in=proiecte_qs)
+        proiecte_qs = proiecte_qs.exclude(
+            id__in=PnaExpertContribution.objects.filter(expert=request.user)
             .exclude(comentariu="")
-            .values_list("project_id", flat=True)
+            .values("project_id")
         )
-        proiecte_qs = proiecte_qs.exclude(id__in=contrib_project_ids)
 
-    proiecte = list(proiecte_qs)
+    proiecte_qs = proiecte_qs.annotate(deadline=_pna_deadline_expr())
+    nr_rezultate = proiecte_qs.count()
+    proiecte, pager = _paginate_pna_projects(request, proiecte_qs, default_page_size=100)
 
     # map contribuții (per expert)
     contribs = {
         c.project_id: c
         for c in PnaExpertContribution.objects.filter(
-            expert=request.user, project__in=proiecte_qs
+            expert=request.user, project_id__in=[p.id for p in proiecte]
         )
     }
 
@@ -908,7 +1032,7 @@ def expert_pna_list(request):
         for chapter_id in _pna_chapter_ids(p):
             by_chapter.setdefault(chapter_id, []).append(p)
 
-    criterii = list(Criterion.objects.all().order_by("cod"))
+    criterii = get_criteria()
     criterii_groups = []
     for cr in criterii:
         rows = by_criterion.get(cr.id, [])
@@ -937,13 +1061,11 @@ def expert_pna_list(request):
             "chapter_groups": chapter_groups,
             "contribs": contribs,
             "stage": stage,
-            "commissions": ParliamentCommission.objects.filter(activa=True).order_by("ordine", "nume"),
+            "commissions": get_commissions(),
             "selected_commissions": [str(x) for x in selected_commissions],
-            "total": total,
-            "nr_neinitiate": nr_neinitiate,
-            "nr_in_procedura_guvern": nr_in_procedura_guvern,
-            "nr_in_procedura_parlament": nr_in_procedura_parlament,
-            "nr_adoptate_final": nr_adoptate_final,
+            **stage_counts,
+            "nr_rezultate": nr_rezultate,
+            "pager": pager,
             "stage": stage,
             "pending": pending,
         },
@@ -1119,9 +1241,19 @@ def expert_questionnaire(request, pk: int):
             form.save()
             actiune = request.POST.get("actiune", "salveaza")
             if actiune == "trimite":
-                submission.status = Submission.STATUS_TRIMIS
-                submission.trimis_la = timezone.now()
-                submission.save(update_fields=["status", "trimis_la", "actualizat_la"])
+                with transaction.atomic():
+                    # Tranziția DRAFT → TRIMIS este condiționată în SQL, ca două trimiteri concurente
+                    # să nu incrementeze contoarele de două ori.
+                    trecut_in_trimis = (
+                        Submission.objects.filter(pk=submission.pk)
+                        .exclude(status=Submission.STATUS_TRIMIS)
+                        .update(status=Submission.STATUS_TRIMIS)
+                    )
+                    submission.status = Submission.STATUS_TRIMIS
+                    submission.trimis_la = timezone.now()
+                    submission.save(update_fields=["status", "trimis_la", "actualizat_la"])
+                    if trecut_in_trimis:
+                        record_submission_sent(submission)
                 messages.success(request, "Răspunsurile au fost trimise.")
             else:
                 # Dacă a fost deja trimis, păstrăm statusul TRIMIS, dar permitem actualizarea răspunsurilor până la termen.
@@ -1188,221 +1320,14 @@ def admin_dashboard(request):
     # ------------------------------
     # Statistici sintetice: Capitole & foi de parcurs
     # ------------------------------
-    criterii = list(Criterion.objects.all().order_by("cod"))
-    grouped_chapters = group_chapters_by_cluster()
-
-    # 1) Alocări (doar experți activi, non-admin)
-    profiles = (
-        ExpertProfile.objects.select_related("user")
-        .filter(user__is_active=True, user__is_staff=False)
-        .prefetch_related("capitole", "criterii")
-    )
+    # Calculate pe mulțimi (număr constant de interogări), vezi stats.compute_dashboard_scope_stats.
+    scope_stats = compute_dashboard_scope_stats()
 
-    chapter_alloc: dict[int, set[int]] = {}
-    criterion_alloc: dict[int, set[int]] = {}
-    for p in profiles:
-        uid = p.user_id
-        for ch in p.capitole.all():
-            chapter_alloc.setdefault(ch.id, set()).add(uid)
-        for cr in p.criterii.all():
-            criterion_alloc.setdefault(cr.id, set()).add(uid)
-
-    # 2) Chestionare (doar nearhivate)
-    q_all = (
-        Questionnaire.objects.filter(arhivat=False)
-        .prefetch_related("capitole", "criterii")
-        .only("id", "termen_limita")
-    )
-    q_by_id: dict[int, Questionnaire] = {q.id: q for q in q_all}
-
-    chapter_q: dict[int, set[int]] = {}
-    criterion_q: dict[int, set[int]] = {}
-    for q in q_all:
-        qid = q.id
-        for ch in q.capitole.all():
-            chapter_q.setdefault(ch.id, set()).add(qid)
-        for cr in q.criterii.all():
-            criterion_q.setdefault(cr.id, set()).add(qid)
-
-    now = timezone.now()
-
-    def _avg(vals: list[float]) -> float:
-        return round(sum(vals) / len(vals), 1) if vals else 0.0
-
-    # ---- Foi de parcurs (criterii) ----
-    criterii_stats = []
-    for cr in criterii:
-        alloc = criterion_alloc.get(cr.id, set())
-        nr_experti_cr = len(alloc)
-
-        qids = list(criterion_q.get(cr.id, set()))
-        nr_chestionare_cr = len(qids)
-        if nr_chestionare_cr == 0:
-            criterii_stats.append(
-                {
-                    "obj": cr,
-                    "nr_experti": nr_experti_cr,
-                    "nr_chestionare": 0,
-                    "nr_raspunsuri": 0,
-                    "rata_medie_raspuns": 0.0,
-                }
-            )
-            continue
-
-        open_ids = [qid for qid in qids if q_by_id.get(qid) and q_by_id[qid].termen_limita >= now]
-        closed_ids = [qid for qid in qids if q_by_id.get(qid) and q_by_id[qid].termen_limita < now]
-
-        # Open: număr submisii TRIMIS per chestionar (în cadrul criteriului)
-        open_counts: dict[int, int] = {}
-        if open_ids:
-            rows = (
-                Submission.objects.filter(
-                    status=Submission.STATUS_TRIMIS,
-                    questionnaire_id__in=open_ids,
-                    questionnaire__arhivat=False,
-                    expert__is_active=True,
-                    expert__is_staff=False,
-                    expert__profil_expert__criterii=cr,
-                )
-                .values("questionnaire_id")
-                .annotate(cnt=Count("id", distinct=True))
-            )
-            open_counts = {r["questionnaire_id"]: r["cnt"] for r in rows}
-
-        # Closed: snapshot-uri înghețate
-        scope_key = QuestionnaireScopeSnapshot.make_scope_key(
-            QuestionnaireScopeSnapshot.SCOPE_CRITERION, criterion_id=cr.id
-        )
-        snap_map: dict[int, QuestionnaireScopeSnapshot] = {
-            s.questionnaire_id: s
-            for s in QuestionnaireScopeSnapshot.objects.filter(
-                questionnaire_id__in=closed_ids,
-                scope_key=scope_key,
-            )
-        }
-        for qid in closed_ids:
-            if qid not in snap_map and q_by_id.get(qid):
-                snap_map[qid] = ensure_scope_snapshot(
-                    q_by_id[qid],
-                    scope=QuestionnaireScopeSnapshot.SCOPE_CRITERION,
-                    criterion=cr,
-                )
-
-        # Agregare
-        total_responses = 0
-        rates: list[float] = []
-
-        for qid in open_ids:
-            num = int(open_counts.get(qid, 0))
-            total_responses += num
-            den = nr_experti_cr
-            rates.append(round((num / den) * 100, 1) if den else 0.0)
-
-        for qid in closed_ids:
-            snap = snap_map.get(qid)
-            if snap:
-                total_responses += int(snap.nr_raspunsuri or 0)
-                rates.append(float(snap.rata or 0.0))
-            else:
-                rates.append(0.0)
-
-        criterii_stats.append(
-            {
-                "obj": cr,
-                "nr_experti": nr_experti_cr,
-                "nr_chestionare": nr_chestionare_cr,
-                "nr_raspunsuri": total_responses,
-                "rata_medie_raspuns": _avg(rates),
-            }
-        )
-
-    # ---- Capitole (grupate pe clustere) ----
-    grouped_chapter_stats = []
-    for cl, chapters in grouped_chapters:
-        chapter_rows = []
-        for ch in chapters:
-            alloc = chapter_alloc.get(ch.id, set())
-            nr_experti_ch = len(alloc)
-
-            qids = list(chapter_q.get(ch.id, set()))
-            nr_chestionare_ch = len(qids)
-            if nr_chestionare_ch == 0:
-                chapter_rows.append(
-                    {
-                        "obj": ch,
-                        "nr_experti": nr_experti_ch,
-                        "nr_chestionare": 0,
-                        "nr_raspunsuri": 0,
-                        "rata_medie_raspuns": 0.0,
-                    }
-                )
-                continue
-
-            open_ids = [qid for qid in qids if q_by_id.get(qid) and q_by_id[qid].termen_limita >= now]
-            closed_ids = [qid for qid in qids if q_by_id.get(qid) and q_by_id[qid].termen_limita < now]
-
-            open_counts: dict[int, int] = {}
-            if open_ids:
-                rows = (
-                    Submission.objects.filter(
-                        status=Submission.STATUS_TRIMIS,
-                        questionnaire_id__in=open_ids,
-                        questionnaire__arhivat=False,
-                        expert__is_active=True,
-                        expert__is_staff=False,
-                        expert__profil_expert__capitole=ch,
-                    )
-                    .values("questionnaire_id")
-                    .annotate(cnt=Count("id", distinct=True))
-                )
-                open_counts = {r["questionnaire_id"]: r["cnt"] for r in rows}
-
-            scope_key = QuestionnaireScopeSnapshot.make_scope_key(
-                QuestionnaireScopeSnapshot.SCOPE_CHAPTER, chapter_id=ch.id
-            )
-            snap_map: dict[int, QuestionnaireScopeSnapshot] = {
-                s.questionnaire_id: s
-                for s in QuestionnaireScopeSnapshot.objects.filter(
-                    questionnaire_id__in=closed_ids,
-                    scope_key=scope_key,
-                )
-            }
-            for qid in closed_ids:
-                if qid not in snap_map and q_by_id.get(qid):
-                    snap_map[qid] = ensure_scope_snapshot(
-                        q_by_id[qid],
-                        scope=QuestionnaireScopeSnapshot.SCOPE_CHAPTER,
-                        chapter=ch,
-                    )
-
-            total_responses = 0
-            rates: list[float] = []
-
-            for qid in open_ids:
-                num = int(open_counts.get(qid, 0))
-                total_responses += num
-                den = nr_experti_ch
-                rates.append(round((num / den) * 100, 1) if den else 0.0)
-
-            for qid in closed_ids:
-                snap = snap_map.get(qid)
-                if snap:
-                    total_responses += int(snap.nr_raspunsuri or 0)
-                    rates.append(float(snap.rata or 0.0))
-                else:
-                    rates.append(0.0)
-
-            chapter_rows.append(
-                {
-                    "obj": ch,
-                    "nr_experti": nr_experti_ch,
-                    "nr_chestionare": nr_chestionare_ch,
-                    "nr_raspunsuri": total_responses,
-                    "rata_medie_raspuns": _avg(rates),
-                }
-            )
-
-        grouped_chapter_stats.append((cl, chapter_rows))
+    criterii_stats = [scope_stats.criterion_row(cr) for cr in get_criteria()]
+    grouped_chapter_stats = [
+        (cl, [scope_stats.chapter_row(ch) for ch in chapters])
+        for cl, chapters in group_chapters_by_cluster()
+    ]
 
     # Rată globală de răspuns = media tuturor mediilor pe capitole.
     # (Capitole fără chestionare au rata 0.0 în calculele de mai sus.)
@@ -1497,20 +1422,12 @@ def admin_newsletter_send(request, pk: int):
             return redirect("admin_newsletter_send", pk=pk)
 
         base_url = request.build_absolute_uri("/").rstrip("/")
-        ok, fail = send_newsletter_emails(nl, request_base_url=base_url)
-        nl.trimis_la = timezone.now()
-        nl.trimis_de = request.user
-        nl.nr_destinatari = nr_destinatari
-        nl.nr_trimise = ok
-        nl.nr_esecuri = fail
-        nl.save(update_fields=["trimis_la", "trimis_de", "nr_destinatari", "nr_trimise", "nr_esecuri"])
-
-        if ok and not fail:
-            messages.success(request, f"Newsletter trimis cu succes către {ok} experți.")
-        elif ok and fail:
-            messages.warning(request, f"Newsletter trimis către {ok} experți. Eșecuri: {fail}.")
-        else:
-            messages.error(request, "Trimiterea newsletterului a eșuat. Verifică setările email.")
+        nr = queue_newsletter_emails(nl, request.user, request_base_url=base_url)
+        messages.success(
+            request,
+            f"Newsletterul a fost pus în coada de trimitere pentru {nr} experți. "
+            "Progresul (trimise / eșecuri) apare în lista de newslettere.",
+        )
 
         return redirect("admin_newsletter_edit", pk=pk)
 
@@ -1520,6 +1437,56 @@ def admin_newsletter_send(request, pk: int):
         {"nl": nl, "nr_destinatari": nr_destinatari},
     )
 
+NEWSLETTER_DELIVERIES_LIMIT = 500
+
+
+@user_passes_test(is_admin)
+def admin_newsletter_deliveries(request, pk: int):
+    """Livrarea newsletterului per destinatar (status, încercări, ultima eroare)."""
+    nl = get_object_or_404(Newsletter, pk=pk)
+    livrari = OutboundEmail.objects.filter(newsletter=nl)
+
+    counts = dict(livrari.values_list("status").annotate(n=Count("pk")).order_by())
+    status_counts = [(value, label, counts.get(value, 0)) for value, label in OutboundEmail.STATUS_CHOICES]
+
+    status = (request.GET.get("status") or "").strip()
+    if status not in counts:
+        # Implicit: problemele întâi (eșuate), altfel totul.
+        status = OutboundEmail.STATUS_ESUAT if counts.get(OutboundEmail.STATUS_ESUAT) else ""
+    if status:
+        livrari = livrari.filter(status=status)
+    total = livrari.count()
+    livrari = livrari.select_related("destinatar_user").order_by("destinatar", "pk")[:NEWSLETTER_DELIVERIES_LIMIT]
+
+    return render(
+        request,
+        "portal/admin_newsletter_deliveries.html",
+        {
+            "nl": nl,
+            "livrari": livrari,
+            "status": status,
+            "status_counts": status_counts,
+            "nr_esuate": counts.get(OutboundEmail.STATUS_ESUAT, 0),
+            "total": total,
+            "limita": NEWSLETTER_DELIVERIES_LIMIT,
+        },
+    )
+
+
+@user_passes_test(is_admin)
+def admin_newsletter_resend_failed(request, pk: int):
+    nl = get_object_or_404(Newsletter, pk=pk)
+    if request.method != "POST":
+        return redirect("admin_newsletter_deliveries", pk=pk)
+
+    nr = resend_failed_newsletter_emails(nl)
+    if nr:
+        messages.success(request, f"{nr} emailuri eșuate au fost repuse în coada de trimitere.")
+    else:
+        messages.info(request, "Nu există emailuri eșuate pentru acest newsletter.")
+    return redirect("admin_newsletter_deliveries", pk=pk)
+
+
 @user_passes_test(is_internal)
 def admin_questionnaire_list(request):
     # Număr de răspunsuri = doar submisiile TRIMIS (nu includem ciornele)
@@ -1545,18 +1512,12 @@ def admin_questionnaire_create(request):
 
             # Trimite notificări pe email către experții relevanți (General -> toți; altfel după capitole/criterii)
             base_url = request.build_absolute_uri("/").rstrip("/")
-            ok, fail = send_new_questionnaire_emails(chestionar, request_base_url=base_url)
+            nr_notificari = queue_new_questionnaire_emails(chestionar, request_base_url=base_url)
 
-            if ok and not fail:
-                messages.success(request, f"Chestionarul a fost creat. Notificări trimise: {ok}.")
-            elif ok and fail:
-                messages.warning(
-                    request,
-                    f"Chestionarul a fost creat. Notificări trimise: {ok}. Eșecuri: {fail} (verifică setările email).")
-            elif fail:
-                messages.warning(
-                    request,
-                    f"Chestionarul a fost creat, dar trimiterea notificărilor a eșuat (Eșecuri: {fail}). ")
+            if nr_notificari:
+                messages.success(
+                    request, f"Chestionarul a fost creat. Notificări puse în coada de trimitere: {nr_notificari}."
+                )
             else:
                 messages.success(request, "Chestionarul a fost creat.")
             return redirect("admin_chestionar_edit", pk=chestionar.pk)
@@ -2359,13 +2320,11 @@ def admin_questionnaire_import(request):
 
                     # Email notificări doar pentru chestionare noi (în afara tranzacției)
                     if created:
-                        ok, fail = send_new_questionnaire_emails(q, request_base_url=base_url)
-                        if ok and not fail:
-                            report_rows.append((idx, str(q.pk), "EMAIL", f"Notificări trimise: {ok}"))
-                        elif ok and fail:
-                            report_rows.append((idx, str(q.pk), "EMAIL", f"Notificări trimise: {ok}; Eșecuri: {fail}"))
-                        elif fail:
-                            report_rows.append((idx, str(q.pk), "EMAIL", f"Eșecuri la notificare: {fail}"))
+                        nr_notificari = queue_new_questionnaire_emails(q, request_base_url=base_url)
+                        if nr_notificari:
+                            report_rows.append(
+                                (idx, str(q.pk), "EMAIL", f"Notificări puse în coada de trimitere: {nr_notificari}")
+                            )
 
                 except Exception as e:
                     nr_error += 1
@@ -2658,7 +2617,7 @@ def admin_expert_dashboard(request, pk: int):
 @user_passes_test(is_internal)
 def admin_referinte(request):
     grouped = group_chapters_by_cluster()
-    criterii = Criterion.objects.all().order_by("cod")
+    criterii = get_criteria()
     return render(
         request,
         "portal/admin_referinte.html",
@@ -2679,8 +2638,7 @@ def admin_pna_list(request):
 
     proiecte_qs = (
         PnaProject.objects.filter(arhivat=False)
-        .select_related("chapter", "criterion", "institutie_principala_ref", "comisie_responsabila")
-        .prefetch_related("chapters__cluster", "criteria")
+        .select_related("institutie_principala_ref", "comisie_responsabila")
         .prefetch_related("acte_ue_legaturi__eu_act")
         .prefetch_related("institutii_responsabile")
         .order_by("titlu")
@@ -2698,48 +2656,18 @@ def admin_pna_list(request):
     if selected_commissions:
         proiecte_qs = proiecte_qs.filter(comisie_responsabila_id__in=selected_commissions)
 
-    all_projects = list(proiecte_qs)
-
-    # Statistici rapide (dashboard)
-    today = timezone.localdate()
-
-    def _gov_overdue(p: PnaProject) -> bool:
-        d = p.termen_guvern_efectiv
-        return bool(d and d < today)
-
-    def _parl_overdue(p: PnaProject) -> bool:
-        d = p.termen_aprobare_parlament
-        return bool(d and d < today)
-
-    total = len(all_projects)
-    nr_neinitiate = sum(1 for p in all_projects if p.status_implementare == PnaProject.STATUS_NEINITIAT)
-    nr_in_procedura_guvern = sum(
-        1
-        for p in all_projects
-        if p.status_implementare in {
-            PnaProject.STATUS_INITIAT_GUVERN,
-            PnaProject.STATUS_AVIZARE_GUVERN,
-            PnaProject.STATUS_COORDONARE_CE,
-            PnaProject.STATUS_APROBARE_GUVERN,
-        }
-    )
-    nr_in_procedura_parlament = sum(
-        1
-        for p in all_projects
-        if p.status_implementare in set(PNA_STAGE_GROUP_PARLAMENT)
-    )
-    nr_adoptate_final = sum(1 for p in all_projects if p.status_implementare == PnaProject.STATUS_ADOPTAT_FINAL)
+    # Statistici rapide (dashboard) – agregate în DB, pe toate proiectele (fără filtrul de etapă)
+    stage_counts = _pna_stage_counts(proiecte_qs)
 
-    # Upcoming (următoarele 60 zile) pe termenul "cel mai apropiat" dintre Guvern/Parlament
+    # Termenul "cel mai apropiat" dintre Guvern/Parlament (sortarea în grupe)
     def _next_deadline(p: PnaProject):
         cands = [d for d in [p.termen_guvern_efectiv, p.termen_aprobare_parlament] if d]
         return min(cands) if cands else None
 
-    upcoming_60 = [p for p in all_projects if _next_deadline(p) and today <= _next_deadline(p) <= (today + timedelta(days=60))]
-    nr_upcoming_60 = len(upcoming_60)
-
-    proiecte_qs = _apply_pna_stage_filter_to_qs(proiecte_qs, stage)
-    proiecte = list(proiecte_qs)
+    proiecte_qs = _apply_pna_stage_filter_to_qs(proiecte_qs, stage).annotate(deadline=_pna_deadline_expr())
+    nr_rezultate = proiecte_qs.count()
+    proiecte, pager = _paginate_pna_projects(request, proiecte_qs, default_page_size=100)
+    attach_pna_scope_ids(proiecte)
 
     # Un proiect apare în fiecare capitol/foaie de parcurs bifată.
     by_criterion = {}
@@ -2750,7 +2678,7 @@ def admin_pna_list(request):
         for chapter_id in _pna_chapter_ids(p):
             by_chapter.setdefault(chapter_id, []).append(p)
 
-    criterii = list(Criterion.objects.all().order_by("cod"))
+    criterii = get_criteria()
     criterii_groups = []
     for cr in criterii:
         rows = by_criterion.get(cr.id, [])
@@ -2777,15 +2705,13 @@ def admin_pna_list(request):
         {
             "q": q,
             "can_edit_pna": can_edit_pna(request.user),
-            "total": total,
-            "nr_neinitiate": nr_neinitiate,
-            "nr_in_procedura_guvern": nr_in_procedura_guvern,
-            "nr_in_procedura_parlament": nr_in_procedura_parlament,
-            "nr_adoptate_final": nr_adoptate_final,
+            **stage_counts,
+            "nr_rezultate": nr_rezultate,
+            "pager": pager,
             "criterii_groups": criterii_groups,
             "chapter_groups": chapter_groups,
             "stage": stage,
-            "commissions": ParliamentCommission.objects.filter(activa=True).order_by("ordine", "nume"),
+            "commissions": get_commissions(),
             "selected_commissions": [str(x) for x in selected_commissions],
         },
     )
@@ -2916,20 +2842,111 @@ def _render_pna_dashboard(
 
     scope_filters sunt parametrii (querystring) care trebuie păstrați pe link-urile de drill-down
     către lista filtrată (ex: {"institution": 3} sau {"chapter": 24}).
+
+    Agregatele (KPI-uri, matrice, breakdown-uri) sunt precalculate și păstrate în cache, pe cheie
+    scope + etapă + parametri; orice modificare pe proiecte / acte UE / contribuții le invalidează
+    (vezi `get_cached_pna_dashboard` și signals.py).
     """
 
     mode = (request.GET.get("mode") or "count").strip().lower()
     if mode not in {"count", "days"}:
         mode = "count"
     stage = (request.GET.get("stage") or "").strip()
+    if stage not in PNA_STAGE_FILTERS:
+        stage = ""
 
-    base_qs = proiecte_qs
-    all_projects = list(
-        base_qs.select_related("chapter", "criterion", "institutie_principala_ref", "comisie_responsabila")
-        .prefetch_related("chapters__cluster", "criteria", "institutii_responsabile", "acte_ue_legaturi__eu_act")
-        .order_by("-actualizat_la")
+    # Prag pentru "stagnare" (zile în același status fără schimbare)
+    try:
+        stale_days_threshold = int(request.GET.get("stale_days") or 60)
+    except Exception:
+        stale_days_threshold = 60
+    stale_days_threshold = max(1, min(stale_days_threshold, 3650))
+
+    try:
+        year = int(request.GET.get("year") or 0)
+    except Exception:
+        year = 0
+
+    scope_filters = scope_filters or {}
+    today = timezone.localdate()
+
+    context = get_cached_pna_dashboard(
+        (
+            scope_kind,
+            urlencode(sorted(scope_filters.items())),
+            stage,
+            mode,
+            year,
+            stale_days_threshold,
+            today.isoformat(),
+        ),
+        lambda: _build_pna_dashboard_context(
+            proiecte_qs,
+            scope_kind=scope_kind,
+            scope_filters=scope_filters,
+            stage=stage,
+            mode=mode,
+            year=year,
+            stale_days_threshold=stale_days_threshold,
+            today=today,
+        ),
+    )
+
+    include_co = (request.GET.get("include_co") or "").strip() == "1"
+    toggle_include_co_url = None
+    if scope_kind == "institution":
+        params = request.GET.copy()
+        if include_co:
+            try:
+                params.pop("include_co")
+            except Exception:
+                pass
+        else:
+            params["include_co"] = "1"
+        qs_toggle = params.urlencode()
+        toggle_include_co_url = request.path + (f"?{qs_toggle}" if qs_toggle else "")
+
+    return render(
+        request,
+        "portal/admin_pna_dashboard.html",
+        {
+            **context,
+            "can_edit_pna": can_edit_pna(request.user),
+            "scope_kind": scope_kind,
+            "scope_title": scope_title,
+            "include_co": include_co,
+            "toggle_include_co_url": toggle_include_co_url,
+            "back_url": back_url,
+            "back_label": back_label,
+        },
     )
 
+
+def _build_pna_dashboard_context(
+    proiecte_qs,
+    scope_kind: str,
+    scope_filters: dict,
+    stage: str,
+    mode: str,
+    year: int,
+    stale_days_threshold: int,
+    today,
+) -> dict:
+    """Calculează agregatele dashboard-ului PNA (partea care se păstrează în cache).
+
+    Nu depinde de request: tot ce ține de utilizator / URL-ul curent se adaugă în `_render_pna_dashboard`.
+    Proiectele sunt parcurse o singură dată (vezi pna_dashboard.run_pna_pipeline); aici se construiesc
+    doar rândurile pentru template din rezultatele acumulatorilor.
+    """
+
+    # KPI-urile din header sunt pe tot scope-ul (fără filtrul de etapă): le numărăm direct în DB.
+    all_status_counts = {
+        r["status_implementare"]: int(r["nr"])
+        for r in proiecte_qs.order_by()
+        .values("status_implementare")
+        .annotate(nr=Count("id", distinct=True))
+    }
+
     proiecte_qs = _apply_pna_stage_filter_to_qs(proiecte_qs, stage)
     proiecte = list(
         proiecte_qs.select_related("chapter", "criterion", "institutie_principala_ref", "comisie_responsabila")
@@ -2942,7 +2959,7 @@ def _render_pna_dashboard(
     # -------------------- contribuții experți (etapa 2) --------------------
     # IMPORTANT: există rânduri "goale" create de get_or_create atunci când un expert deschide proiectul.
     # De aceea, pentru progres numărăm DOAR contribuțiile unde există text în cel puțin una din cele 3 boxe.
-    contrib_flags_by_project = {pid: {"f": False, "c": False, "t": False, "any": False, "contributors": 0} for pid in project_ids}
+    contrib_flags_by_project = {}
 
     if project_ids:
         q_f = ~Q(comentariu="")
@@ -2958,78 +2975,70 @@ def _render_pna_dashboard(
                 c_cnt=Count("id", filter=q_c),
                 t_cnt=Count("id", filter=q_t),
                 any_cnt=Count("id", filter=q_any),
-                expert_cnt=Count("expert", distinct=True, filter=q_any),
             )
         )
         for r in contrib_agg:
             pid = r.get("project_id")
             if not pid:
                 continue
-            f = int(r.get("f_cnt") or 0)
-            c = int(r.get("c_cnt") or 0)
-            t = int(r.get("t_cnt") or 0)
-            any_cnt = int(r.get("any_cnt") or 0)
-            expert_cnt = int(r.get("expert_cnt") or 0)
-            contrib_flags_by_project[pid] = {
-                "f": f > 0,
-                "c": c > 0,
-                "t": t > 0,
-                "any": any_cnt > 0,
-                "contributors": expert_cnt,
-            }
-
-    # "Eligibili" = experți (nu staff/admin) alocați capitolului/foii de parcurs a proiectului.
-    chapter_ids = sorted({scope_id for p in proiecte for scope_id in _pna_chapter_ids(p)})
-    criterion_ids = sorted({scope_id for p in proiecte for scope_id in _pna_criterion_ids(p)})
+            contrib_flags_by_project[pid] = (
+                int(r.get("f_cnt") or 0) > 0,
+                int(r.get("c_cnt") or 0) > 0,
+                int(r.get("t_cnt") or 0) > 0,
+                int(r.get("any_cnt") or 0) > 0,
+            )
 
-    eligible_experts_by_chapter = {}
-    eligible_experts_by_criterion = {}
-    experts_base_qs = User.objects.filter(is_active=True, is_staff=False, is_superuser=False).filter(profil_expert__arhivat=False)
-    if chapter_ids:
-        rows = list(
-            experts_base_qs.filter(profil_expert__capitole__id__in=chapter_ids)
-            .values("id", "profil_expert__capitole")
+    # Ultima schimbare de status per proiect (pentru stagnare)
+    last_status_by_project = {}
+    if project_ids:
+        rows = (
+            PnaProjectStatusHistory.objects.filter(project_id__in=project_ids)
+            .values("project_id")
+            .annotate(last_dt=Max("changed_at"))
         )
-        for row in rows:
-            scope_id = row.get("profil_expert__capitole")
-            if scope_id:
-                eligible_experts_by_chapter.setdefault(int(scope_id), set()).add(int(row["id"]))
-    if criterion_ids:
-        rows = list(
-            experts_base_qs.filter(profil_expert__criterii__id__in=criterion_ids)
-            .values("id", "profil_expert__criterii")
+        last_status_by_project = {r["project_id"]: r["last_dt"] for r in rows if r.get("last_dt")}
+
+    # -------------------- o singură trecere peste proiecte --------------------
+    items = []
+    for p in proiecte:
+        has_f, has_c, has_t, has_any = contrib_flags_by_project.get(p.id, (False, False, False, False))
+        items.append(
+            PnaDashboardItem(
+                project=p,
+                chapter_ids=p.scope_chapter_ids,
+                criterion_ids=p.scope_criterion_ids,
+                deadline=p.termen_deadline,
+                has_f=has_f,
+                has_c=has_c,
+                has_t=has_t,
+                has_any=has_any,
+            )
         )
-        for row in rows:
-            scope_id = row.get("profil_expert__criterii")
-            if scope_id:
-                eligible_experts_by_criterion.setdefault(int(scope_id), set()).add(int(row["id"]))
 
-    def _eligible_experts_for_project(p: PnaProject) -> int:
-        expert_ids = set()
-        for scope_id in _pna_chapter_ids(p):
-            expert_ids.update(eligible_experts_by_chapter.get(scope_id, set()))
-        for scope_id in _pna_criterion_ids(p):
-            expert_ids.update(eligible_experts_by_criterion.get(scope_id, set()))
-        return len(expert_ids)
+    agg = run_pna_pipeline(
+        items,
+        [
+            StatusCountsAccumulator(),
+            ContributionProgressAccumulator(),
+            DeadlineAccumulator(today),
+            DataQualityAccumulator(),
+            EUActsAccumulator(),
+            DerapajeAccumulator(),
+            RiskAccumulator(today),
+            StaleAccumulator(today, stale_days_threshold, last_status_by_project),
+            DeadlineMatrixAccumulator(mode),
+            ResourceAccumulator(today, include_scopes=(scope_kind == "institution")),
+        ],
+    )
+    contrib = agg["contributii"]
+    termene = agg["termene"]
+    kpi = agg["kpi"]
+    acte_ue = agg["acte_ue"]
+    resurse = agg["resurse"]
 
     # Parametri de scope (păstrați pe drill-down-uri)
-    scope_filters = scope_filters or {}
     scope_params = urlencode(scope_filters)
 
-    include_co = (request.GET.get("include_co") or "").strip() == "1"
-    toggle_include_co_url = None
-    if scope_kind == "institution":
-        params = request.GET.copy()
-        if include_co:
-            try:
-                params.pop("include_co")
-            except Exception:
-                pass
-        else:
-            params["include_co"] = "1"
-        qs_toggle = params.urlencode()
-        toggle_include_co_url = request.path + (f"?{qs_toggle}" if qs_toggle else "")
-
     def _filtered_list_url(extra: dict | None = None) -> str:
         params = dict(scope_filters)
         if extra:
@@ -3040,61 +3049,29 @@ def _render_pna_dashboard(
         qs = urlencode(params)
         return reverse("admin_pna_filtered_list") + (f"?{qs}" if qs else "")
 
-    total = len(all_projects)
-    today = timezone.localdate()
+    total = sum(all_status_counts.values())
+    grouped_chapters = group_chapters_by_cluster()
+    criterii = get_criteria()
 
     # -------------------- KPI header dashboard --------------------
-    nr_neinitiate = sum(1 for p in all_projects if p.status_implementare == PnaProject.STATUS_NEINITIAT)
-    statusuri_guvern = {
-        PnaProject.STATUS_INITIAT_GUVERN,
-        PnaProject.STATUS_AVIZARE_GUVERN,
-        PnaProject.STATUS_COORDONARE_CE,
-        PnaProject.STATUS_APROBARE_GUVERN,
-    }
-    nr_in_procedura_guvern = sum(1 for p in all_projects if p.status_implementare in statusuri_guvern)
-    statusuri_parlament = set(PNA_STAGE_GROUP_PARLAMENT)
-    nr_in_procedura_parlament = sum(1 for p in all_projects if p.status_implementare in statusuri_parlament)
-    nr_adoptate_final = sum(1 for p in all_projects if p.status_implementare == PnaProject.STATUS_ADOPTAT_FINAL)
+    nr_neinitiate = sum(n for code, n in all_status_counts.items() if code in PNA_STAGE_GROUP_NEINITIATE)
+    nr_in_procedura_guvern = sum(n for code, n in all_status_counts.items() if code in PNA_STAGE_GROUP_GUVERN)
+    nr_in_procedura_parlament = sum(n for code, n in all_status_counts.items() if code in PNA_STAGE_GROUP_PARLAMENT)
+    nr_adoptate_final = sum(n for code, n in all_status_counts.items() if code in PNA_STAGE_GROUP_FINAL)
 
     # -------------------- progres contribuții experți --------------------
     # La nivel de proiect: considerăm "completat" dacă există cel puțin o contribuție non-goală.
-    nr_contrib_any = 0
-    nr_contrib_f = 0
-    nr_contrib_c = 0
-    nr_contrib_t = 0
-    nr_contrib_all = 0
-
-    contrib_dims_dist = {0: 0, 1: 0, 2: 0, 3: 0}
-
-    for p in proiecte:
-        flags = contrib_flags_by_project.get(p.id) or {}
-        has_f = bool(flags.get("f"))
-        has_c = bool(flags.get("c"))
-        has_t = bool(flags.get("t"))
-        has_any = bool(flags.get("any"))
-
-        if has_any:
-            nr_contrib_any += 1
-        if has_f:
-            nr_contrib_f += 1
-        if has_c:
-            nr_contrib_c += 1
-        if has_t:
-            nr_contrib_t += 1
-        if has_f and has_c and has_t:
-            nr_contrib_all += 1
-
-        dims = int(has_f) + int(has_c) + int(has_t)
-        contrib_dims_dist[dims] = contrib_dims_dist.get(dims, 0) + 1
-
     def _pct(n: int) -> float:
         return round((n / total) * 100, 1) if total else 0.0
 
     # Ultimele contribuții ale experților (max 20) – pentru dashboard
+    # Proiectul se ia din lista deja încărcată (cu capitolele/foile prefetch-uite pentru atasare_label).
+    proiecte_by_id = {p.id: p for p in proiecte}
     latest_contribution_rows = []
     latest_contrib_qs = (
         PnaExpertContribution.objects.filter(project_id__in=project_ids)
-        .select_related("project", "expert", "expert__profil_expert")
+        .exclude(comentariu="")
+        .select_related("expert", "expert__profil_expert")
         .order_by("-updated_at")
     )
     for c in latest_contrib_qs:
@@ -3102,7 +3079,7 @@ def _render_pna_dashboard(
             continue
         latest_contribution_rows.append(
             {
-                "project": c.project,
+                "project": proiecte_by_id[c.project_id],
                 "expert": c.expert,
                 "profil": getattr(c.expert, "profil_expert", None),
                 "contrib": c,
@@ -3120,39 +3097,39 @@ def _render_pna_dashboard(
         {
             "key": "any",
             "label": "Proiecte cu contribuții (oricare)",
-            "nr": nr_contrib_any,
-            "pct": _pct(nr_contrib_any),
+            "nr": contrib.nr_any,
+            "pct": _pct(contrib.nr_any),
             "href": _filtered_list_url({"has_contrib": 1}),
         },
         {
             "key": "f",
             "label": "Comentariu completat",
-            "nr": nr_contrib_f,
-            "pct": _pct(nr_contrib_f),
+            "nr": contrib.nr_f,
+            "pct": _pct(contrib.nr_f),
             "href": _filtered_list_url({"missing_flex": 1}),
             "href_mode": "missing",
         },
         {
             "key": "c",
             "label": "Comentariu completat",
-            "nr": nr_contrib_c,
-            "pct": _pct(nr_contrib_c),
+            "nr": contrib.nr_c,
+            "pct": _pct(contrib.nr_c),
             "href": _filtered_list_url({"missing_comp": 1}),
             "href_mode": "missing",
         },
         {
             "key": "t",
             "label": "Comentariu completat",
-            "nr": nr_contrib_t,
-            "pct": _pct(nr_contrib_t),
+            "nr": contrib.nr_t,
+            "pct": _pct(contrib.nr_t),
             "href": _filtered_list_url({"missing_tran": 1}),
             "href_mode": "missing",
         },
         {
             "key": "all",
             "label": "Toate 3 dimensiuni completate",
-            "nr": nr_contrib_all,
-            "pct": _pct(nr_contrib_all),
+            "nr": contrib.nr_all,
+            "pct": _pct(contrib.nr_all),
             "href": _filtered_list_url({"missing_all_dims": 1}),
             "href_mode": "missing",
         },
@@ -3160,9 +3137,9 @@ def _render_pna_dashboard(
 
     # Distribuție pe nr. dimensiuni completate (0/1/2/3) – pentru o mini-diagramă.
     contrib_dims_rows = []
-    max_dims_nr = max(contrib_dims_dist.values()) if contrib_dims_dist else 0
+    max_dims_nr = max(contrib.dims_dist.values()) if contrib.dims_dist else 0
     for k in [0, 1, 2, 3]:
-        nr = int(contrib_dims_dist.get(k, 0))
+        nr = int(contrib.dims_dist.get(k, 0))
         contrib_dims_rows.append(
             {
                 "k": k,
@@ -3174,72 +3151,48 @@ def _render_pna_dashboard(
         )
 
     # Top proiecte fără contribuții (pentru prioritizare)
-    missing_contrib_projects = [p for p in proiecte if not (contrib_flags_by_project.get(p.id) or {}).get("any")]
-    missing_contrib_projects.sort(key=lambda p: (p.termen_deadline or datetime.max.date(), -(p.prioritate or 0), p.titlu or ""))
+    missing_contrib_top = sorted(
+        contrib.missing,
+        key=lambda it: (it.deadline or datetime.max.date(), -(it.project.prioritate or 0), it.project.titlu or ""),
+    )[:20]
+
+    # "Eligibili" = experți (nu staff/admin) alocați capitolului/foii de parcurs a proiectului.
+    # Îi căutăm doar pentru proiectele afișate.
+    eligible_experts_by_chapter = {}
+    eligible_experts_by_criterion = {}
+    chapter_ids = sorted({scope_id for it in missing_contrib_top for scope_id in it.chapter_ids})
+    criterion_ids = sorted({scope_id for it in missing_contrib_top for scope_id in it.criterion_ids})
+    if chapter_ids or criterion_ids:
+        for user_id, ch_id, cr_id in (
+            experts_in_scopes(chapter_ids, criterion_ids)
+            .exclude(user__is_superuser=True)
+            .values_list("user_id", "chapter_id", "criterion_id")
+        ):
+            if ch_id:
+                eligible_experts_by_chapter.setdefault(ch_id, set()).add(user_id)
+            if cr_id:
+                eligible_experts_by_criterion.setdefault(cr_id, set()).add(user_id)
+
+    def _eligible_experts(it) -> int:
+        expert_ids = set()
+        for scope_id in it.chapter_ids:
+            expert_ids.update(eligible_experts_by_chapter.get(scope_id, set()))
+        for scope_id in it.criterion_ids:
+            expert_ids.update(eligible_experts_by_criterion.get(scope_id, set()))
+        return len(expert_ids)
+
     contrib_missing_top = [
         {
-            "project": p,
-            "deadline": p.termen_deadline,
-            "eligible": _eligible_experts_for_project(p),
+            "project": it.project,
+            "deadline": it.deadline,
+            "eligible": _eligible_experts(it),
         }
-        for p in missing_contrib_projects[:20]
+        for it in missing_contrib_top
     ]
 
     contrib_missing_url = _filtered_list_url({"missing_contrib": 1})
 
     # Breakdown: capitol / foaie de parcurs / instituție
-    def _init_cs():
-        return {"total": 0, "any": 0, "f": 0, "c": 0, "t": 0, "all": 0}
-
-    cs_chapters = {}
-    cs_criterii = {}
-    cs_institutions = {}
-
-    for p in proiecte:
-        flags = contrib_flags_by_project.get(p.id) or {}
-        has_f = bool(flags.get("f"))
-        has_c = bool(flags.get("c"))
-        has_t = bool(flags.get("t"))
-        has_any = bool(flags.get("any"))
-        has_all = bool(has_f and has_c and has_t)
-
-        # Proiectul contribuie la fiecare capitol și foaie de parcurs bifată.
-        project_scope_stats = [
-            cs_chapters.setdefault(scope_id, _init_cs())
-            for scope_id in _pna_chapter_ids(p)
-        ]
-        project_scope_stats.extend(
-            cs_criterii.setdefault(scope_id, _init_cs())
-            for scope_id in _pna_criterion_ids(p)
-        )
-        for s in project_scope_stats:
-            s["total"] += 1
-            if has_any:
-                s["any"] += 1
-            if has_f:
-                s["f"] += 1
-            if has_c:
-                s["c"] += 1
-            if has_t:
-                s["t"] += 1
-            if has_all:
-                s["all"] += 1
-
-        # instituție principală
-        inst_id = int(p.institutie_principala_ref_id or 0)
-        s2 = cs_institutions.setdefault(inst_id, _init_cs())
-        s2["total"] += 1
-        if has_any:
-            s2["any"] += 1
-        if has_f:
-            s2["f"] += 1
-        if has_c:
-            s2["c"] += 1
-        if has_t:
-            s2["t"] += 1
-        if has_all:
-            s2["all"] += 1
-
     def _finalize_cs(s: dict) -> dict:
         t = int(s.get("total") or 0)
         out = dict(s)
@@ -3250,15 +3203,15 @@ def _render_pna_dashboard(
 
     # Capitole (grupate pe clustere)
     contrib_chapter_groups = []
-    for cl, chapters in group_chapters_by_cluster():
+    for cl, chapters in grouped_chapters:
         rows = []
         for ch in chapters:
-            if ch.id not in cs_chapters:
+            if ch.id not in contrib.by_chapter:
                 continue
             rows.append(
                 {
                     "obj": ch,
-                    "stats": _finalize_cs(cs_chapters[ch.id]),
+                    "stats": _finalize_cs(contrib.by_chapter[ch.id]),
                     "dashboard_url": reverse("admin_pna_dashboard_chapter", kwargs={"pk": ch.id}),
                     "filter_url": _filtered_list_url({"chapter": ch.id}),
                 }
@@ -3268,23 +3221,22 @@ def _render_pna_dashboard(
 
     # Foi de parcurs
     contrib_criterii_rows = []
-    for cr in Criterion.objects.all().order_by("cod"):
-        if cr.id not in cs_criterii:
+    for cr in criterii:
+        if cr.id not in contrib.by_criterion:
             continue
         contrib_criterii_rows.append(
             {
                 "obj": cr,
-                "stats": _finalize_cs(cs_criterii[cr.id]),
+                "stats": _finalize_cs(contrib.by_criterion[cr.id]),
                 "dashboard_url": reverse("admin_pna_dashboard_criterion", kwargs={"pk": cr.id}),
                 "filter_url": _filtered_list_url({"criterion": cr.id}),
             }
         )
 
     # Instituții (principal)
-    inst_ids = [i for i in cs_institutions.keys() if i]
-    inst_lookup = {i.id: i for i in PnaInstitution.objects.filter(id__in=inst_ids)} if inst_ids else {}
+    inst_lookup = {inst_id: inst for inst_id, (inst, _) in resurse.by_institution.items() if inst_id}
     contrib_institution_rows = []
-    for inst_id, s in cs_institutions.items():
+    for inst_id, s in contrib.by_institution.items():
         inst_obj = inst_lookup.get(inst_id) if inst_id else None
         name = inst_obj.nume if inst_obj else "(nespecificat)"
         contrib_institution_rows.append(
@@ -3300,52 +3252,8 @@ def _render_pna_dashboard(
     contrib_institution_rows.sort(key=lambda r: (int(r["stats"].get("total") or 0), r["name"]), reverse=True)
     contrib_institution_rows = contrib_institution_rows[:30]
 
-    # Prag pentru "stagnare" (zile în același status fără schimbare)
-    try:
-        stale_days_threshold = int(request.GET.get("stale_days") or 60)
-    except Exception:
-        stale_days_threshold = 60
-    stale_days_threshold = max(1, min(stale_days_threshold, 3650))
-
     # -------------------- istoric status (etapa 2) --------------------
-    # Ultima schimbare de status per proiect + activitate pe luni
-    from django.db.models import Max
-    last_status_by_project = {}
-    if proiecte:
-        # max(changed_at) per proiect
-        rows = (
-            PnaProjectStatusHistory.objects.filter(project_id__in=[p.id for p in proiecte])
-            .values("project_id")
-            .annotate(last_dt=Max("changed_at"))
-        )
-        last_status_by_project = {r["project_id"]: r["last_dt"] for r in rows if r.get("last_dt")}
-
-    # În lipsa istoricului (nu ar trebui după migrare), fallback: creat_la
-    def _status_since(p: PnaProject):
-        dt = last_status_by_project.get(p.id)
-        if dt:
-            return dt
-        return getattr(p, "creat_la", None) or getattr(p, "actualizat_la", None)
-
-    # Proiecte stagnante (non-finale)
-    stale_projects = []
-    for p in proiecte:
-        since_dt = _status_since(p)
-        if not since_dt:
-            continue
-        days = (today - since_dt.date()).days
-        if days >= stale_days_threshold and p.status_implementare != PnaProject.STATUS_ADOPTAT_FINAL:
-            stale_projects.append({"project": p, "days": days, "since": since_dt})
-    # Sortare: cele mai multe zile în același status, apoi deadline-ul cel mai apropiat
-    from datetime import date as _date
-
-    stale_projects.sort(
-        key=lambda r: (
-            -int(r["days"]),
-            (r["project"].termen_deadline or _date.max),
-            (r["project"].titlu or ""),
-        )
-    )
+    stale_projects = agg["stagnare"]
     stale_projects_top = stale_projects[:30]
 
     # Distribuție stagnare pe status
@@ -3401,175 +3309,8 @@ def _render_pna_dashboard(
         .count()
     )
 
-    # -------------------- KPI-uri rapide --------------------
-    nr_no_deadline = 0
-    nr_overdue = 0
-    nr_upcoming_30 = 0
-    nr_upcoming_60 = 0
-    nr_upcoming_90 = 0
-
-    nr_necesita_ce = 0
-    nr_expertiza_externa = 0
-    nr_expertiza_interna_insuf = 0
-    nr_expertiza_externa_fara_furnizor = 0
-
-    nr_missing_cost = 0
-    nr_missing_volum = 0
-    nr_missing_institutie = 0
-    nr_missing_acte = 0
-
-    from decimal import Decimal
-
-    sum_cost = {2026: Decimal("0"), 2027: Decimal("0"), 2028: Decimal("0"), 2029: Decimal("0")}
-    sum_zile = 0
-
-    # pentru acte UE
-    acte_tip_counts = {}
-    transp_counts = {"TOTAL": 0, "PARTIAL": 0, "": 0}
-    act_to_projects = {}  # act_id -> set(project_id)
-
-    # derapaje (schimbare termen)
-    derapaje = []
-
-    # risc (scor simplu)
-    risk_rows = []
-
-    def _months_diff(d1, d2):
-        """Diferență aproximativă în luni între două date (bazată pe an/lună)."""
-        if not d1 or not d2:
-            return 0
-        return (d2.year - d1.year) * 12 + (d2.month - d1.month)
-
-    for p in proiecte:
-        deadline = p.termen_deadline
-        if not deadline:
-            nr_no_deadline += 1
-        else:
-            if deadline < today:
-                nr_overdue += 1
-            if today <= deadline <= (today + timedelta(days=30)):
-                nr_upcoming_30 += 1
-            if today <= deadline <= (today + timedelta(days=60)):
-                nr_upcoming_60 += 1
-            if today <= deadline <= (today + timedelta(days=90)):
-                nr_upcoming_90 += 1
-
-        if p.necesita_avizare_comisia_europeana:
-            nr_necesita_ce += 1
-
-        if p.necesita_expertiza_externa:
-            nr_expertiza_externa += 1
-            if not p.este_identificata_expertiza_externa:
-                nr_expertiza_externa_fara_furnizor += 1
-
-        if p.expertiza_interna == 1:
-            nr_expertiza_interna_insuf += 1
-
-        # costuri
-        any_cost = False
-        for y in (2026, 2027, 2028, 2029):
-            val = getattr(p, f"cost_{y}")
-            if val is not None:
-                any_cost = True
-                try:
-                    sum_cost[y] += Decimal(str(val))
-                except Exception:
-                    pass
-        if not any_cost:
-            nr_missing_cost += 1
-
-        # volum
-        if p.volum_munca_zile is None:
-            nr_missing_volum += 1
-        else:
-            try:
-                sum_zile += int(p.volum_munca_zile)
-            except Exception:
-                pass
-
-        # instituție principală
-        if not p.institutie_principala_ref_id and not (p.institutie_principala or "").strip():
-            nr_missing_institutie += 1
-
-        # acte UE
-        links = list(getattr(p, "acte_ue_legaturi").all())
-        if not links:
-            nr_missing_acte += 1
-        for l in links:
-            act = l.eu_act
-            if not act:
-                continue
-            tip = (act.tip_document or "").strip() or "(nespecificat)"
-            acte_tip_counts[tip] = acte_tip_counts.get(tip, 0) + 1
-            ttr = (l.tip_transpunere or "").strip()
-            if ttr in transp_counts:
-                transp_counts[ttr] += 1
-            else:
-                transp_counts[ttr] = transp_counts.get(ttr, 0) + 1
-            act_to_projects.setdefault(act.id, set()).add(p.id)
-
-        # derapaj (doar dacă există termen actualizat)
-        if p.termen_actualizat_aprobare_guvern:
-            baseline = p.termen_aprobare_guvern or p.termen_aprobare_parlament
-            if baseline:
-                diff_m = _months_diff(baseline, p.termen_actualizat_aprobare_guvern)
-                if diff_m != 0:
-                    derapaje.append(
-                        {
-                            "project": p,
-                            "baseline": baseline,
-                            "updated": p.termen_actualizat_aprobare_guvern,
-                            "diff_months": diff_m,
-                        }
-                    )
-
-        # risc – scor euristic
-        score = 0
-        flags = []
-        if not deadline:
-            score += 2
-            flags.append("Fără deadline")
-        else:
-            if deadline < today:
-                score += 3
-                flags.append("Termen depășit")
-            elif deadline <= (today + timedelta(days=60)):
-                score += 2
-                flags.append("Termen < 60 zile")
-
-        if p.prioritate == 3:
-            score += 1
-            flags.append("Prioritate înaltă")
-        if p.complexitate and p.complexitate >= 4:
-            score += 1
-            flags.append("Complexitate ridicată")
-        if p.expertiza_interna == 1:
-            score += 2
-            flags.append("Expertiză internă insuficientă")
-        elif p.expertiza_interna == 2:
-            score += 1
-            flags.append("Expertiză internă parțială")
-        if p.necesita_expertiza_externa:
-            score += 2
-            flags.append("Expertiză externă necesară")
-            if not p.este_identificata_expertiza_externa:
-                score += 2
-                flags.append("Fără expertiză externă identificată")
-        if p.necesita_avizare_comisia_europeana:
-            score += 2
-            flags.append("Necesită avizare/coord. CE")
-            if p.status_implementare != PnaProject.STATUS_COORDONARE_CE:
-                score += 1
-                flags.append("Status ≠ coordonare CE")
-
-        if score > 0:
-            risk_rows.append({"project": p, "score": score, "flags": flags})
-
     # -------------------- distribuție pe status --------------------
-    counts = {code: 0 for code, _ in PnaProject.STATUS_IMPLEMENTARE_CHOICES}
-    for p in proiecte:
-        counts[p.status_implementare] = counts.get(p.status_implementare, 0) + 1
-
+    counts = agg["status"]
     status_rows = []
     max_nr = max(counts.values()) if counts else 0
     for code, label in PnaProject.STATUS_IMPLEMENTARE_CHOICES:
@@ -3588,11 +3329,8 @@ def _render_pna_dashboard(
         )
 
     # -------------------- matrice pe luni --------------------
-    years = sorted({p.termen_deadline.year for p in proiecte if p.termen_deadline})
-    try:
-        selected_year = int(request.GET.get("year") or 0)
-    except Exception:
-        selected_year = 0
+    years = sorted(termene.years)
+    selected_year = year
     if not selected_year:
         selected_year = today.year
     if years and selected_year not in years:
@@ -3613,35 +3351,24 @@ def _render_pna_dashboard(
         (12, "Decembrie"),
     ]
 
-    from collections import defaultdict
+    matrix = agg["matrice"]
 
-    matrix = defaultdict(lambda: defaultdict(int))
-    for p in proiecte:
-        d = p.termen_deadline
-        if not d or d.year != selected_year:
-            continue
-        keys = [("CH", scope_id) for scope_id in _pna_chapter_ids(p)]
-        keys.extend(("CR", scope_id) for scope_id in _pna_criterion_ids(p))
-        for key in keys:
-            if mode == "days":
-                matrix[key][d.month] += int(p.volum_munca_zile or 0)
-            else:
-                matrix[key][d.month] += 1
+    def _matrix_counts(key) -> list:
+        cells = matrix.get(key) or {}
+        return [cells.get((selected_year, m), 0) for m, _ in months]
 
     criterii_rows = []
-    criterii = list(Criterion.objects.all().order_by("cod"))
     for cr in criterii:
-        vals = [matrix[("CR", cr.id)].get(m, 0) for m, _ in months]
+        vals = _matrix_counts(("CR", cr.id))
         if sum(vals) == 0:
             continue
         criterii_rows.append({"obj": cr, "counts": vals, "total": sum(vals)})
 
     chapter_cluster_rows = []
-    grouped_chapters = group_chapters_by_cluster()
     for cl, chapters in grouped_chapters:
         rows = []
         for ch in chapters:
-            vals = [matrix[("CH", ch.id)].get(m, 0) for m, _ in months]
+            vals = _matrix_counts(("CH", ch.id))
             if sum(vals) == 0:
                 continue
             rows.append({"obj": ch, "counts": vals, "total": sum(vals)})
@@ -3649,140 +3376,39 @@ def _render_pna_dashboard(
             chapter_cluster_rows.append({"cluster": cl, "rows": rows})
 
     # -------------------- liste utile --------------------
-    overdue = [p for p in proiecte if (p.termen_deadline and p.termen_deadline < today)]
-    upcoming = [p for p in proiecte if (p.termen_deadline and today <= p.termen_deadline <= (today + timedelta(days=90)))]
-    overdue.sort(key=lambda p: (p.termen_deadline or datetime.max.date(), p.titlu))
-    upcoming.sort(key=lambda p: (p.termen_deadline or datetime.max.date(), p.titlu))
-
-    # top derapaje
-    derapaje.sort(key=lambda r: abs(r["diff_months"]), reverse=True)
-    derapaje_top = derapaje[:20]
-
-    # top riscuri
-    risk_rows.sort(key=lambda r: (r["score"], (r["project"].termen_deadline or datetime.max.date())), reverse=True)
-    top_risks = risk_rows[:20]
-
-    def _stage_bucket(status_code: str) -> str:
-        if status_code == PnaProject.STATUS_NEINITIAT:
-            return "neinitiate"
-        if status_code in {
-            PnaProject.STATUS_INITIAT_GUVERN,
-            PnaProject.STATUS_AVIZARE_GUVERN,
-            PnaProject.STATUS_COORDONARE_CE,
-            PnaProject.STATUS_APROBARE_GUVERN,
-        }:
-            return "guvern"
-        if status_code in set(PNA_STAGE_GROUP_PARLAMENT):
-            return "parlament"
-        if status_code == PnaProject.STATUS_ADOPTAT_FINAL:
-            return "adoptat"
-        return "other"
-
-    def _empty_resource_row(label, filter_url=None, dashboard_url=None):
-        return {
-            "label": label,
-            "filter_url": filter_url,
-            "dashboard_url": dashboard_url,
-            "total": 0,
-            "neinitiate": 0,
-            "guvern": 0,
-            "parlament": 0,
-            "adoptat": 0,
-            "overdue": 0,
-            "upcoming60": 0,
-            "zile": 0,
-            "cost_total": Decimal("0"),
-        }
-
-    def _update_resource_row(row, p):
-        row["total"] += 1
-        row[_stage_bucket(p.status_implementare)] = row.get(_stage_bucket(p.status_implementare), 0) + 1
-        dl = p.termen_deadline
-        if dl and dl < today:
-            row["overdue"] += 1
-        if dl and today <= dl <= (today + timedelta(days=60)):
-            row["upcoming60"] += 1
-        if p.volum_munca_zile:
-            try:
-                row["zile"] += int(p.volum_munca_zile)
-            except Exception:
-                pass
-        for y in (2026, 2027, 2028, 2029):
-            val = getattr(p, f"cost_{y}")
-            if val is not None:
-                try:
-                    row["cost_total"] += Decimal(str(val))
-                except Exception:
-                    pass
+    derapaje_top = agg["derapaje"][:20]
+    top_risks = agg["riscuri"][:20]
 
     # top instituții
-    inst_agg = {}
-    for p in proiecte:
-        inst = p.institutie_principala_ref
-        key = inst.id if inst else 0
-        name = inst.nume if inst else "(nespecificat)"
-        row = inst_agg.setdefault(
-            key,
+    inst_rows = []
+    for key, (inst, row) in resurse.by_institution.items():
+        row.update(
             {
                 "id": inst.id if inst else None,
-                "name": name,
-                **_empty_resource_row(
-                    name,
-                    filter_url=(reverse("admin_pna_filtered_list") + f"?institution={inst.id}{'&' + scope_params if scope_params else ''}") if inst else _filtered_list_url({"missing_institution": 1}),
-                    dashboard_url=reverse("admin_pna_dashboard_institution", kwargs={"pk": inst.id}) if inst else None,
-                ),
-                "id": inst.id if inst else None,
-                "name": name,
-            },
+                "name": row["label"],
+                "filter_url": (reverse("admin_pna_filtered_list") + f"?institution={inst.id}{'&' + scope_params if scope_params else ''}") if inst else _filtered_list_url({"missing_institution": 1}),
+                "dashboard_url": reverse("admin_pna_dashboard_institution", kwargs={"pk": inst.id}) if inst else None,
+            }
         )
-        _update_resource_row(row, p)
-
-    inst_rows = list(inst_agg.values())
+        inst_rows.append(row)
     inst_rows.sort(key=lambda r: (r["total"], r["zile"]), reverse=True)
     resource_institution_rows = inst_rows[:20]
 
     # Pentru dashboard-ul per instituție, un breakdown mai util este pe capitole/foi de parcurs.
     top_scopes = None
     if scope_kind == "institution":
-        scope_agg = {}
-        for p in proiecte:
-            project_scopes = [
-                (
-                    "CH",
-                    ch.id,
-                    f"Cap. {ch.numar} — {ch.denumire}",
-                    reverse("admin_pna_dashboard_chapter", kwargs={"pk": ch.id}),
-                )
-                for ch in p.scope_chapters()
-            ]
-            project_scopes.extend(
-                (
-                    "CR",
-                    cr.id,
-                    f"{cr.cod} — {cr.denumire}",
-                    reverse("admin_pna_dashboard_criterion", kwargs={"pk": cr.id}),
-                )
-                for cr in p.scope_criteria()
-            )
-            for kind, sid, label, dashboard_url in project_scopes:
-                filter_args = {"chapter": sid} if kind == "CH" else {"criterion": sid}
-                key = (kind, sid)
-                row = scope_agg.setdefault(
-                    key,
-                    {
-                        **_empty_resource_row(
-                            label,
-                            filter_url=_filtered_list_url(filter_args),
-                            dashboard_url=dashboard_url,
-                        ),
-                        "kind": kind,
-                        "id": sid,
-                        "label": label,
-                    },
-                )
-                _update_resource_row(row, p)
-
-        rows = list(scope_agg.values())
+        rows = []
+        for (kind, sid), (obj, row) in resurse.by_scope.items():
+            if kind == "CH":
+                label = f"Cap. {obj.numar} — {obj.denumire}"
+                row["filter_url"] = _filtered_list_url({"chapter": sid})
+                row["dashboard_url"] = reverse("admin_pna_dashboard_chapter", kwargs={"pk": sid})
+            else:
+                label = f"{obj.cod} — {obj.denumire}"
+                row["filter_url"] = _filtered_list_url({"criterion": sid})
+                row["dashboard_url"] = reverse("admin_pna_dashboard_criterion", kwargs={"pk": sid})
+            row.update({"label": label, "kind": kind, "id": sid})
+            rows.append(row)
         rows.sort(key=lambda r: (r["total"], r["zile"]), reverse=True)
         top_scopes = rows[:20]
 
@@ -3791,59 +3417,53 @@ def _render_pna_dashboard(
     for cl, chapters in grouped_chapters:
         rows = []
         for ch in chapters:
-            projects_for_ch = [p for p in proiecte if ch.id in _pna_chapter_ids(p)]
-            if not projects_for_ch:
+            row = resurse.by_chapter.get(ch.id)
+            if row is None:
                 continue
-            row = _empty_resource_row(
-                f"Cap. {ch.numar} — {ch.denumire}",
-                filter_url=_filtered_list_url({"chapter": ch.id}),
-                dashboard_url=reverse("admin_pna_dashboard_chapter", kwargs={"pk": ch.id}),
+            row.update(
+                {
+                    "label": f"Cap. {ch.numar} — {ch.denumire}",
+                    "filter_url": _filtered_list_url({"chapter": ch.id}),
+                    "dashboard_url": reverse("admin_pna_dashboard_chapter", kwargs={"pk": ch.id}),
+                    "obj": ch,
+                }
             )
-            row["obj"] = ch
-            for p in projects_for_ch:
-                _update_resource_row(row, p)
             rows.append(row)
         if rows:
             resource_chapter_groups.append({"cluster": cl, "rows": rows})
 
     resource_criteria_rows = []
-    for cr in Criterion.objects.all().order_by("cod"):
-        projects_for_cr = [p for p in proiecte if cr.id in _pna_criterion_ids(p)]
-        if not projects_for_cr:
+    for cr in criterii:
+        row = resurse.by_criterion.get(cr.id)
+        if row is None:
             continue
-        row = _empty_resource_row(
-            f"{cr.cod} — {cr.denumire}",
-            filter_url=_filtered_list_url({"criterion": cr.id}),
-            dashboard_url=reverse("admin_pna_dashboard_criterion", kwargs={"pk": cr.id}),
+        row.update(
+            {
+                "label": f"{cr.cod} — {cr.denumire}",
+                "filter_url": _filtered_list_url({"criterion": cr.id}),
+                "dashboard_url": reverse("admin_pna_dashboard_criterion", kwargs={"pk": cr.id}),
+                "obj": cr,
+            }
         )
-        row["obj"] = cr
-        for p in projects_for_cr:
-            _update_resource_row(row, p)
         resource_criteria_rows.append(row)
 
     # Top acte UE (după nr proiecte)
-    top_acte = []
-    for act_id, proj_set in act_to_projects.items():
-        top_acte.append((act_id, len(proj_set)))
-    top_acte.sort(key=lambda x: x[1], reverse=True)
-    top_acte = top_acte[:15]
-    act_lookup = {l.eu_act.id: l.eu_act for p in proiecte for l in getattr(p, "acte_ue_legaturi").all() if l.eu_act}
-    top_acte_rows = []
-    for act_id, cnt in top_acte:
-        act = act_lookup.get(act_id)
-        if not act:
-            continue
-        top_acte_rows.append({"act": act, "nr_projects": cnt})
+    top_acte = sorted(
+        ((act_id, len(proj_set)) for act_id, proj_set in acte_ue.act_to_projects.items()),
+        key=lambda x: x[1],
+        reverse=True,
+    )[:15]
+    top_acte_rows = [{"act": acte_ue.acts[act_id], "nr_projects": cnt} for act_id, cnt in top_acte]
 
     # Distribuție tip acte UE (Top 10)
-    acte_tip_rows = [{"tip": k, "nr": v} for k, v in acte_tip_counts.items()]
+    acte_tip_rows = [{"tip": k, "nr": v} for k, v in acte_ue.tip_counts.items()]
     acte_tip_rows.sort(key=lambda r: r["nr"], reverse=True)
     acte_tip_rows = acte_tip_rows[:12]
 
     # Distribuție transpunere
     transp_rows = []
     for code, label in PnaProjectEUAct.TIP_TRANSPUNERE_CHOICES:
-        transp_rows.append({"code": code, "label": label, "nr": transp_counts.get(code, 0)})
+        transp_rows.append({"code": code, "label": label, "nr": acte_ue.transp_counts.get(code, 0)})
 
     # Acțiuni recomandate / calitate date (cu linkuri)
     actions = [
@@ -3859,159 +3479,143 @@ def _render_pna_dashboard(
         },
         {
             "label": "Deadline-uri depășite",
-            "nr": nr_overdue,
+            "nr": termene.nr_overdue,
             "href": _filtered_list_url({"overdue": 1}),
         },
         {
             "label": "Deadline-uri în următoarele 60 zile",
-            "nr": nr_upcoming_60,
+            "nr": termene.nr_upcoming_60,
             "href": _filtered_list_url({"upcoming_days": 60}),
         },
         {
             "label": "Fără deadline",
-            "nr": nr_no_deadline,
+            "nr": termene.nr_no_deadline,
             "href": _filtered_list_url({"missing_deadline": 1}),
         },
         {
             "label": "Necesită coordonare/avizare CE",
-            "nr": nr_necesita_ce,
+            "nr": kpi.nr_necesita_ce,
             "href": _filtered_list_url({"needs_ce": 1}),
         },
         {
             "label": "Necesită expertiză externă",
-            "nr": nr_expertiza_externa,
+            "nr": kpi.nr_expertiza_externa,
             "href": _filtered_list_url({"needs_external": 1}),
         },
         {
             "label": "Expertiză externă necesară (neidentificată)",
-            "nr": nr_expertiza_externa_fara_furnizor,
+            "nr": kpi.nr_expertiza_externa_fara_furnizor,
             "href": _filtered_list_url({"external_provider_missing": 1}),
         },
         {
             "label": "Expertiză internă insuficientă",
-            "nr": nr_expertiza_interna_insuf,
+            "nr": kpi.nr_expertiza_interna_insuf,
             "href": _filtered_list_url({"internal_expertise": 1}),
         },
         {
             "label": "Fără instituție principală",
-            "nr": nr_missing_institutie,
+            "nr": kpi.nr_missing_institutie,
             "href": _filtered_list_url({"missing_institution": 1}),
         },
         {
             "label": "Fără acte UE atașate",
-            "nr": nr_missing_acte,
+            "nr": kpi.nr_missing_acte,
             "href": _filtered_list_url({"missing_acts": 1}),
         },
         {
             "label": "Fără costuri (2026–2029)",
-            "nr": nr_missing_cost,
+            "nr": kpi.nr_missing_cost,
             "href": _filtered_list_url({"missing_cost": 1}),
         },
         {
             "label": "Fără estimare volum muncă",
-            "nr": nr_missing_volum,
+            "nr": kpi.nr_missing_volum,
             "href": _filtered_list_url({"missing_volum": 1}),
         },
         {
             "label": "Necesită CE dar status ≠ coordonare CE",
-            "nr": len([p for p in proiecte if p.necesita_avizare_comisia_europeana and p.status_implementare != PnaProject.STATUS_COORDONARE_CE]),
+            "nr": kpi.nr_ce_status_mismatch,
             "href": _filtered_list_url({"ce_status_mismatch": 1}),
         },
     ]
 
     # cost rows
-    cost_rows = [
-        {"year": 2026, "nr": sum_cost[2026]},
-        {"year": 2027, "nr": sum_cost[2027]},
-        {"year": 2028, "nr": sum_cost[2028]},
-        {"year": 2029, "nr": sum_cost[2029]},
-    ]
+    cost_rows = [{"year": y, "nr": kpi.sum_cost[y]} for y in PNA_COST_YEARS]
     max_cost = max([float(r["nr"]) for r in cost_rows] + [0.0])
     for r in cost_rows:
         v = float(r["nr"]) if r["nr"] is not None else 0.0
         r["bar_h"] = round((v / max_cost) * 100, 1) if max_cost else 0.0
 
-    return render(
-        request,
-        "portal/admin_pna_dashboard.html",
-        {
-            "can_edit_pna": can_edit_pna(request.user),
-            "scope_kind": scope_kind,
-            "scope_title": scope_title,
-            "scope_params": scope_params,
-            "include_co": include_co,
-            "toggle_include_co_url": toggle_include_co_url,
-            "back_url": back_url,
-            "back_label": back_label,
-            "filtered_list_url": _filtered_list_url(),
-            "total": total,
-            "nr_neinitiate": nr_neinitiate,
-            "nr_in_procedura_guvern": nr_in_procedura_guvern,
-            "nr_in_procedura_parlament": nr_in_procedura_parlament,
-            "nr_adoptate_final": nr_adoptate_final,
-            "stale_days_threshold": stale_days_threshold,
-            "stale_total": stale_total,
-            "stale_pct_total": stale_pct_total,
-            "stale_projects_top": stale_projects_top,
-            "stale_status_rows": stale_status_rows,
-            "status_moves_30": status_moves_30,
-            "months_activity": months_activity,
-            "mode": mode,
-            "status_rows": status_rows,
-            "years": years or [selected_year],
-            "selected_year": selected_year,
-            "months": months,
-            "criterii_rows": criterii_rows,
-            "chapter_cluster_rows": chapter_cluster_rows,
-            "nr_overdue": nr_overdue,
-            "nr_upcoming_90": nr_upcoming_90,
-            "nr_upcoming_30": nr_upcoming_30,
-            "nr_upcoming_60": nr_upcoming_60,
-            "nr_no_deadline": nr_no_deadline,
-            "nr_necesita_ce": nr_necesita_ce,
-            "nr_expertiza_externa": nr_expertiza_externa,
-            "nr_expertiza_interna_insuf": nr_expertiza_interna_insuf,
-            "nr_ext_fara_furnizor": nr_expertiza_externa_fara_furnizor,
-            "nr_missing_cost": nr_missing_cost,
-            "nr_missing_volum": nr_missing_volum,
-            "nr_missing_institutie": nr_missing_institutie,
-            "nr_missing_acte": nr_missing_acte,
-            "sum_zile": sum_zile,
-            "cost_rows": cost_rows,
-            "overdue": overdue[:50],
-            "upcoming": upcoming[:50],
-            "top_risks": top_risks,
-            "derapaje_top": derapaje_top,
-            "resource_institution_rows": resource_institution_rows,
-            "resource_chapter_groups": resource_chapter_groups,
-            "resource_criteria_rows": resource_criteria_rows,
-            "top_scopes": top_scopes,
-            "acte_tip_rows": acte_tip_rows,
-            "transp_rows": transp_rows,
-            "top_acte_rows": top_acte_rows,
-            "actions": actions,
-            "latest_contribution_rows": latest_contribution_rows,
-            "all_contributions_url": all_contributions_url,
-
-            # --- contribuții experți (etapa 2) ---
-            "contrib_summary_cards": contrib_summary_cards,
-            "contrib_dims_rows": contrib_dims_rows,
-            "contrib_missing_top": contrib_missing_top,
-            "contrib_missing_url": contrib_missing_url,
-            "contrib_chapter_groups": contrib_chapter_groups,
-            "contrib_criterii_rows": contrib_criterii_rows,
-            "contrib_institution_rows": contrib_institution_rows,
-        },
-    )
+    return {
+        "scope_params": scope_params,
+        "filtered_list_url": _filtered_list_url(),
+        "total": total,
+        "nr_neinitiate": nr_neinitiate,
+        "nr_in_procedura_guvern": nr_in_procedura_guvern,
+        "nr_in_procedura_parlament": nr_in_procedura_parlament,
+        "nr_adoptate_final": nr_adoptate_final,
+        "stale_days_threshold": stale_days_threshold,
+        "stale_total": stale_total,
+        "stale_pct_total": stale_pct_total,
+        "stale_projects_top": stale_projects_top,
+        "stale_status_rows": stale_status_rows,
+        "status_moves_30": status_moves_30,
+        "months_activity": months_activity,
+        "mode": mode,
+        "status_rows": status_rows,
+        "years": years or [selected_year],
+        "selected_year": selected_year,
+        "months": months,
+        "criterii_rows": criterii_rows,
+        "chapter_cluster_rows": chapter_cluster_rows,
+        "nr_overdue": termene.nr_overdue,
+        "nr_upcoming_90": termene.nr_upcoming_90,
+        "nr_upcoming_30": termene.nr_upcoming_30,
+        "nr_upcoming_60": termene.nr_upcoming_60,
+        "nr_no_deadline": termene.nr_no_deadline,
+        "nr_necesita_ce": kpi.nr_necesita_ce,
+        "nr_expertiza_externa": kpi.nr_expertiza_externa,
+        "nr_expertiza_interna_insuf": kpi.nr_expertiza_interna_insuf,
+        "nr_ext_fara_furnizor": kpi.nr_expertiza_externa_fara_furnizor,
+        "nr_missing_cost": kpi.nr_missing_cost,
+        "nr_missing_volum": kpi.nr_missing_volum,
+        "nr_missing_institutie": kpi.nr_missing_institutie,
+        "nr_missing_acte": kpi.nr_missing_acte,
+        "sum_zile": kpi.sum_zile,
+        "cost_rows": cost_rows,
+        "overdue": termene.overdue[:50],
+        "upcoming": termene.upcoming[:50],
+        "top_risks": top_risks,
+        "derapaje_top": derapaje_top,
+        "resource_institution_rows": resource_institution_rows,
+        "resource_chapter_groups": resource_chapter_groups,
+        "resource_criteria_rows": resource_criteria_rows,
+        "top_scopes": top_scopes,
+        "acte_tip_rows": acte_tip_rows,
+        "transp_rows": transp_rows,
+        "top_acte_rows": top_acte_rows,
+        "actions": actions,
+        "latest_contribution_rows": latest_contribution_rows,
+        "all_contributions_url": all_contributions_url,
+
+        # --- contribuții experți (etapa 2) ---
+        "contrib_summary_cards": contrib_summary_cards,
+        "contrib_dims_rows": contrib_dims_rows,
+        "contrib_missing_top": contrib_missing_top,
+        "contrib_missing_url": contrib_missing_url,
+        "contrib_chapter_groups": contrib_chapter_groups,
+        "contrib_criterii_rows": contrib_criterii_rows,
+        "contrib_institution_rows": contrib_institution_rows,
+    }
 
 
 @user_passes_test(can_edit_pna)
 def admin_pna_bulk_update(request):
-    clusters = Cluster.objects.all().order_by("ordonare", "cod", "denumire")
+    clusters = get_clusters()
     chapters = Chapter.objects.select_related("cluster").all().order_by("cluster__ordonare", "numar")
-    criteria = Criterion.objects.all().order_by("cod")
-    institutions = PnaInstitution.objects.all().order_by("nume")
-    commissions = ParliamentCommission.objects.filter(activa=True).order_by("ordine", "nume")
+    criteria = get_criteria()
+    institutions = get_institutions()
+    commissions = get_commissions()
     field_meta = _pna_bulk_update_field_meta()
 
     selected_clusters = request.GET.getlist("clusters") or request.POST.getlist("clusters")
@@ -4502,18 +4106,12 @@ def admin_pna_contributii(request, pk: int):
         pk=pk,
     )
 
-    # experți "relevanți" pentru proiect (după alocări)
-    exp_profiles = ExpertProfile.objects.select_related("user").filter(
-        arhivat=False,
-        user__is_active=True,
-        user__is_staff=False,
-    )
-
+    # experți "relevanți" pentru proiect (după alocări, din indexul experți ↔ scope-uri)
     chapter_ids = _pna_chapter_ids(proiect)
     criterion_ids = _pna_criterion_ids(proiect)
-    exp_profiles = exp_profiles.filter(
-        Q(capitole__id__in=chapter_ids) | Q(criterii__id__in=criterion_ids)
-    ).distinct()
+    exp_profiles = ExpertProfile.objects.select_related("user").filter(
+        user_id__in=experts_in_scopes(chapter_ids, criterion_ids)
+    )
     scope_label = _pna_scope_label(proiect)
 
     experts = [p.user for p in exp_profiles.order_by("user__last_name", "user__first_name")]
@@ -4749,12 +4347,7 @@ def admin_pna_scope_list(request):
         else:
             scope_label = f"{inst_obj.nume} · {scope_label}"
 
-    deadline_expr = Coalesce(
-        "termen_actualizat_aprobare_guvern",
-        "termen_aprobare_parlament",
-        "termen_aprobare_guvern",
-    )
-    qs = qs.annotate(deadline=deadline_expr)
+    qs = qs.annotate(deadline=_pna_deadline_expr())
 
     year_i = None
     month_i = None
@@ -4772,7 +4365,8 @@ def admin_pna_scope_list(request):
     if month_i:
         qs = qs.filter(deadline__month=month_i)
 
-    projects = list(qs.order_by("deadline", "titlu"))
+    total = qs.count()
+    projects, pager = _paginate_pna_projects(request, qs)
 
     back_dashboard_url = reverse("admin_pna_dashboard")
     back_dashboard_label = "Înapoi la dashboard"
@@ -4800,6 +4394,8 @@ def admin_pna_scope_list(request):
         {
             "scope_label": scope_label,
             "projects": projects,
+            "total": total,
+            "pager": pager,
             "year": year_i,
             "month": month_i,
             "inst_obj": inst_obj,
@@ -4808,9 +4404,13 @@ def admin_pna_scope_list(request):
         },
     )
 
-@user_passes_test(is_internal)
-def admin_pna_filtered_list(request):
-    """Listă proiecte PNA cu filtre (folosită ca drill-down din dashboard)."""
+def _pna_filtered_projects(request):
+    """Proiectele PNA (neatinse de paginare) care corespund filtrelor GET ale listei filtrate.
+
+    Returnează (qs, filtre, inst_obj): `qs` are adnotarea `deadline`, `filtre` conține valorile brute ale
+    parametrilor (pentru template), iar `inst_obj` instituția selectată (sau None).
+    Folosit de lista filtrată și de exportul ei.
+    """
 
     qs = (
         PnaProject.objects.filter(arhivat=False)
@@ -4818,12 +4418,7 @@ def admin_pna_filtered_list(request):
         .prefetch_related("chapters__cluster", "criteria", "institutii_responsabile")
     )
 
-    deadline_expr = Coalesce(
-        "termen_actualizat_aprobare_guvern",
-        "termen_aprobare_parlament",
-        "termen_aprobare_guvern",
-    )
-    qs = qs.annotate(deadline=deadline_expr)
+    qs = qs.annotate(deadline=_pna_deadline_expr())
 
     today = timezone.localdate()
 
@@ -5030,7 +4625,58 @@ def admin_pna_filtered_list(request):
         except Exception:
             pass
 
-    projects = list(qs.order_by("deadline", "titlu"))
+    filters = {
+        "q": q,
+        "status": status,
+        "institution": institution,
+        "include_co": include_co,
+        "needs_ce": needs_ce,
+        "needs_external": needs_external,
+        "internal_expertise": internal_expertise,
+        "overdue": overdue,
+        "upcoming_days": upcoming_days,
+        "missing_deadline": missing_deadline,
+        "missing_cost": missing_cost,
+        "missing_volum": missing_volum,
+        "missing_institution": missing_institution,
+        "missing_acts": missing_acts,
+        "has_contrib": has_contrib,
+        "missing_contrib": missing_contrib,
+        "missing_flex": missing_flex,
+        "missing_comp": missing_comp,
+        "missing_tran": missing_tran,
+        "missing_all_dims": missing_all_dims,
+        "stale_days": stale_days,
+        "status_changed_days": status_changed_days,
+        "external_provider_missing": external_provider_missing,
+        "ce_status_mismatch": ce_status_mismatch,
+        "year": year,
+        "month": month,
+        "chapter_id": chapter_id,
+        "criterion_id": criterion_id,
+    }
+    return qs, filters, inst_obj
+
+
+@user_passes_test(is_internal)
+def admin_pna_filtered_list(request):
+    """Listă proiecte PNA cu filtre (folosită ca drill-down din dashboard)."""
+
+    qs, filters, inst_obj = _pna_filtered_projects(request)
+    include_co = filters["include_co"]
+    chapter_id = filters["chapter_id"]
+    criterion_id = filters["criterion_id"]
+
+    total = qs.count()
+    projects, pager = _paginate_pna_projects(request, qs)
+
+    # Exportul primește aceleași filtre, fără parametrii de paginare.
+    export_params = request.GET.copy()
+    for key in ("after", "per_page", "format"):
+        export_params.pop(key, None)
+    export_query = export_params.urlencode()
+    export_params["format"] = "csv"
+    export_query_csv = export_params.urlencode()
 
     back_dashboard_url = reverse("admin_pna_dashboard")
     back_dashboard_label = "Înapoi la dashboard"
@@ -5056,47 +4702,49 @@ def admin_pna_filtered_list(request):
         request,
         "portal/admin_pna_filtered_list.html",
         {
+            **filters,
             "projects": projects,
-            "q": q,
-            "status": status,
             "status_choices": PnaProject.STATUS_IMPLEMENTARE_CHOICES,
-            "institutions": PnaInstitution.objects.all().order_by("nume"),
-            "institution": institution,
-            "include_co": include_co,
+            "institutions": get_institutions(),
             "inst_obj": inst_obj,
             "back_dashboard_url": back_dashboard_url,
             "back_dashboard_label": back_dashboard_label,
-            "needs_ce": needs_ce,
-            "needs_external": needs_external,
-            "internal_expertise": internal_expertise,
-            "overdue": overdue,
-            "upcoming_days": upcoming_days,
-            "missing_deadline": missing_deadline,
-            "missing_cost": missing_cost,
-            "missing_volum": missing_volum,
-            "missing_institution": missing_institution,
-            "missing_acts": missing_acts,
-
-            "has_contrib": has_contrib,
-            "missing_contrib": missing_contrib,
-            "missing_flex": missing_flex,
-            "missing_comp": missing_comp,
-            "missing_tran": missing_tran,
-            "missing_all_dims": missing_all_dims,
-            "stale_days": stale_days,
-            "status_changed_days": status_changed_days,
-            "external_provider_missing": external_provider_missing,
-            "ce_status_mismatch": ce_status_mismatch,
-            "year": year,
-            "month": month,
-            "chapter_id": chapter_id,
-            "criterion_id": criterion_id,
-            "total": len(projects),
+            "total": total,
+            "pager": pager,
+            "export_query": export_query,
+            "export_query_csv": export_query_csv,
         },
     )
 
 
 
+@user_passes_test(is_internal)
+def admin_pna_filtered_export(request):
+    """Exportă proiectele din lista filtrată (aceleași filtre GET) în formatul template-ului de import.
+
+    ?format=xlsx (implicit; proiecte + acte UE, poate fi reîncărcat prin import) sau ?format=csv (doar proiectele).
+    """
+
+    qs, _filters, _inst_obj = _pna_filtered_projects(request)
+    qs = qs.order_by(F("deadline").asc(nulls_last=True), "titlu", "pk")
+    filename_base = f"proiecte_pna_{timezone.localtime().strftime('%Y%m%d_%H%M')}"
+
+    if (request.GET.get("format") or "").strip() == "csv":
+        resp = StreamingHttpResponse(stream_pna_export_csv(qs), content_type="text/csv; charset=utf-8")
+        resp["Content-Disposition"] = f'attachment; filename="{filename_base}.csv"'
+        return resp
+
+    fileobj = tempfile.TemporaryFile()
+    write_pna_export_workbook(qs, fileobj)
+    fileobj.seek(0)
+    return FileResponse(
+        fileobj,
+        as_attachment=True,
+        filename=f"{filename_base}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
 @user_passes_test(can_edit_pna)
 def admin_pna_import_template_download(request):
     data = build_pna_import_template_bytes()
@@ -5163,6 +4811,45 @@ def admin_pna_import(request):
     return render(request, "portal/admin_pna_import.html", {"form": form})
 
 
+def _annotate_scope_questionnaires(
+    chestionare: list[Questionnaire],
+    scope: str,
+    chapter: Chapter | None = None,
+    criterion: Criterion | None = None,
+) -> tuple[int, float]:
+    """Completează statisticile de răspuns pe chestionarele unui dashboard de scope.
+
+    Setează pe fiecare chestionar `nr_experti_alocati`, `nr_respondenti`, `proc_respondenti` și
+    `respondenti` (utilizatori ordonați după nume). Statisticile se calculează într-o singură trecere
+    pentru toate chestionarele, iar respondenții se încarcă dintr-o singură interogare.
+
+    Întoarce (total răspunsuri primite, rata medie de răspuns).
+    """
+
+    stats_by_q = get_questionnaires_rates_and_counts(chestionare, scope=scope, chapter=chapter, criterion=criterion)
+
+    all_resp_ids = {uid for _nr, _resp, _rata, resp_ids in stats_by_q.values() for uid in resp_ids}
+    users = list(User.objects.filter(id__in=all_resp_ids).order_by("last_name", "first_name")) if all_resp_ids else []
+    # Poziția fiecărui respondent în lista ordonată: respondenții unui chestionar se aleg fără a parcurge toată lista.
+    position = {u.id: i for i, u in enumerate(users)}
+
+    total_raspunsuri_primite = 0
+    rates: list[float] = []
+    for q in chestionare:
+        nr_experti_q, nr_raspunsuri_q, rata_q, resp_ids = stats_by_q[q.id]
+
+        q.nr_experti_alocati = nr_experti_q
+        q.nr_respondenti = nr_raspunsuri_q
+        q.proc_respondenti = rata_q
+        q.respondenti = [users[i] for i in sorted({position[uid] for uid in resp_ids if uid in position})]
+
+        total_raspunsuri_primite += int(nr_raspunsuri_q or 0)
+        rates.append(float(rata_q or 0.0))
+
+    rata_medie_raspuns = round((sum(rates) / len(rates)), 1) if rates else 0.0
+    return total_raspunsuri_primite, rata_medie_raspuns
+
+
 @user_passes_test(is_internal)
 def admin_general_dashboard(request):
     """Dashboard pentru categoria «General» (chestionare pentru toți experții)."""
@@ -5183,24 +4870,10 @@ def admin_general_dashboard(request):
     chestionare = list(chestionare_qs)
     nr_chestionare = len(chestionare)
 
-    total_raspunsuri_primite = 0
-    rates: list[float] = []
-
-    for q in chestionare:
-        nr_experti_q, nr_raspunsuri_q, rata_q, resp_ids = get_questionnaire_rate_and_counts(
-            questionnaire=q,
-            scope=QuestionnaireScopeSnapshot.SCOPE_GENERAL,
-        )
-
-        q.nr_experti_alocati = nr_experti_q
-        q.nr_respondenti = nr_raspunsuri_q
-        q.proc_respondenti = rata_q
-        q.respondenti = list(User.objects.filter(id__in=resp_ids).order_by("last_name", "first_name"))
-
-        total_raspunsuri_primite += int(nr_raspunsuri_q or 0)
-        rates.append(float(rata_q or 0.0))
-
-    rata_medie_raspuns = round((sum(rates) / len(rates)), 1) if rates else 0.0
+    total_raspunsuri_primite, rata_medie_raspuns = _annotate_scope_questionnaires(
+        chestionare,
+        scope=QuestionnaireScopeSnapshot.SCOPE_GENERAL,
+    )
 
     return render(
         request,
@@ -5221,12 +4894,7 @@ def admin_general_dashboard(request):
 def admin_capitol_dashboard(request, pk: int):
     capitol = get_object_or_404(Chapter, pk=pk)
 
-    expert_ids_qs = (
-        User.objects.filter(is_staff=False, is_active=True, profil_expert__capitole=capitol)
-        .values_list("id", flat=True)
-        .distinct()
-    )
-    expert_ids = list(expert_ids_qs)
+    expert_ids = list(experts_in_scopes(chapter_ids=[capitol.pk]).values_list("user_id", flat=True))
     nr_experti = len(expert_ids)
 
     chestionare_qs = (
@@ -5241,26 +4909,11 @@ def admin_capitol_dashboard(request, pk: int):
     # - "Au răspuns" = nr. submisii TRIMIS (un chestionar trimis = 1 răspuns)
     # - "%" = rata de răspuns pentru acel chestionar
     # Pentru chestionarele închise folosim snapshot (înghețat la termen).
-    total_raspunsuri_primite = 0
-    rates: list[float] = []
-
-    for q in chestionare:
-        nr_experti_q, nr_raspunsuri_q, rata_q, resp_ids = get_questionnaire_rate_and_counts(
-            questionnaire=q,
-            scope=QuestionnaireScopeSnapshot.SCOPE_CHAPTER,
-            chapter=capitol,
-        )
-
-        # UI
-        q.nr_experti_alocati = nr_experti_q
-        q.nr_respondenti = nr_raspunsuri_q
-        q.proc_respondenti = rata_q
-        q.respondenti = list(User.objects.filter(id__in=resp_ids).order_by("last_name", "first_name"))
-
-        total_raspunsuri_primite += int(nr_raspunsuri_q or 0)
-        rates.append(float(rata_q or 0.0))
-
-    rata_medie_raspuns = round((sum(rates) / len(rates)), 1) if rates else 0.0
+    total_raspunsuri_primite, rata_medie_raspuns = _annotate_scope_questionnaires(
+        chestionare,
+        scope=QuestionnaireScopeSnapshot.SCOPE_CHAPTER,
+        chapter=capitol,
+    )
 
     return render(
         request,
@@ -5281,12 +4934,7 @@ def admin_capitol_dashboard(request, pk: int):
 def admin_criteriu_dashboard(request, pk: int):
     criteriu = get_object_or_404(Criterion, pk=pk)
 
-    expert_ids_qs = (
-        User.objects.filter(is_staff=False, is_active=True, profil_expert__criterii=criteriu)
-        .values_list("id", flat=True)
-        .distinct()
-    )
-    expert_ids = list(expert_ids_qs)
+    expert_ids = list(experts_in_scopes(criterion_ids=[criteriu.pk]).values_list("user_id", flat=True))
     nr_experti = len(expert_ids)
 
     chestionare_qs = (
@@ -5297,25 +4945,11 @@ def admin_criteriu_dashboard(request, pk: int):
     chestionare = list(chestionare_qs)
     nr_chestionare = len(chestionare)
 
-    total_raspunsuri_primite = 0
-    rates: list[float] = []
-
-    for q in chestionare:
-        nr_experti_q, nr_raspunsuri_q, rata_q, resp_ids = get_questionnaire_rate_and_counts(
-            questionnaire=q,
-            scope=QuestionnaireScopeSnapshot.SCOPE_CRITERION,
-            criterion=criteriu,
-        )
-
-        q.nr_experti_alocati = nr_experti_q
-        q.nr_respondenti = nr_raspunsuri_q
-        q.proc_respondenti = rata_q
-        q.respondenti = list(User.objects.filter(id__in=resp_ids).order_by("last_name", "first_name"))
-
-        total_raspunsuri_primite += int(nr_raspunsuri_q or 0)
-        rates.append(float(rata_q or 0.0))
-
-    rata_medie_raspuns = round((sum(rates) / len(rates)), 1) if rates else 0.0
+    total_raspunsuri_primite, rata_medie_raspuns = _annotate_scope_questionnaires(
+        chestionare,
+        scope=QuestionnaireScopeSnapshot.SCOPE_CRITERION,
+        criterion=criteriu,
+    )
 
     return render(
         request,
@@ -5335,8 +4969,8 @@ def admin_criteriu_dashboard(request, pk: int):
 @user_passes_test(is_internal)
 def admin_export(request):
     chestionare_all = Questionnaire.objects.filter(arhivat=False).order_by("-creat_la")
-    chapters_all = Chapter.objects.all().order_by("numar")
-    criteria_all = Criterion.objects.all().order_by("cod")
+    chapters_all = get_chapters()
+    criteria_all = get_criteria()
 
     if request.method == "POST":
         fmt = request.POST.get("format", "csv")
@@ -5360,35 +4994,83 @@ def admin_export(request):
             messages.error(request, "Selectează cel puțin un chestionar sau un filtru (General/capitol/criteriu).")
             return redirect("admin_export")
 
+        # Exportul incremental include doar ce s-a modificat după reperul anterior (sau tot, dacă nu există unul).
+        # Reperul avansează numai după un export reușit (vezi export_jobs / stream_csv_and_record_watermark).
+        ids = list(qs.values_list("id", flat=True))
+        since = get_export_watermark(request.user, ids) if request.POST.get("incremental") else None
+
+        # PDF-ul (lent pentru multe răspunsuri) se generează mereu în fundal; CSV/XLSX doar la cerere.
+        if fmt in (ExportJob.FORMAT_PDF, ExportJob.FORMAT_PDF_ZIP) or request.POST.get("mod") == "fundal":
+            if fmt not in dict(ExportJob.FORMAT_CHOICES):
+                fmt = ExportJob.FORMAT_CSV
+            job, refolosit = create_export_job(request.user, fmt, qs, since=since)
+            if refolosit:
+                messages.success(request, "Datele nu s-au modificat de la ultimul export identic; fișierul este deja disponibil.")
+            else:
+                messages.success(request, "Exportul a fost pus în așteptare. Fișierul va fi disponibil pe această pagină.")
+            if request.POST.get("incremental") and since is None:
+                messages.info(request, "Nu există un export anterior al acestei selecții; exportul include toate răspunsurile.")
+            return redirect("admin_export_job", pk=job.pk)
+
         filename_base = f"raspunsuri_{timezone.now().strftime('%Y%m%d_%H%M')}"
+        if since is not None:
+            filename_base += "_incremental"
 
         if fmt == "xlsx":
-            content = export_xlsx(qs)
-            resp = HttpResponse(
-                content,
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-            resp["Content-Disposition"] = f'attachment; filename="{filename_base}.xlsx"'
-            return resp
-
-        if fmt == "pdf":
-            content = export_pdf(qs)
-            resp = HttpResponse(content, content_type="application/pdf")
-            resp["Content-Disposition"] = f'attachment; filename="{filename_base}.pdf"'
-            return resp
-
-        content = export_csv(qs)
-        resp = HttpResponse(content, content_type="text/csv; charset=utf-8")
+            # Fișierul XLSX se construiește oricum complet înainte de trimitere: îl păstrăm în storage,
+            # ca exporturile identice ulterioare (aceleași date) să fie servite direct de acolo.
+            job, _refolosit = create_export_job(request.user, fmt, qs, since=since, background=False)
+            if job.status != ExportJob.STATUS_FINALIZAT:
+                messages.error(request, "Exportul nu a putut fi generat.")
+                return redirect("admin_export_job", pk=job.pk)
+            return _export_job_file_response(job, filename=f"{filename_base}.xlsx")
+
+        cached = get_cached_export(ExportJob.FORMAT_CSV, ids, since=since)
+        if cached is not None:
+            record_export_watermark(request.user, ids, timezone.now())
+            return _export_job_file_response(cached, filename=f"{filename_base}.csv")
+
+        resp = StreamingHttpResponse(
+            stream_csv_and_record_watermark(qs, request.user, since=since), content_type="text/csv; charset=utf-8"
+        )
         resp["Content-Disposition"] = f'attachment; filename="{filename_base}.csv"'
         return resp
 
+    exporturi = ExportJob.objects.select_related("creat_de")[:10]
     return render(
         request,
         "portal/admin_export.html",
-        {"chestionare": chestionare_all, "capitole": chapters_all, "criterii": criteria_all},
+        {"chestionare": chestionare_all, "capitole": chapters_all, "criterii": criteria_all, "exporturi": exporturi},
+    )
+
+
+@user_passes_test(is_internal)
+def admin_export_job(request, pk: int):
+    """Status pentru un export în fundal (pagina se reîncarcă singură până la finalizare)."""
+    job = resume_stale_export_job(get_object_or_404(ExportJob.objects.select_related("creat_de"), pk=pk))
+    return render(
+        request,
+        "portal/admin_export_job.html",
+        {"job": job, "chestionare": job.chestionare.order_by("-creat_la")},
     )
 
 
+def _export_job_file_response(job: ExportJob, filename: str | None = None) -> FileResponse:
+    if not job.fisier:
+        raise Http404("Fișier indisponibil")
+    try:
+        fisier = job.fisier.open("rb")
+    except (FileNotFoundError, OSError):
+        raise Http404("Fișierul exportului nu mai este disponibil; generează exportul din nou.")
+    return FileResponse(fisier, as_attachment=True, filename=filename or job.nume_fisier)
+
+
+@user_passes_test(is_internal)
+def admin_export_job_download(request, pk: int):
+    job = get_object_or_404(ExportJob, pk=pk, status=ExportJob.STATUS_FINALIZAT)
+    return _export_job_file_response(job)
+
+
 # -------------------- ARHIVARE (soft delete) --------------------
 
 